@@ -0,0 +1,46 @@
+"""Benchmark get_complementary_color against the original colorsys-based search.
+
+Checks that both produce identical output on every sampled color and
+reports the per-call cost of each.
+
+Usage: python -m benchmarks.bench_complement [--sample N | --all]
+"""
+import argparse
+import random
+import time
+
+from core.color_utils import get_complementary_color
+from tests.legacy_complement import legacy_complementary_color
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sample', type=int, default=200_000, help='number of random colors (default 200000)')
+    parser.add_argument('--all', action='store_true', help='compare all 16,777,216 colors (slow)')
+    args = parser.parse_args()
+
+    if args.all:
+        colors = (f"#{value:06x}" for value in range(1 << 24))
+        total = 1 << 24
+    else:
+        rng = random.Random(0)
+        colors = [f"#{rng.randrange(1 << 24):06x}" for _ in range(args.sample)]
+        total = args.sample
+
+    legacy_time = new_time = 0.0
+    for color in colors:
+        start = time.perf_counter()
+        expected = legacy_complementary_color(color)
+        middle = time.perf_counter()
+        found = get_complementary_color(color)
+        end = time.perf_counter()
+        legacy_time += middle - start
+        new_time += end - middle
+        if found != expected:
+            raise SystemExit(f"Mismatch for {color}: {found} != {expected}")
+
+    print(f"{total} colors, identical output")
+    print(f"legacy  {legacy_time / total * 1e6:8.2f} us/call")
+    print(f"current {new_time / total * 1e6:8.2f} us/call ({legacy_time / new_time:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Per-call cost of normalize() against the original implementation.
+
+Usage: python -m benchmarks.bench_normalize [calls]
+"""
+import re
+import sys
+import timeit
+from typing import Optional
+
+from core.color_utils import normalize
+
+def legacy_normalize(color: Optional[str]) -> str:
+    """The implementation normalize replaced, kept verbatim for comparison."""
+    if not color:
+        return 'INVALID'
+    color = color.strip()
+    if color.startswith('(') and color.endswith(')'):
+        rgb = tuple(map(int, color[1:-1].split(',')))
+        return "#{:02x}{:02x}{:02x}".format(*rgb)
+    color_no_commas = color.replace(',', ' ')
+    if len(color_no_commas.split()) == 3:
+        rgb = tuple(map(int, color_no_commas.split()))
+        return "#{:02x}{:02x}{:02x}".format(*rgb)
+    hex_pattern = re.compile(r"^#?[0-9a-fA-F]{6}$")
+    if hex_pattern.match(color):
+        return color.lower() if color.startswith('#') else '#' + color.lower()
+    return 'INVALID'
+
+# Inputs both implementations accept, from the most common (canonical hex,
+# as found in page.bgcolor, history and swatches) to typed user input.
+CASES = {
+    'canonical #rrggbb': '#4edec1',
+    'uppercase, no #': '4EDEC1',
+    'r, g, b': '78, 90, 123',
+    '(r,g,b)': '(78,90,123)',
+    'invalid': 'notacolor',
+}
+
+def main(calls: int = 200_000) -> None:
+    for label, value in CASES.items():
+        assert normalize(value) == legacy_normalize(value)
+        # Alternate the two and keep each one's fastest run, so load drift hits both alike.
+        before = after = float('inf')
+        for _ in range(5):
+            before = min(before, timeit.timeit(lambda: legacy_normalize(value), number=calls // 5) / (calls // 5))
+            after = min(after, timeit.timeit(lambda: normalize(value), number=calls // 5) / (calls // 5))
+        print(f"{label:<20} legacy {before * 1e9:8.0f} ns | current {after * 1e9:8.0f} ns | {before / after:5.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,34 @@
+"""Compare find_closest_swatch's linear scan with the prebuilt SwatchIndex.
+
+Usage: python -m benchmarks.bench_swatch_index [queries]
+"""
+import random
+import sys
+import time
+
+from core.color_utils import find_closest_swatch
+from core.swatch_index import SwatchIndex
+
+def random_swatches(n: int, rng: random.Random) -> list[dict]:
+    return [{'hex': f"#{rng.randrange(1 << 24):06x}", 'name': f"swatch {i}", 'combinations': []} for i in range(n)]
+
+def main(queries: int = 200) -> None:
+    rng = random.Random(0)
+    for n in (159, 10_000, 100_000):
+        swatches = random_swatches(n, rng)
+        colors = [f"#{rng.randrange(1 << 24):06x}" for _ in range(queries)]
+        start = time.perf_counter()
+        index = SwatchIndex(swatches)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = [find_closest_swatch(c, swatches) for c in colors]
+        linear = time.perf_counter() - start
+        start = time.perf_counter()
+        found = [index.closest(c) for c in colors]
+        indexed = time.perf_counter() - start
+        assert found == expected
+        print(f"{n:>7} swatches: build {build * 1e3:8.2f} ms | linear {linear / queries * 1e6:10.1f} us/query"
+              f" | index {indexed / queries * 1e6:8.1f} us/query | {linear / indexed:7.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,146 @@
+"""Baselines for the pytest-benchmark suite (benchmarks/test_perf.py).
+
+Each benchmark's fastest round is compared with the one stored in
+baselines.json, and the test fails when it is more than the threshold
+(default 50%) slower. A benchmark over the limit is measured again
+RETRIES more times, and only fails if every measurement is over, so one
+noisy run (a scheduler hiccup, a GC pause, a busy neighbour) does not fail
+the suite. Stored timings are scaled by a short calibration workload of
+the same kind of pure-Python work (string formatting, int parsing, float
+math), measured both when they were recorded and now, so a baseline
+recorded on one machine stays meaningful on a faster or slower one.
+
+Record baselines over several runs, keeping each benchmark's slowest
+fastest-round, so they cover run-to-run noise rather than one lucky run::
+
+    python -m pytest benchmarks --perf-update                # start afresh
+    python -m pytest benchmarks --perf-update --perf-merge   # repeat a few times
+    python -m pytest benchmarks                              # check against baselines
+    python -m pytest benchmarks --perf-threshold 1.0         # allow 100% slowdown
+
+The suite needs pytest-benchmark and is skipped without it.
+"""
+import json
+import os
+import timeit
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DEFAULT_THRESHOLD = 0.5
+# Extra measurements of a benchmark over its limit before it counts as a failure.
+RETRIES = 2
+
+def pytest_addoption(parser):
+    group = parser.getgroup('perf baselines')
+    group.addoption('--perf-update', action='store_true', default=False, help='record benchmark timings as the new baselines')
+    group.addoption('--perf-merge', action='store_true', default=False, help='with --perf-update, keep the slower of the stored and measured timings')
+    group.addoption('--perf-threshold', type=float, default=None, help=f'allowed slowdown over baseline (default {DEFAULT_THRESHOLD})')
+
+def _calibration_workload() -> float:
+    total = 0.0
+    seen = {}
+    for i in range(200):
+        text = f'#{(i * 40503) & 0xFFFFFF:06x}'
+        value = int(text[1:], 16)
+        r, g, b = value >> 16, (value >> 8) & 0xFF, value & 0xFF
+        total += ((0.2126 * r + 0.7152 * g + 0.0722 * b) / 255 + 0.055) / 1.055 ** 2.4
+        seen[text.upper()] = (r + g + b) // 3
+    return total + len(sorted(seen))
+
+def calibrate() -> float:
+    """Seconds for a fixed workload like the benchmarked color math, used to compare machines."""
+    return min(timeit.repeat(_calibration_workload, number=20, repeat=7)) / 20
+
+class Baselines:
+    def __init__(self, path: str, threshold: Optional[float], update: bool, merge: bool = False):
+        self.path = path
+        self.update = update
+        self.merge = merge
+        try:
+            with open(path, 'r') as file:
+                stored = json.load(file)
+        except FileNotFoundError:
+            stored = {}
+        self.threshold = threshold if threshold is not None else stored.get('threshold', DEFAULT_THRESHOLD)
+        self.timings: Dict[str, float] = stored.get('timings', {})
+        self.stored_calibration: Optional[float] = stored.get('calibration')
+        self.calibration = calibrate()
+        self.scale = self.calibration / self.stored_calibration if self.stored_calibration else 1.0
+        self.recorded: Dict[str, float] = {}
+
+    def limit(self, name: str) -> Optional[float]:
+        baseline = self.timings.get(name)
+        return None if baseline is None else baseline * self.scale * (1 + self.threshold)
+
+    def check(self, name: str, seconds: float, remeasure: Callable[[], float]) -> None:
+        """Record seconds, or fail if it and RETRIES fresh measurements are all over the limit."""
+        if self.update:
+            self.recorded[name] = seconds
+            return
+        allowed = self.limit(name)
+        if allowed is None:
+            return
+        attempts = [seconds]
+        while attempts[-1] > allowed and len(attempts) <= RETRIES:
+            attempts.append(remeasure())
+        if attempts[-1] > allowed:
+            pytest.fail(
+                f'{name}: {min(attempts) * 1e6:.2f} us (best of {len(attempts)} runs) is over the {allowed * 1e6:.2f} us limit '
+                f'({self.threshold:.0%} above the baseline of {self.timings[name] * self.scale * 1e6:.2f} us)',
+                pytrace=False,
+            )
+
+    def save(self) -> None:
+        timings = dict(self.timings)
+        if self.merge and self.stored_calibration:
+            # Store in the stored calibration's units, keeping the slower of the two.
+            for name, seconds in self.recorded.items():
+                seconds /= self.scale
+                timings[name] = max(seconds, timings.get(name, 0.0))
+            calibration = self.stored_calibration
+        else:
+            timings.update(self.recorded)
+            calibration = self.calibration
+        with open(self.path, 'w') as file:
+            json.dump({
+                'calibration': calibration,
+                'threshold': self.threshold,
+                'timings': dict(sorted(timings.items())),
+            }, file, indent=2)
+            file.write('\n')
+
+_baselines: Optional[Baselines] = None
+
+@pytest.fixture(scope='session')
+def baselines(request) -> Baselines:
+    global _baselines
+    if _baselines is None:
+        _baselines = Baselines(
+            BASELINES_PATH,
+            request.config.getoption('--perf-threshold', default=None),
+            request.config.getoption('--perf-update', default=False),
+            request.config.getoption('--perf-merge', default=False),
+        )
+    return _baselines
+
+@pytest.fixture
+def bench(benchmark, baselines, request):
+    """benchmark(func, *args), then check its fastest round against the stored baseline."""
+    def run(func, *args: Any, **kwargs: Any) -> Any:
+        result = benchmark(func, *args, **kwargs)
+        if benchmark.stats is not None:  # None under --benchmark-disable
+            iterations = max(1, benchmark.stats.iterations)
+            rounds = max(5, min(benchmark.stats.stats.rounds, 50))
+
+            def remeasure() -> float:
+                timer = timeit.Timer(lambda: func(*args, **kwargs))
+                return min(timer.repeat(repeat=rounds, number=iterations)) / iterations
+            baselines.check(request.node.name, benchmark.stats.stats.min, remeasure)
+        return result
+    return run
+
+def pytest_sessionfinish(session, exitstatus):
+    if _baselines is not None and _baselines.update and _baselines.recorded:
+        _baselines.save()
@@ -0,0 +1,136 @@
+"""Timing coverage for the color math and the UI update paths.
+
+Run with ``python -m pytest benchmarks``; see conftest.py for baselines.
+"""
+import itertools
+import json
+import random
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from components.history import HistoryRow
+from components.swatches import CombinationRow
+from core.cache import color_cache
+from core.color_utils import find_closest_swatch, get_complementary_color, hexmixer, normalize
+from core.state import HistoryStore
+from core.swatch_db import DEFAULT_SWATCHES
+from core.swatch_index import SwatchIndex
+from benchmarks.bench_swatch_index import random_swatches
+
+def random_colors(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [f'#{rng.randrange(1 << 24):06x}' for _ in range(n)]
+
+COLORS = random_colors(1000)
+
+@pytest.fixture(scope='module')
+def catalogue() -> list[dict]:
+    with open(DEFAULT_SWATCHES, 'r') as file:
+        return json.load(file)
+
+@pytest.fixture(scope='module', params=[159, 10_000, 100_000], ids=lambda n: f'{n}')
+def swatch_index(request, catalogue) -> SwatchIndex:
+    swatches = catalogue if request.param == len(catalogue) else random_swatches(request.param, random.Random(request.param))
+    return SwatchIndex(swatches)
+
+class StubPage:
+    """Just enough of ft.Page for main() and change_bg to run headless."""
+    def __init__(self):
+        self.fonts = {}
+        self.theme = None
+        self.title = None
+        self.vertical_alignment = None
+        self.bgcolor = '#000000'
+        self.controls = []
+        self.floating_action_button = None
+        self.on_keyboard_event = None
+        self.updates = 0
+        class Session(dict):
+            def get(self, key, default=None):
+                return super().get(key, default)
+            def set(self, key, value):
+                self[key] = value
+        self.session = Session()
+    def add(self, control):
+        self.controls.append(control)
+    def update(self, *controls):
+        self.updates += 1
+    def open(self, control):
+        pass
+    def close(self, control):
+        pass
+    def set_clipboard(self, text):
+        pass
+
+# --- Color math ---
+@pytest.mark.parametrize('value', ['#4edec1', '4EDEC1', '78, 90, 123', 'notacolor'], ids=['canonical', 'bare', 'rgb', 'invalid'])
+def test_normalize(bench, value):
+    bench(normalize, value)
+
+def test_hexmixer(bench):
+    pairs = list(zip(COLORS, reversed(COLORS)))
+    bench(lambda: [hexmixer(a, b) for a, b in pairs])
+
+def test_get_complementary_color(bench):
+    bench(lambda: [get_complementary_color(c) for c in COLORS])
+
+def test_find_closest_swatch(bench, swatch_index):
+    queries = COLORS[:200]
+    bench(lambda: [find_closest_swatch(c, swatch_index) for c in queries])
+
+def test_find_closest_swatch_linear_scan(bench, catalogue):
+    queries = COLORS[:200]
+    bench(lambda: [find_closest_swatch(c, catalogue) for c in queries])
+
+# --- UI update paths ---
+@pytest.mark.parametrize('size', [500, 5000])
+def test_history_update(bench, size):
+    store = HistoryStore(capacity=size, dedup_window=10)
+    for color in random_colors(size, seed=1):
+        store.append({'hex': color})
+    row = HistoryRow(history=[], change_bg=lambda *_: None)
+    row.update_history(store)
+    fresh = itertools.cycle(random_colors(10_000, seed=2))
+
+    def add_one():
+        store.add(next(fresh))
+        row.update_history(store)
+    bench(add_one)
+
+@pytest.fixture(scope='module')
+def sheet_inputs(catalogue):
+    index = SwatchIndex(catalogue)
+    swatch = next(s for s in catalogue if s.get('combinations'))
+    match = {'hex': swatch['hex'], 'name': swatch['name'], 'combinations': swatch['combinations']}
+    return index, match, swatch['combinations'][0]
+
+def test_make_bottom_sheet_build(bench, sheet_inputs):
+    index, match, combination = sheet_inputs
+    row = CombinationRow()
+
+    def build():
+        row.clear_sheets()
+        return row.make_bottom_sheet(combination, match, index, lambda *_: None, lambda *_: None)
+    bench(build)
+
+def test_make_bottom_sheet_cached(bench, sheet_inputs):
+    index, match, combination = sheet_inputs
+    row = CombinationRow()
+    bench(row.make_bottom_sheet, combination, match, index, lambda *_: None, lambda *_: None)
+
+def test_change_bg(bench, monkeypatch):
+    import main
+    monkeypatch.setattr(main.random, 'randint', lambda a, b: 0x336699)
+    page = StubPage()
+    main.main(page)
+    change_bg = page.floating_action_button.change_bg
+    # A new color every round (an odd multiplier permutes the 24-bit range), so
+    # each call misses ColorCache and times the uncached complement and match.
+    rounds = itertools.count(1)
+    color_cache.clear()
+    color_cache.reset_stats()
+    bench(lambda: change_bg(f'#{(next(rounds) * 0x9E3779) & 0xFFFFFF:06x}'))
+    assert color_cache.stats()['complement']['misses'] >= next(rounds) - 1
+    assert page.updates
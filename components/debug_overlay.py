@@ -0,0 +1,72 @@
+import flet as ft
+from typing import Any, Optional
+from core.profiling import Profiler, profiler as default_profiler
+from core.updates import request_update
+
+class DebugOverlay(ft.Container):
+    """Profiler report shown over the app while profiling is on (toggle with F12)."""
+    def __init__(self, profiler: Optional[Profiler] = None, **kwargs: Any):
+        self.profiler = profiler or default_profiler
+        self.report = ft.Text(
+            value="",
+            font_family="monospace",
+            size=11,
+            color=ft.Colors.WHITE,
+            selectable=True,
+        )
+        self.status = ft.Text(value="", size=11, color=ft.Colors.WHITE70)
+        super().__init__(
+            content=ft.Column(
+                controls=[
+                    self.report,
+                    ft.Row(
+                        controls=[
+                            ft.TextButton("Refresh", on_click=lambda e: self.refresh()),
+                            ft.TextButton("Reset", on_click=self._handle_reset),
+                            ft.TextButton("Dump", on_click=self._handle_dump),
+                            self.status,
+                        ],
+                        spacing=0,
+                    ),
+                ],
+                scroll=ft.ScrollMode.AUTO,
+                spacing=4,
+            ),
+            bgcolor=ft.Colors.with_opacity(0.85, ft.Colors.BLACK),
+            padding=10,
+            border_radius=6,
+            top=10,
+            right=10,
+            width=460,
+            visible=False,
+            **kwargs,
+        )
+
+    def refresh(self) -> None:
+        self.report.value = self.profiler.report()
+        if self.page is not None:
+            request_update(self)
+
+    def toggle(self) -> bool:
+        """Show or hide the overlay; returns whether it is now visible."""
+        self.visible = not self.visible
+        if self.visible:
+            self.report.value = self.profiler.report()
+        if self.page is not None:
+            request_update(self)
+        return self.visible
+
+    def _handle_reset(self, e: ft.ControlEvent) -> None:
+        self.profiler.reset()
+        self.status.value = ""
+        self.refresh()
+
+    def _handle_dump(self, e: ft.ControlEvent) -> None:
+        written = self.profiler.dump_configured()
+        if not written:
+            written = [
+                self.profiler.dump_json("colormixer-profile.json"),
+                self.profiler.dump_chrome_trace("colormixer-trace.json"),
+            ]
+        self.status.value = "Wrote " + ", ".join(written)
+        self.refresh()
@@ -1,6 +1,6 @@
 import flet as ft
 from typing import Callable, Any
-from core.color_utils import get_complementary_color, HexToRgb
+from core.cache import color_cache
 from typing import cast
 
 class MixedColorText(ft.Row):
@@ -23,7 +23,7 @@ class MixedColorText(ft.Row):
                         theme_style=ft.TextThemeStyle.BODY_SMALL,
                         value="[BACKGROUND]",
                         visible=False,
-                        style=ft.TextStyle(color=get_complementary_color(initial_bg)),
+                        style=ft.TextStyle(color=color_cache.complement(initial_bg)),
                     )
                 ]
         )
@@ -93,8 +93,8 @@ class ComplementaryColorText(ft.Row):
 class MixedRGBText(ft.Row):
     """Display the mixed color as an RGB tuple, clickable for copy."""
     def __init__(self, initial_bg: str, on_click: Callable, **kwargs: Any):
-        rgb_str = HexToRgb(initial_bg).string
-        comp_color = get_complementary_color(initial_bg)
+        rgb_str = color_cache.rgb_string(initial_bg)
+        comp_color = color_cache.complement(initial_bg)
         super().__init__(
             vertical_alignment=ft.CrossAxisAlignment.START,
             controls=[
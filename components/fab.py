@@ -1,7 +1,8 @@
 import flet as ft
 from typing import Callable, List, Dict, Any
-from core.color_utils import get_complementary_color
+from core.cache import color_cache
 from core.state import add_to_history
+from core.updates import request_update, update_transaction
 from .history import HistoryRow
 
 class RandomFAB(ft.FloatingActionButton):
@@ -26,13 +27,14 @@ class RandomFAB(ft.FloatingActionButton):
         if hasattr(self, 'page') and self.page is not None and hasattr(self.page, 'bgcolor') and isinstance(self.page.bgcolor, str):
             self.foreground_color = self.page.bgcolor
         else:
-            self.foreground_color = get_complementary_color(color)
+            self.foreground_color = color_cache.complement(color)
 
     def _handle_click(self, e: ft.ControlEvent) -> None:
         import random
         new_color = f"#{random.randint(0, 0xFFFFFF):06x}"
-        e.page.bgcolor = new_color
-        add_to_history(e.page, self.history, new_color)
-        self.history_row.update_history(self.history)
-        self.change_bg(new_color)
-        e.page.update()
+        with update_transaction(e.page):
+            e.page.bgcolor = new_color
+            add_to_history(e.page, self.history, new_color)
+            self.history_row.update_history(self.history)
+            self.change_bg(new_color)
+            request_update(e.page)
@@ -1,37 +1,172 @@
 import flet as ft
-from typing import List, Dict, Any, Callable, Optional
-from core.color_utils import get_complementary_color
+from typing import List, Dict, Any, Callable, Hashable, Optional, Sequence
+from core.cache import color_cache
+from core.color_utils import _parse_rgb
+from core.config import CONFIG
+from core.updates import request_update
+import base64
 import math
+import struct
+import zlib
+
+ITEM_SIZE = 65
+
+def encode_png_strip(colors: Sequence[str]) -> bytes:
+    """Encode colors as a PNG one pixel high and one pixel per color wide."""
+    if not colors:
+        raise ValueError('At least one color is required')
+    pixels = bytearray(b'\x00')  # filter type "None" for the single scanline
+    for color in colors:
+        pixels += bytes(_parse_rgb(color_cache.normalize(str(color))))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', len(colors), 1, 8, 2, 0, 0, 0)  # 8-bit truecolor
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(bytes(pixels))) + chunk(b'IEND', b'')
 
 class HistoryRow(ft.Row):
-    """Display the color mixing history as clickable items."""
-    def __init__(self, history: List[Dict[str, Any]], change_bg: Callable, **kwargs: Any):
+    """Display the color mixing history as clickable items, newest first.
+
+    update_history() reconciles against the controls already on screen:
+    items are keyed by their history entry, existing HistoryItems are
+    reused and only new entries get a control, so a page update sends just
+    the added items instead of the whole row.
+
+    Only a window of items around the scroll position is materialized;
+    spacers stand in for the rest and scrolling pages items in and out.
+    In compact mode the whole history is one generated image strip.
+    """
+    def __init__(
+        self,
+        history: List[Dict[str, Any]],
+        change_bg: Callable,
+        window: Optional[int] = None,
+        overscan: Optional[int] = None,
+        compact: Optional[bool] = None,
+        **kwargs: Any
+    ):
         super().__init__(
-            controls=[
-                HistoryItem(
-                    item,
-                    change_bg=change_bg,
-                    width=65,
-                )
-                for item in history
-            ],
+            controls=[],
             alignment=ft.MainAxisAlignment.START,
             vertical_alignment=ft.CrossAxisAlignment.START,
             scroll=ft.ScrollMode.AUTO,
             spacing=0,
-            height=65,
+            height=ITEM_SIZE,
+            on_scroll=self._handle_scroll,
+            on_scroll_interval=50,
             **kwargs,
         )
-        self.history = history[::-1]
         self.change_bg = change_bg
+        self.window = CONFIG.get('history_window', 40) if window is None else window
+        self.overscan = CONFIG.get('history_overscan', 10) if overscan is None else overscan
+        self.compact = CONFIG.get('history_compact', False) if compact is None else compact
+        self.strip_item_width = CONFIG.get('history_strip_item_width', 12)
+        self._first = 0
+        self._lead = ft.Container(width=0, height=ITEM_SIZE)
+        self._tail = ft.Container(width=0, height=ITEM_SIZE)
+        self._items: Dict[Hashable, HistoryItem] = {}
+        self._strip: Optional[ft.GestureDetector] = None
+        self.history: List[Dict[str, Any]] = []
+        self.update_history(history)
 
-    def update_history(self, history: List[Dict[str, Any]]) -> None:
-        self.controls.clear()
-        history = history[::-1]
+    @staticmethod
+    def _keys(history: Sequence[Any]) -> List[Hashable]:
+        # Dict entries are keyed by identity, since the same color can recur in
+        # history; other entries by value and occurrence.
+        seen: Dict[str, int] = {}
+        keys: List[Hashable] = []
         for item in history:
-            self.controls.append(
-                HistoryItem(item, self.change_bg, height=65, width=65)
-            )
+            if isinstance(item, dict):
+                keys.append(id(item))
+            else:
+                value = str(item)
+                seen[value] = seen.get(value, 0) + 1
+                keys.append(('value', value, seen[value]))
+        return keys
+
+    def update_history(self, history: List[Dict[str, Any]]) -> bool:
+        """Show history newest first, reusing existing items. Returns whether the row changed."""
+        self.history = list(reversed(history))
+        return self._render()
+
+    def set_compact(self, compact: bool) -> bool:
+        """Switch between individual items and the image strip."""
+        self.compact = compact
+        return self._render()
+
+    def _render(self) -> bool:
+        if self.compact:
+            controls = [self._render_strip()] if self.history else []
+        else:
+            controls = self._render_window()
+        if len(controls) == len(self.controls) and all(a is b for a, b in zip(controls, self.controls)):
+            return False
+        self.controls[:] = controls
+        return True
+
+    def _render_window(self) -> List[ft.Control]:
+        total = len(self.history)
+        self._first = min(self._first, max(0, total - self.window))
+        end = min(total, self._first + self.window)
+        visible = self.history[self._first:end]
+        items: Dict[Hashable, HistoryItem] = {}
+        controls: List[ft.Control] = []
+        for item, key in zip(visible, self._keys(self.history)[self._first:end]):
+            control = self._items.get(key)
+            if control is None or control.item is not item:
+                control = HistoryItem(item, self.change_bg, height=ITEM_SIZE, width=ITEM_SIZE)
+            items[key] = control
+            controls.append(control)
+        self._items = items
+        if self._first:
+            self._lead.width = self._first * ITEM_SIZE
+            controls.insert(0, self._lead)
+        if end < total:
+            self._tail.width = (total - end) * ITEM_SIZE
+            controls.append(self._tail)
+        return controls
+
+    def _render_strip(self) -> ft.GestureDetector:
+        colors = [item.get('hex') if isinstance(item, dict) else item for item in self.history]
+        png = base64.b64encode(encode_png_strip(colors)).decode('ascii')
+        image = ft.Image(
+            src_base64=png,
+            width=len(colors) * self.strip_item_width,
+            height=ITEM_SIZE,
+            fit=ft.ImageFit.FILL,
+            filter_quality=ft.FilterQuality.NONE,
+            gapless_playback=True,
+        )
+        if self._strip is None:
+            self._strip = ft.GestureDetector(content=image, on_tap_down=self._handle_strip_tap)
+        else:
+            self._strip.content = image
+        return self._strip
+
+    def _handle_strip_tap(self, e: ft.TapEvent) -> None:
+        index = int(e.local_x // self.strip_item_width)
+        if 0 <= index < len(self.history):
+            self.change_bg(self.history[index], clear_fields=True)
+
+    def _handle_scroll(self, e: ft.OnScrollEvent) -> None:
+        if self.compact or e.pixels is None:
+            return
+        if self.scroll_to_index(int(e.pixels // ITEM_SIZE), math.ceil((e.viewport_dimension or 0) / ITEM_SIZE)):
+            request_update(self)
+
+    def scroll_to_index(self, first_visible: int, visible: int = 0) -> bool:
+        """Page items in so that visible items from first_visible on are materialized.
+
+        The window is only moved once the visible range leaves it, and then
+        recentred with overscan items on either side. Returns whether the
+        row changed.
+        """
+        self.window = max(self.window, visible + 2 * self.overscan)
+        if self._first <= first_visible and first_visible + visible <= self._first + self.window:
+            return False
+        self._first = max(0, first_visible - self.overscan)
+        return self._render()
 
 class HistoryItem(ft.Container):
     """Restore a previously selected color when clicked."""
@@ -45,8 +180,8 @@ class HistoryItem(ft.Container):
     ):
         super().__init__(**kwargs)
         self.item = item
-        hex_color = item['hex'] if isinstance(item, dict) and 'hex' in item else str(item)
-        self.complementary_color = get_complementary_color(hex_color)
+        hex_color = str(item['hex'] if isinstance(item, dict) and 'hex' in item else item)
+        self.complementary_color = color_cache.complement(hex_color)
         self.bgcolor = hex_color
         # height and width removed for reusability
         text_value = hex_color
@@ -1,18 +1,124 @@
+import threading
 import flet as ft
-from typing import Callable, Any
+from typing import Callable, Any, Optional
+from core.cache import color_cache
 from core.color_utils import get_complementary_color
+from core.config import CONFIG
+
+class Debouncer:
+    """Run a callback once calls have stopped arriving for delay seconds.
+
+    Every call bumps a generation counter and restarts the timer, so only
+    the last call of a burst runs. A timer that fires after a newer call
+    (or after cancel()) sees a stale generation and does nothing. Runs are
+    serialized, so a slow callback is never overlapped by the next one.
+    With a delay of 0 calls run immediately.
+    """
+    def __init__(self, callback: Callable[..., Any], delay: float):
+        self.callback = callback
+        self.delay = delay
+        self._generation = 0
+        self._timer: Optional[threading.Timer] = None
+        self._pending: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.RLock()
+
+    @property
+    def pending(self) -> bool:
+        return self._pending is not None
+
+    def call(self, *args: Any) -> None:
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._cancel_timer()
+            self._pending = args
+            if self.delay > 0:
+                self._timer = threading.Timer(self.delay, self._fire, (generation,))
+                self._timer.daemon = True
+                self._timer.start()
+        if self.delay <= 0:
+            self._fire(generation)
+
+    def cancel(self) -> None:
+        """Drop the pending call, if any."""
+        with self._lock:
+            self._generation += 1
+            self._cancel_timer()
+            self._pending = None
+
+    def flush(self) -> None:
+        """Run the pending call now instead of waiting for the timer."""
+        with self._lock:
+            self._cancel_timer()
+            generation = self._generation
+        self._fire(generation)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _fire(self, generation: int) -> None:
+        with self._run_lock:
+            with self._lock:
+                if generation != self._generation or self._pending is None:
+                    return
+                args, self._pending = self._pending, None
+                self._timer = None
+            self.callback(*args)
+
+def _is_color(value: Optional[str]) -> bool:
+    return color_cache.normalize(value) != 'INVALID'
 
 class ColorInput(ft.TextField):
-    """Create a text input field for color values."""
-    def __init__(self, on_change: Callable, on_submit: Callable, **kwargs: Any):
+    """Create a text input field for color values.
+
+    Keystrokes are debounced: on_change runs once typing pauses for
+    debounce_ms (CONFIG['input_debounce_ms'] by default), and only if
+    validate accepts the field's value, so half-typed colors never trigger
+    a remix. Submitting runs on_submit at once and drops any pending change.
+    has_focus tells whether the field is being typed in.
+    """
+    def __init__(
+        self,
+        on_change: Callable,
+        on_submit: Callable,
+        debounce_ms: Optional[float] = None,
+        validate: Callable[[Optional[str]], bool] = _is_color,
+        **kwargs: Any
+    ):
         super().__init__(
-            on_submit=on_submit,
-            on_change=on_change,
+            on_submit=self._handle_submit,
+            on_change=self._handle_change,
+            on_focus=self._handle_focus,
+            on_blur=self._handle_blur,
             text_align=ft.TextAlign.CENTER,
             border_radius=ft.BorderRadius(0,0,0,0),
             width=200,
             **kwargs,
         )
+        delay_ms = CONFIG.get('input_debounce_ms', 150) if debounce_ms is None else debounce_ms
+        self.validate = validate
+        self._submit = on_submit
+        self._debouncer = Debouncer(on_change, delay_ms / 1000)
+        self.has_focus = False
+
+    def _handle_change(self, e: ft.ControlEvent) -> None:
+        if not self.validate(self.value):
+            self._debouncer.cancel()
+            return
+        self._debouncer.call(e)
+
+    def _handle_focus(self, e: ft.ControlEvent) -> None:
+        self.has_focus = True
+
+    def _handle_blur(self, e: ft.ControlEvent) -> None:
+        self.has_focus = False
+
+    def _handle_submit(self, e: ft.ControlEvent) -> None:
+        self._debouncer.cancel()
+        self._submit(e)
 
     def set_page(self, page):
         self.page = page
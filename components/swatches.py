@@ -1,11 +1,22 @@
 import flet as ft
-from typing import Callable, List, Dict, Any, Optional
-from core.color_utils import get_complementary_color, CloseSwatch
+from typing import Callable, List, Dict, Any, Optional, Union
+from core.color_utils import CloseSwatch
+from core.cache import BoundedCache, color_cache
+from core.config import CONFIG
+from core.state import SessionState
+from core.tasks import run_blocking
+from core.updates import request_update, update_transaction
+from core.swatch_index import CombinationIndex, SwatchIndex
 from components.history import HistoryItem
 
 class CombinationRow(ft.Row):
-    """Display color combination swatches and handle combination selection."""
-    def __init__(self, **kwargs: Any):
+    """Display color combination swatches and handle combination selection.
+
+    With async_handlers, clicking a combination builds its bottom sheet on
+    the compute pool instead of in the click handler. Built sheets are kept
+    per (combination, matched swatch), so reopening one constructs nothing.
+    """
+    def __init__(self, async_handlers: Optional[bool] = None, **kwargs: Any):
         super().__init__(
             alignment=ft.MainAxisAlignment.START,
             vertical_alignment=ft.CrossAxisAlignment.CENTER,
@@ -16,6 +27,8 @@ class CombinationRow(ft.Row):
         self._page: Optional[ft.Page] = None
         self._make_bottom_sheet: Optional[Callable] = None
         self._match: Optional[CloseSwatch] = None
+        self.async_handlers = CONFIG.get('async_handlers', False) if async_handlers is None else async_handlers
+        self._sheets = BoundedCache(CONFIG.get('sheet_cache_size', 32))
 
     def update_combination_row(self, match: CloseSwatch, page: ft.Page, make_bottom_sheet: Callable, route: Optional[str] = None) -> None:
         self.controls.clear()
@@ -24,8 +37,8 @@ class CombinationRow(ft.Row):
         self._match = match
         self._route = route
         bgcolor = getattr(page, "bgcolor", None)
-        current_state = page.session.get('current')
-        if isinstance(current_state, dict):
+        current_state = SessionState.for_page(page).current()
+        if current_state:
             if not (isinstance(bgcolor, str) and bgcolor):
                 bgcolor = current_state.get('bgcolor')
             palette = current_state.get('palette_colors')
@@ -36,7 +49,7 @@ class CombinationRow(ft.Row):
         combinations = match.get('combinations') or []
         for combo in combinations:
             style = ft.TextStyle(
-                color=get_complementary_color(bgcolor),
+                color=color_cache.complement(bgcolor),
                 bgcolor=None,
             )
             self.controls.append(
@@ -46,49 +59,83 @@ class CombinationRow(ft.Row):
                         ft.TextSpan(
                             combo,
                             style=style,
-                            on_click=self._handle_combo_click,
+                            on_click=self._handle_combo_click_async if self.async_handlers else self._handle_combo_click,
                         )
                     ],
                 )
             )
-        page.update()
+        request_update(page)
 
     def _handle_combo_click(self, e: ft.ControlEvent) -> None:
         combo = e.control.text
         if self._page is not None and self._make_bottom_sheet is not None:
             self._page.open(self._make_bottom_sheet(combo, self._match))
 
+    async def _handle_combo_click_async(self, e: ft.ControlEvent) -> None:
+        combo = e.control.text
+        page, make_bottom_sheet, match = self._page, self._make_bottom_sheet, self._match
+        if page is not None and make_bottom_sheet is not None:
+            page.open(await run_blocking(make_bottom_sheet, combo, match))
+
+    def clear_sheets(self) -> None:
+        """Forget cached bottom sheets, e.g. after the swatch catalogue is reloaded."""
+        self._sheets.clear()
+
     def make_bottom_sheet(
         self,
         combination: str,
         match: Dict[str, Any],
-        swatches: List[Dict[str, Any]],
+        swatches: Union[List[Dict[str, Any]], SwatchIndex],
         change_bg: Callable[[Dict[str, str]], None],
         text_click: Callable[[ft.ControlEvent], None],
         update_user_palette: Optional[Callable[[ft.ControlEvent], None]] = None,  # now expects e
+    ) -> ft.BottomSheet:
+        """Return the sheet for one combination, building it on first use.
+
+        swatches is the SwatchIndex built at load (or a SwatchDB), whose
+        combinations answer the lookup; a plain list is indexed on the spot.
+        The callbacks of the first build are kept with the cached sheet.
+        """
+        key = (str(combination), match['hex'], id(swatches))
+        return self._sheets.get_or_compute(
+            key,
+            lambda: self._build_bottom_sheet(combination, match, swatches, change_bg, text_click, update_user_palette),
+        )
+
+    def _build_bottom_sheet(
+        self,
+        combination: str,
+        match: Dict[str, Any],
+        swatches: Union[List[Dict[str, Any]], SwatchIndex],
+        change_bg: Callable[[Dict[str, str]], None],
+        text_click: Callable[[ft.ControlEvent], None],
+        update_user_palette: Optional[Callable[[ft.ControlEvent], None]] = None,
     ) -> ft.BottomSheet:
         combo_row = ft.Row(alignment=ft.MainAxisAlignment.CENTER, spacing=0, expand=True)
-        palette_hexes = [x['hex'] for x in swatches if combination in x['combinations']]
+        index = swatches.combinations if hasattr(swatches, 'combinations') else CombinationIndex(swatches)
+        palette_hexes = index.palette(combination)
         
         def handle_replace_palette(e):
-            e.page.session.set('user_palette', palette_hexes)
-            if update_user_palette:
-                update_user_palette(e)
-            e.page.update()
+            with update_transaction(e.page):
+                SessionState.for_page(e.page).set('user_palette', palette_hexes)
+                if update_user_palette:
+                    update_user_palette(e)
+                request_update(e.page)
         
+        label_color = color_cache.complement(match['hex'])
         replace_palette_button = ft.Text(
             spans=[ft.TextSpan(
                 "replace palette",
                 on_click=handle_replace_palette,
                 style=ft.TextStyle(
-                    color=get_complementary_color(match['hex']),
+                    color=label_color,
                 )
             )]
         )
         
         combination_label = ft.Text(
             f"combination {combination}",
-            style=ft.TextStyle(color=get_complementary_color(match['hex'])),
+            style=ft.TextStyle(color=label_color),
         )
         
         sheet = ft.BottomSheet(
@@ -109,21 +156,18 @@ class CombinationRow(ft.Row):
             bgcolor=match['hex'],
         )
 
-        for swatch in swatches:
-            if combination in swatch['combinations']:
-                color = swatch['hex']
-                name = swatch['name']
-                palette = [x['hex'] for x in swatches if combination in x['combinations']]
-                combo_row.controls.append(
-                    ColorSwatch(
-                        color,
-                        name,
-                        change_bg=change_bg,
-                        palette=palette,
-                        combination=combination,
-                        on_click=text_click
-                    )
+        palette = index.palette(combination)
+        for swatch in index.members(combination):
+            combo_row.controls.append(
+                ColorSwatch(
+                    swatch['hex'],
+                    swatch['name'],
+                    change_bg=change_bg,
+                    palette=palette,
+                    combination=combination,
+                    on_click=text_click
                 )
+            )
         return sheet
 
 class ColorSwatch(ft.Container):
@@ -141,6 +185,7 @@ class ColorSwatch(ft.Container):
         self.expand = kwargs.pop('expand', True)
         self.change_bg = change_bg
         self.on_click = self._handle_click
+        text_color = color_cache.complement(color)
         self.content = ft.Column(
             horizontal_alignment=ft.CrossAxisAlignment.START,
             alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
@@ -151,14 +196,14 @@ class ColorSwatch(ft.Container):
                     spans=[
                         ft.TextSpan(
                             color,
-                            style=ft.TextStyle(color=get_complementary_color(color)),
+                            style=ft.TextStyle(color=text_color),
                             on_click=on_click
                         )
                     ],
                 ),
                 ft.Text(
                     name,
-                    color=get_complementary_color(color),
+                    color=text_color,
                     theme_style=ft.TextThemeStyle.BODY_LARGE,
                 ),
             ],
@@ -2,6 +2,8 @@ import flet as ft
 from typing import Callable, Any
 from components.history import HistoryItem
 from core.color_utils import get_complementary_color
+from core.state import SessionState
+from core.updates import request_update, update_transaction
 
 class UserPaletteColorDisplay(ft.Column):
     def __init__(self, palette: list, remove_color: Callable, change_bg: Callable, text_click: Callable, **kwargs):
@@ -65,16 +67,14 @@ class UserPalette(ft.Row):
         if page is None:
             page = getattr(self, 'page', None)
         if page and hasattr(page, 'session') and page.session is not None:
-            palette = page.session.get('user_palette')
-            if isinstance(palette, list):
-                return palette
+            return list(SessionState.for_page(page).user_palette)
         return []
 
     def _set_palette(self, palette, page=None):
         if page is None:
             page = getattr(self, 'page', None)
         if page and hasattr(page, 'session') and page.session is not None:
-            page.session.set('user_palette', palette)
+            SessionState.for_page(page).set('user_palette', palette)
 
     def _handle_add_color(self, e):
         page = e.page
@@ -85,8 +85,7 @@ class UserPalette(ft.Row):
             self._set_palette(palette, page)
             self.update_palette()
             self.palette_display.update_palette(palette)
-            self.update()
-            page.update()
+            request_update(page)
 
     def _remove_color(self, e):
         page = e.page
@@ -97,14 +96,11 @@ class UserPalette(ft.Row):
             self._set_palette(palette, page)
             self.update_palette()
             self.palette_display.update_palette(palette)
-            self.update()
-            page.update()
+            request_update(page)
 
     def update_palette(self):
         page = getattr(self, 'page', None)
         palette = self._get_palette(page)
-        if palette is not None and page and hasattr(page, 'session') and page.session is not None:
-            page.session.set('user_palette', palette)
         bgcolor = getattr(page, 'bgcolor', None)
         if len(palette) != 0 and bgcolor in palette:
             self.buttons_row.show_remove_button()
@@ -118,13 +114,13 @@ class UserPalette(ft.Row):
                 self.controls.remove(self.palette_display)
             if isinstance(parent, ft.Row) and len(parent.controls) > 1 and isinstance(parent.controls[1], ft.Container):
                 parent.controls[1].padding = ft.Padding(35, 0, 0, 0)
-                parent.controls[1].update()
+                request_update(parent.controls[1])
         else:
             if self.palette_display not in self.controls:
                 self.controls.append(self.palette_display)
             if isinstance(parent, ft.Row) and len(parent.controls) > 1 and isinstance(parent.controls[1], ft.Container):
                 parent.controls[1].padding = ft.Padding(110, 0, 0, 0)
-                parent.controls[1].update()
+                request_update(parent.controls[1])
 
     def update_button_color(self, color: str):
         self.buttons_row.update_button_color(color)
@@ -182,15 +178,17 @@ class UserPaletteButtons(ft.Column):
         self.remove_button.on_click = self._handle_remove_click
 
     def _handle_add_click(self, e):
-        if callable(self.add_color):
-            self.add_color(e)
-        if self.remove_button not in self.controls and e.page.bgcolor in e.page.session.get('user_palette'):
-            self.controls.append(self.remove_button)
-        e.page.update()
+        with update_transaction(e.page):
+            if callable(self.add_color):
+                self.add_color(e)
+            if self.remove_button not in self.controls and e.page.bgcolor in SessionState.for_page(e.page).user_palette:
+                self.controls.append(self.remove_button)
+            request_update(e.page)
 
     def _handle_remove_click(self, e):
         if callable(self.remove_color):
-            self.remove_color(e)
+            with update_transaction(e.page):
+                self.remove_color(e)
 
     def update_button_color(self, color: str):
         self.add_button.icon_color = color
@@ -0,0 +1,249 @@
+"""Vectorized color engine for headless work over large palettes.
+
+Mirrors the scalar helpers in core.color_utils over NumPy arrays. Colors are
+accepted as uint8 arrays of shape (N, 3), as packed 24-bit ints (0xRRGGBB) or
+as sequences of color strings, and every function reproduces the scalar
+result bit-for-bit (Lab conversion to within float rounding). NumPy is an
+optional dependency (``pip install .[batch]``); the desktop app itself
+never imports this module.
+"""
+from typing import Iterable, Optional
+
+import numpy as np
+
+import core.color_utils as color_utils
+from core.color_utils import (
+    _D50_WHITE, _LAB_EPSILON, _LAB_KAPPA, _LINEAR, _LMS_TO_OKLAB, _LMS_TO_SRGB, _OKLAB_TO_LMS, _SRGB_LINEAR,
+    _SRGB_TO_LMS, _SRGB_TO_XYZ_D50, _VALUE_STEPS, _XYZ_D50_TO_SRGB, MIN_CONTRAST, MIX_SPACES, normalize,
+)
+
+_LINEAR_TABLE = np.array(_LINEAR, dtype=np.float64)
+_SRGB_LINEAR_TABLE = np.array(_SRGB_LINEAR, dtype=np.float64)
+_XYZ_MATRIX = np.array(_SRGB_TO_XYZ_D50, dtype=np.float64)
+_WHITE = np.array(_D50_WHITE, dtype=np.float64)
+_XYZ_INVERSE = np.array(_XYZ_D50_TO_SRGB, dtype=np.float64)
+_OKLAB_MATRICES = tuple(np.array(m, dtype=np.float64) for m in (_SRGB_TO_LMS, _LMS_TO_OKLAB, _OKLAB_TO_LMS, _LMS_TO_SRGB))
+
+def normalize_many(colors: Iterable[Optional[str]]) -> list[str]:
+    """Normalize many color strings, keeping 'INVALID' markers in place."""
+    return [normalize(color) for color in colors]
+
+def to_rgb(colors) -> np.ndarray:
+    """Return colors as a (N, 3) uint8 array.
+
+    Accepts a (N, 3) integer array, a 1-D array or sequence of packed 24-bit
+    ints, or a sequence of color strings in any format normalize() understands.
+    """
+    if isinstance(colors, np.ndarray) and colors.dtype.kind in 'iu':
+        if colors.ndim == 2 and colors.shape[1] == 3:
+            if colors.size and (colors.min() < 0 or colors.max() > 255):
+                raise ValueError('RGB channels must be in 0..255')
+            return colors.astype(np.uint8, copy=False)
+        if colors.ndim == 1:
+            return unpack(colors)
+        raise ValueError('Expected an (N, 3) RGB array or a 1-D packed array')
+    colors = list(colors)
+    if colors and all(isinstance(c, (int, np.integer)) for c in colors):
+        return unpack(np.asarray(colors, dtype=np.int64))
+    hexes = normalize_many(colors)
+    if 'INVALID' in hexes:
+        raise ValueError(f'Invalid color input at index {hexes.index("INVALID")}')
+    return unpack(np.array([int(h[1:], 16) for h in hexes], dtype=np.int64))
+
+def pack(rgb) -> np.ndarray:
+    """Pack a (N, 3) RGB array into 24-bit ints (uint32)."""
+    rgb = to_rgb(rgb).astype(np.uint32)
+    return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+def unpack(packed) -> np.ndarray:
+    """Unpack 24-bit ints into a (N, 3) uint8 RGB array."""
+    packed = np.asarray(packed)
+    if packed.size and (packed.min() < 0 or packed.max() > 0xFFFFFF):
+        raise ValueError('Packed colors must be in 0..0xFFFFFF')
+    packed = packed.astype(np.uint32)
+    return np.stack(((packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF), axis=1).astype(np.uint8)
+
+def to_hex(rgb) -> list[str]:
+    """Format colors as '#rrggbb' strings."""
+    return [f"#{value:06x}" for value in pack(rgb).tolist()]
+
+def mix(colors1, colors2) -> np.ndarray:
+    """Average two color arrays pairwise, matching hexmixer."""
+    a = to_rgb(colors1).astype(np.uint16)
+    b = to_rgb(colors2).astype(np.uint16)
+    if a.shape != b.shape:
+        raise ValueError('Color arrays must have the same length')
+    return ((a + b) // 2).astype(np.uint8)
+
+def mix_colors(colors, weights=None, space: str = 'srgb') -> np.ndarray:
+    """Weighted mix of K color columns, matching core.color_utils.mix_colors row by row.
+
+    colors is a sequence of K color collections of equal length N (anything
+    to_rgb accepts), or an (N, K, 3) integer array. weights is a length-K
+    sequence shared by every row, or an (N, K) array of per-row weights.
+    Returns a (N, 3) uint8 array. 'srgb' is bit-exact with the scalar mix;
+    the other spaces agree to within one unit of float rounding.
+    """
+    if space not in MIX_SPACES:
+        raise ValueError(f"Unknown mix space {space!r}; expected one of {MIX_SPACES}")
+    if isinstance(colors, np.ndarray) and colors.ndim == 3:
+        stacked = np.stack([to_rgb(colors[:, k]) for k in range(colors.shape[1])], axis=1)
+    else:
+        columns = [to_rgb(column) for column in colors]
+        if not columns:
+            raise ValueError('At least one color is required')
+        if len({len(column) for column in columns}) != 1:
+            raise ValueError('Color arrays must have the same length')
+        stacked = np.stack(columns, axis=1)
+    n, k = stacked.shape[:2]
+    w = np.ones(k, dtype=np.int64) if weights is None else np.asarray(weights)
+    if w.shape not in ((k,), (n, k)):
+        raise ValueError(f'Expected weights of shape ({k},) or ({n}, {k}), got {w.shape}')
+    w = np.broadcast_to(w, (n, k))
+    total = w.sum(axis=1)
+    if (w < 0).any() or not (total > 0).all():
+        raise ValueError('Weights must be non-negative and not all zero')
+    if space == 'srgb':
+        if w.dtype.kind in 'iu':
+            sums = (stacked.astype(np.int64) * w[:, :, None].astype(np.int64)).sum(axis=1)
+            return (sums // total[:, None]).astype(np.uint8)
+        sums = (stacked.astype(np.float64) * w[:, :, None]).sum(axis=1)
+        return np.minimum(255, np.floor(sums / total[:, None] + 1e-9)).astype(np.uint8)
+    flat = stacked.reshape(n * k, 3)
+    if space == 'lab':
+        points = to_lab(flat)
+    elif space == 'oklab':
+        points = _to_oklab(flat)
+    else:
+        points = _SRGB_LINEAR_TABLE[flat.astype(np.intp)]
+    mean = (points.reshape(n, k, 3) * w[:, :, None]).sum(axis=1) / total[:, None]
+    if space == 'lab':
+        mean = _lab_to_xyz(mean) @ _XYZ_INVERSE.T
+    elif space == 'oklab':
+        mean = ((mean @ _OKLAB_MATRICES[2].T) ** 3) @ _OKLAB_MATRICES[3].T
+    return _srgb_encode(mean)
+
+def luminance(colors) -> np.ndarray:
+    """Relative luminance of each color, matching core.color_utils.luminance."""
+    return _luminance(to_rgb(colors))
+
+def contrast(colors1, colors2) -> np.ndarray:
+    """Pairwise WCAG contrast ratio, matching core.color_utils.contrast_ratio."""
+    return _contrast(luminance(colors1), luminance(colors2))
+
+def complementary(colors) -> np.ndarray:
+    """Complement each color, matching get_complementary_color."""
+    rgb = to_rgb(colors)
+    table = color_utils._complement_table
+    if table is not None:
+        return table.lookup_packed(pack(rgb))
+    values = rgb.astype(np.int64)
+    flat = values.max(axis=1) - values.min(axis=1) < 10
+
+    h, s, v = _rgb_to_hsv(rgb)
+    comp = _hsv_to_rgb((h + 0.5) % 1.0, s, v)
+    comp[flat] = 255 - values[flat]
+
+    base = _luminance(rgb)
+    best_contrast = _contrast(base, _luminance(comp))
+    pending = best_contrast < MIN_CONTRAST
+    if not pending.any():
+        return comp.astype(np.uint8)
+
+    # Replay the scalar value search over the rows that still lack contrast.
+    idx = np.flatnonzero(pending)
+    result = comp
+    best_rgb = comp[idx].copy()
+    best = best_contrast[idx]
+    base = base[idx]
+    h, s, v = _rgb_to_hsv(comp[idx])
+    open_rows = np.ones(len(idx), dtype=bool)
+    for delta in _VALUE_STEPS:
+        for new_v in (np.minimum(1.0, v + delta), np.maximum(0.0, v - delta)):
+            adj = _hsv_to_rgb(h, s, new_v)
+            cval = _contrast(base, _luminance(adj))
+            better = open_rows & (cval > best)
+            best = np.where(better, cval, best)
+            best_rgb[better] = adj[better]
+            done = open_rows & (cval >= MIN_CONTRAST)
+            best_rgb[done] = adj[done]
+            open_rows &= ~done
+            if not open_rows.any():
+                break
+        if not open_rows.any():
+            break
+    result[idx] = best_rgb
+    return result.astype(np.uint8)
+
+def to_lab(colors) -> np.ndarray:
+    """Convert colors to a (N, 3) float64 CIELAB (D50) array.
+
+    Agrees with core.color_utils.to_lab to within float rounding (the cube
+    root is taken with np.cbrt rather than ** (1 / 3)).
+    """
+    linear = _SRGB_LINEAR_TABLE[to_rgb(colors).astype(np.intp)]
+    xyz = (linear @ _XYZ_MATRIX.T) / _WHITE
+    f = np.where(xyz > _LAB_EPSILON, np.cbrt(xyz), (_LAB_KAPPA * xyz + 16) / 116)
+    return np.stack((116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])), axis=1)
+
+def _to_oklab(rgb: np.ndarray) -> np.ndarray:
+    lms = _SRGB_LINEAR_TABLE[rgb.astype(np.intp)] @ _OKLAB_MATRICES[0].T
+    return np.cbrt(lms) @ _OKLAB_MATRICES[1].T
+
+def _lab_to_xyz(lab: np.ndarray) -> np.ndarray:
+    fy = (lab[:, 0] + 16) / 116
+    f = np.stack((fy + lab[:, 1] / 500, fy, fy - lab[:, 2] / 200), axis=1)
+    cubed = f ** 3
+    return np.where(cubed > _LAB_EPSILON, cubed, (116 * f - 16) / _LAB_KAPPA) * _WHITE
+
+def _srgb_encode(linear: np.ndarray) -> np.ndarray:
+    """Gamma-encode linear sRGB, clamped to gamut, to the nearest 8-bit values."""
+    v = np.clip(linear, 0.0, 1.0)
+    v = np.where(v <= 0.0031308, v * 12.92, 1.055 * v ** (1 / 2.4) - 0.055)
+    return np.rint(v * 255).astype(np.uint8)
+
+def _luminance(rgb: np.ndarray) -> np.ndarray:
+    rgb = rgb.astype(np.intp)
+    return 0.2126 * _LINEAR_TABLE[rgb[:, 0]] + 0.7152 * _LINEAR_TABLE[rgb[:, 1]] + 0.0722 * _LINEAR_TABLE[rgb[:, 2]]
+
+def _contrast(l1: np.ndarray, l2: np.ndarray) -> np.ndarray:
+    return (np.maximum(l1, l2) + 0.05) / (np.minimum(l1, l2) + 0.05)
+
+def _rgb_to_hsv(rgb: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized colorsys.rgb_to_hsv over 8-bit channels, using the same float operations."""
+    rgb = rgb.astype(np.float64) / 255
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    rangec = maxc - minc
+    gray = rangec == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(gray, 0.0, rangec / maxc)
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(gray, 0.0, (h / 6.0) % 1.0)
+    return h, s, maxc
+
+def _hsv_to_rgb(h: np.ndarray, s: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Vectorized colorsys.hsv_to_rgb, truncated to 8-bit ints like int(x * 255)."""
+    i = (h * 6.0).astype(np.int64)
+    f = (h * 6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i % 6
+    choices = (
+        (v, t, p),
+        (q, v, p),
+        (p, v, t),
+        (p, q, v),
+        (t, p, v),
+        (v, p, q),
+    )
+    channels = []
+    for c in range(3):
+        channel = np.select([i == k for k in range(6)], [choice[c] for choice in choices])
+        channels.append(np.where(s == 0.0, v, channel))
+    return (np.stack(channels, axis=1) * 255).astype(np.int64)
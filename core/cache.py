@@ -0,0 +1,197 @@
+"""Shared, bounded memo of derived color facts.
+
+One color change asks for the same normalized hex, RGB string, complement
+and closest swatch several times over (change_bg, _update_text_colors, the
+history strip, swatches). ColorCache answers repeats from bounded caches and
+counts hits and misses so the benefit can be measured.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from core.config import CONFIG
+from core.color_utils import (
+    CloseSwatch, RGBDict, find_closest_swatch, get_complementary_color, hex_to_rgb, luminance, normalize,
+)
+
+_MISSING = object()
+
+def _frozen_swatch(match: Optional[CloseSwatch]) -> Optional[CloseSwatch]:
+    """A copy of match that shares nothing mutable with the swatch catalogue."""
+    if match is None:
+        return None
+    combinations = match.get('combinations')
+    return {'hex': match['hex'], 'name': match.get('name'), 'combinations': tuple(combinations) if combinations is not None else None}
+
+class BoundedCache:
+    """A size-bounded mapping with LRU or FIFO eviction and hit/miss counters.
+
+    Safe to share between the event thread and the compute pool.
+    """
+    EVICTION_POLICIES = ('lru', 'fifo')
+
+    def __init__(self, maxsize: int = 1024, eviction: str = 'lru'):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        if eviction not in self.EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy {eviction!r}; expected one of {self.EVICTION_POLICIES}")
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                if self.eviction == 'lru':
+                    self._data.move_to_end(key)
+                return value
+            self.misses += 1
+        # Computed outside the lock; two threads missing at once both compute the same value.
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry. Counters are kept; see reset_stats()."""
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+        }
+
+class ColorCache:
+    """Memoized color derivations shared across the app.
+
+    Each kind of fact has its own BoundedCache so a burst of one kind cannot
+    evict the others. Results for invalid input are not cached as errors:
+    rgb() and luminance() raise ValueError like their color_utils
+    counterparts every time.
+    """
+    def __init__(self, maxsize: int = 4096, eviction: str = 'lru'):
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self._normalized = BoundedCache(maxsize, eviction)
+        self._rgb = BoundedCache(maxsize, eviction)
+        self._complement = BoundedCache(maxsize, eviction)
+        self._luminance = BoundedCache(maxsize, eviction)
+        self._swatch = BoundedCache(maxsize, eviction)
+        self._swatch_source: Any = None
+
+    def normalize(self, color: Optional[str]) -> str:
+        """Cached normalize()."""
+        if not isinstance(color, str):
+            return normalize(color)
+        return self._normalized.get_or_compute(color, lambda: normalize(color))
+
+    def _rgb_entry(self, color: Optional[str]) -> RGBDict:
+        hex_color = self.normalize(color)
+        if hex_color == 'INVALID':
+            raise ValueError('Invalid hex color input')
+        return self._rgb.get_or_compute(hex_color, lambda: hex_to_rgb(hex_color))
+
+    def rgb(self, color: Optional[str]) -> RGBDict:
+        """Cached hex_to_rgb(): {'string': '(r, g, b)', 'tuple': (r, g, b)}, as a new dict the caller may keep."""
+        return RGBDict(**self._rgb_entry(color))
+
+    def rgb_tuple(self, color: Optional[str]) -> tuple[int, int, int]:
+        return self._rgb_entry(color)['tuple']
+
+    def rgb_string(self, color: Optional[str]) -> str:
+        return self._rgb_entry(color)['string']
+
+    def complement(self, color: Optional[str]) -> str:
+        """Cached get_complementary_color()."""
+        hex_color = self.normalize(color)
+        if hex_color == 'INVALID':
+            raise ValueError('Invalid hex color input')
+        return self._complement.get_or_compute(hex_color, lambda: get_complementary_color(hex_color))
+
+    def luminance(self, color: Optional[str]) -> float:
+        """Cached relative luminance."""
+        hex_color = self.normalize(color)
+        return self._luminance.get_or_compute(hex_color, lambda: luminance(hex_color))
+
+    def closest_swatch(self, color: Optional[str], swatches) -> Optional[CloseSwatch]:
+        """Cached find_closest_swatch() against one swatch source.
+
+        Passing a different swatch list or index than last time drops the
+        cached matches, as does invalidate_swatches(). Each call returns a
+        new dict (and combinations list), so callers may change it freely.
+        """
+        if swatches is not self._swatch_source:
+            self.invalidate_swatches()
+            self._swatch_source = swatches
+        hex_color = self.normalize(color)
+        if hex_color == 'INVALID':
+            return None
+        match = self._swatch.get_or_compute(hex_color, lambda: _frozen_swatch(find_closest_swatch(hex_color, swatches)))
+        if match is None:
+            return None
+        combinations = match['combinations']
+        return {**match, 'combinations': list(combinations) if combinations is not None else None}
+
+    def invalidate_swatches(self) -> None:
+        """Forget cached swatch matches, e.g. after the swatch set is reloaded."""
+        self._swatch.clear()
+        self._swatch_source = None
+
+    def clear(self) -> None:
+        """Forget every cached fact."""
+        for cache in self._caches().values():
+            cache.clear()
+        self._swatch_source = None
+
+    def reset_stats(self) -> None:
+        for cache in self._caches().values():
+            cache.reset_stats()
+
+    def _caches(self) -> Dict[str, BoundedCache]:
+        return {
+            'normalize': self._normalized,
+            'rgb': self._rgb,
+            'complement': self._complement,
+            'luminance': self._luminance,
+            'closest_swatch': self._swatch,
+        }
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-fact size, hit, miss and eviction counters."""
+        return {name: cache.stats() for name, cache in self._caches().items()}
+
+# The app-wide instance; size and eviction policy come from core.config.
+color_cache = ColorCache(
+    maxsize=CONFIG.get('color_cache_size', 4096),
+    eviction=CONFIG.get('color_cache_eviction', 'lru'),
+)
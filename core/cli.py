@@ -0,0 +1,281 @@
+"""Headless batch processing: the ``colormixer`` command.
+
+Reads one color or color tuple per line from files or stdin and writes one
+result line per input line, without starting the GUI::
+
+    colormixer mix pairs.csv
+    colormixer complement --format jsonl < colors.txt
+    colormixer closest --workers 4 big.txt -o matches.tsv
+
+Input lines may be hex ('#a1b2c3', 'a1b2c3', 'fff'), RGB triples ('161 178 195',
+'rgb(161, 178, 195)'), several of those separated by commas, semicolons
+or whitespace (CSV), or JSON objects/arrays ({"colors": [...]},
+{"color1": ..., "color2": ...}, ["#fff", [0, 0, 0]]). Blank lines are
+skipped; lines that cannot be parsed are reported on stderr with their
+line number, and the exit status is 1 if there were any.
+
+Input is read and processed in chunks of --chunk-size lines, so memory
+stays constant however long the input is. With --workers N the chunks are
+processed by N processes, at most 2N chunks in flight, and results are
+still written in input order. When NumPy is installed (the ``batch``
+extra) complement, contrast and sRGB mixes run vectorized per chunk.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+from core.color_utils import MIX_SPACES, contrast_ratio, find_closest_swatch, get_complementary_color, mix_colors, normalize
+from core.config import CONFIG
+from core.swatch_db import DEFAULT_SWATCHES, open_catalogue
+from core.swatch_index import METRICS, SwatchIndex
+
+try:
+    from core import batch
+except ImportError:
+    batch = None
+
+OPERATIONS = ('mix', 'complement', 'closest', 'contrast')
+FORMATS = ('text', 'csv', 'jsonl')
+# How many colors each operation takes per line: (minimum, maximum or None).
+_ARITY = {
+    'mix': (2, None),
+    'complement': (1, 1),
+    'closest': (1, 1),
+    'contrast': (2, 2),
+}
+_RGB_FUNCTION = re.compile(r'rgba?\(([^)]*)\)', re.IGNORECASE)
+_SEPARATORS = re.compile(r'[\s,;]+')
+
+class Options(NamedTuple):
+    """Everything a worker needs to process a chunk."""
+    op: str
+    space: str = 'srgb'
+    output_format: str = 'text'
+    swatches: str = DEFAULT_SWATCHES
+    metric: str = 'rgb'
+
+# A chunk is (source name, line number of its first line, lines).
+Chunk = Tuple[str, int, List[str]]
+
+class ParseError(ValueError):
+    pass
+
+def _color(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        if len(value) != 3 or not all(isinstance(v, int) and 0 <= v <= 255 for v in value):
+            raise ParseError(f'invalid RGB triple {value!r}')
+        return '#{:02x}{:02x}{:02x}'.format(*value)
+    hex_color = normalize(value) if isinstance(value, str) else 'INVALID'
+    if hex_color == 'INVALID':
+        raise ParseError(f'invalid color {value!r}')
+    return hex_color
+
+def parse_line(line: str) -> List[str]:
+    """The colors on one input line as '#rrggbb' strings; [] for a blank line."""
+    line = line.strip()
+    if not line:
+        return []
+    if line[0] in '{[':
+        try:
+            value = json.loads(line)
+        except ValueError as exc:
+            raise ParseError(f'invalid JSON: {exc}') from None
+        if isinstance(value, dict):
+            if 'colors' in value:
+                value = value['colors']
+            else:
+                value = [value[key] for key in ('color', 'color1', 'color2') if key in value]
+        if not isinstance(value, list):
+            raise ParseError('expected a JSON list of colors')
+        if len(value) == 3 and all(isinstance(v, int) for v in value):
+            value = [value]
+        return [_color(v) for v in value]
+    colors: List[str] = []
+    channels: List[int] = []
+    if '(' in line:
+        line = _RGB_FUNCTION.sub(r' \1 ', line)
+    for token in _SEPARATORS.split(line):
+        if not token:
+            continue
+        # Up to three digits is an RGB channel; '123456' is a hex color.
+        if token.isdigit() and len(token) <= 3:
+            channels.append(int(token))
+            if len(channels) == 3:
+                colors.append(_color(channels))
+                channels = []
+        elif channels:
+            raise ParseError(f'incomplete RGB triple before {token!r}')
+        else:
+            colors.append(_color(token))
+    if channels:
+        raise ParseError('incomplete RGB triple')
+    return colors
+
+_swatch_indexes: Dict[Tuple[str, str], SwatchIndex] = {}
+
+def _swatch_index(path: str, metric: str) -> SwatchIndex:
+    """The swatch index for path, loaded once per process (compiled .swdb preferred)."""
+    key = (path, metric)
+    index = _swatch_indexes.get(key)
+    if index is None:
+        index = _swatch_indexes[key] = SwatchIndex(open_catalogue(path), metric=metric)
+    return index
+
+def _column(rows: List[List[str]], k: int) -> Any:
+    # Parsed colors are already canonical, so pack them directly instead of
+    # having core.batch normalize every string again.
+    return batch.unpack(batch.np.fromiter((int(row[k][1:], 16) for row in rows), dtype=batch.np.int64, count=len(rows)))
+
+def _compute(options: Options, rows: List[List[str]]) -> List[List[Any]]:
+    """Result fields for each row of parsed colors."""
+    op = options.op
+    if batch is not None and rows:
+        if op == 'complement':
+            return [[hex_color] for hex_color in batch.to_hex(batch.complementary(_column(rows, 0)))]
+        if op == 'contrast':
+            ratios = batch.contrast(_column(rows, 0), _column(rows, 1))
+            return [[ratio] for ratio in ratios.tolist()]
+        if op == 'mix' and options.space == 'srgb' and len({len(row) for row in rows}) == 1:
+            columns = [_column(rows, k) for k in range(len(rows[0]))]
+            return [[hex_color] for hex_color in batch.to_hex(batch.mix_colors(columns))]
+    if op == 'complement':
+        return [[get_complementary_color(row[0])] for row in rows]
+    if op == 'contrast':
+        return [[contrast_ratio(row[0], row[1])] for row in rows]
+    if op == 'mix':
+        return [[mix_colors(row, space=options.space)] for row in rows]
+    index = _swatch_index(options.swatches, options.metric)
+    results = []
+    for row in rows:
+        match = find_closest_swatch(row[0], index)
+        results.append([match['name'], match['hex']] if match else [None, None])
+    return results
+
+def _format(options: Options, rows: List[List[str]], results: List[List[Any]]) -> str:
+    if options.output_format == 'jsonl':
+        keys = ('name', 'swatch') if options.op == 'closest' else (options.op,)
+        return ''.join(
+            json.dumps({'input': row, **dict(zip(keys, result))}) + '\n' for row, result in zip(rows, results)
+        )
+    out = io.StringIO()
+    writer = csv.writer(out, delimiter='\t' if options.output_format == 'text' else ',', lineterminator='\n')
+    for row, result in zip(rows, results):
+        if options.op == 'contrast':
+            result = [f'{result[0]:.2f}']
+        writer.writerow(row + ['' if value is None else value for value in result])
+    return out.getvalue()
+
+def process_chunk(options: Options, chunk: Chunk) -> Tuple[str, List[str]]:
+    """Process one chunk; returns its formatted output and error messages."""
+    source, first_line, lines = chunk
+    low, high = _ARITY[options.op]
+    rows: List[List[str]] = []
+    errors: List[str] = []
+    for offset, line in enumerate(lines):
+        try:
+            colors = parse_line(line)
+            if not colors:
+                continue
+            if len(colors) < low or (high is not None and len(colors) > high):
+                expected = str(low) if low == high else f'at least {low}'
+                raise ParseError(f'{options.op} takes {expected} color(s), got {len(colors)}')
+        except ParseError as exc:
+            errors.append(f'{source}:{first_line + offset}: {exc}')
+            continue
+        rows.append(colors)
+    return _format(options, rows, _compute(options, rows)), errors
+
+def read_chunks(paths: Sequence[str], chunk_size: int, stdin: Optional[TextIO] = None) -> Iterator[Chunk]:
+    """Lazily split the input files ('-' for stdin) into chunks of lines."""
+    for path in paths or ('-',):
+        if path == '-':
+            yield from _chunks_of('<stdin>', stdin or sys.stdin, chunk_size)
+        else:
+            with open(path, 'r', encoding='utf-8') as file:
+                yield from _chunks_of(path, file, chunk_size)
+
+def _chunks_of(source: str, lines: Iterable[str], chunk_size: int) -> Iterator[Chunk]:
+    chunk: List[str] = []
+    first_line = 1
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield source, first_line, chunk
+            first_line += chunk_size
+            chunk = []
+    if chunk:
+        yield source, first_line, chunk
+
+def run(options: Options, chunks: Iterable[Chunk], workers: int = 1) -> Iterator[Tuple[str, List[str]]]:
+    """Process chunks in order, in this process or on a pool of workers."""
+    if workers <= 1:
+        for chunk in chunks:
+            yield process_chunk(options, chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(process_chunk, options, chunk))
+            # Bound the chunks in flight so a huge input is never read ahead in full.
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _positive(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('must be at least 1')
+    return number
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='colormixer', description='Mix and analyse colors line by line, without the GUI.')
+    parser.add_argument('op', choices=OPERATIONS, help='operation to run on each input line')
+    parser.add_argument('inputs', nargs='*', metavar='FILE', help="input files (default or '-': stdin)")
+    parser.add_argument('-o', '--output', help='write results here instead of stdout')
+    parser.add_argument('-f', '--format', dest='output_format', choices=FORMATS, default='text', help='output format (default: text, tab-separated)')
+    parser.add_argument('--space', choices=MIX_SPACES, default=CONFIG.get('mix_space', 'srgb'), help='color space for mix')
+    parser.add_argument('--swatches', default=DEFAULT_SWATCHES, help='swatch catalogue for closest (.json or .swdb)')
+    parser.add_argument('--metric', choices=METRICS, default=CONFIG.get('swatch_metric', 'rgb'), help='distance metric for closest')
+    parser.add_argument('--chunk-size', type=_positive, default=CONFIG.get('cli_chunk_size', 10000), help='lines processed at a time')
+    parser.add_argument('-w', '--workers', type=_positive, default=1, help='worker processes (default: 1, in-process)')
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_intermixed_args(argv)
+    options = Options(args.op, args.space, args.output_format, args.swatches, args.metric)
+    failed = False
+    try:
+        if options.op == 'closest':
+            # Fail once, up front, rather than in every worker.
+            _swatch_index(options.swatches, options.metric)
+        out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        try:
+            for text, errors in run(options, read_chunks(args.inputs, args.chunk_size), args.workers):
+                out.write(text)
+                for message in errors:
+                    print(f'error: {message}', file=sys.stderr)
+                failed = failed or bool(errors)
+            out.flush()
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); stop quietly.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError) as exc:
+        print(f'error: {exc}', file=sys.stderr)
+        return 1
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
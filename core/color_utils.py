@@ -1,23 +1,76 @@
 import re
-from typing import Optional, TypedDict
-import colorsys
+import math
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Optional, TypedDict, Union
+
+# Canonical form produced by normalize(); inputs already in it are returned as-is.
+_CANONICAL_HEX = re.compile(r"#[0-9a-f]{6}")
+_HEX_PATTERN = re.compile(r"#?([0-9a-fA-F]{6}|[0-9a-fA-F]{3})")
 
 def normalize(color: Optional[str]) -> str:
-    """Normalize a color string to a hex format or return 'INVALID'."""
+    """Normalize a color string to a hex format or return 'INVALID'.
+
+    Accepts '#rrggbb' / 'rrggbb', 3-digit '#rgb' / 'rgb' shorthand, and three
+    integer channels as 'r, g, b', 'r g b', '(r, g, b)' or 'rgb(r, g, b)'.
+    Channels outside 0..255 are clamped. Color instances normalize to their
+    hex. Never raises.
+    """
+    if not isinstance(color, str):
+        return color.hex if isinstance(color, Color) else 'INVALID'
     if not color:
         return 'INVALID'
+    if len(color) == 7 and _CANONICAL_HEX.fullmatch(color):
+        return color
     color = color.strip()
-    if color.startswith('(') and color.endswith(')'):
-        rgb = tuple(map(int, color[1:-1].split(',')))
-        return "#{:02x}{:02x}{:02x}".format(*rgb)
-    color_no_commas = color.replace(',', ' ')
-    if len(color_no_commas.split()) == 3:
-        rgb = tuple(map(int, color_no_commas.split()))
-        return "#{:02x}{:02x}{:02x}".format(*rgb)
-    hex_pattern = re.compile(r"^#?[0-9a-fA-F]{6}$")
-    if hex_pattern.match(color):
-        return color.lower() if color.startswith('#') else '#' + color.lower()
-    return 'INVALID'
+    if len(color) in (3, 4, 6, 7):
+        match = _HEX_PATTERN.fullmatch(color)
+        if match:
+            digits = match.group(1).lower()
+            if len(digits) == 3:
+                digits = digits[0] * 2 + digits[1] * 2 + digits[2] * 2
+            return '#' + digits
+    if color[:1] in ('r', 'R') and color[:3].lower() == 'rgb':
+        color = color[3:].lstrip()
+        if not color.startswith('('):
+            return 'INVALID'
+    if color.startswith('('):
+        if not color.endswith(')'):
+            return 'INVALID'
+        color = color[1:-1]
+    # 'r,g,b' and 'r, g, b' split on commas alone (int() ignores the spaces);
+    # anything else, e.g. 'r g b' or '1 2,,3', takes the comma-or-space split.
+    channels = color.split(',')
+    if len(channels) != 3:
+        channels = color.replace(',', ' ').split()
+        if len(channels) != 3:
+            return 'INVALID'
+    try:
+        r, g, b = int(channels[0]), int(channels[1]), int(channels[2])
+    except ValueError:
+        channels = color.replace(',', ' ').split()
+        if len(channels) != 3:
+            return 'INVALID'
+        try:
+            r, g, b = int(channels[0]), int(channels[1]), int(channels[2])
+        except ValueError:
+            return 'INVALID'
+    if (r | g | b) >> 8:  # some channel is outside 0..255
+        r, g, b = (min(255, max(0, c)) for c in (r, g, b))
+    return "#%02x%02x%02x" % (r, g, b)
+
+def _parse_rgb(hex_color: str) -> tuple[int, int, int]:
+    """Split an already normalized '#rrggbb' string into an (r, g, b) tuple."""
+    value = int(hex_color[1:], 16)
+    return (value >> 16, (value >> 8) & 0xFF, value & 0xFF)
+
+def _format_hex(rgb) -> str:
+    """Format an (r, g, b) sequence of ints as '#rrggbb'."""
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+def _mix_rgb(rgb1, rgb2) -> tuple[int, int, int]:
+    """Average two RGB tuples channel-wise with floor division."""
+    return ((rgb1[0] + rgb2[0]) // 2, (rgb1[1] + rgb2[1]) // 2, (rgb1[2] + rgb2[2]) // 2)
 
 def hexmixer(color1: Optional[str], color2: Optional[str]) -> str:
     """Mix two hex colors and return the resulting hex color."""
@@ -25,10 +78,7 @@ def hexmixer(color1: Optional[str], color2: Optional[str]) -> str:
     color2 = normalize(color2)
     if 'INVALID' in (color1, color2):
         raise ValueError('Invalid color input')
-    r1, g1, b1 = int(color1[1:3], 16), int(color1[3:5], 16), int(color1[5:7], 16)
-    r2, g2, b2 = int(color2[1:3], 16), int(color2[3:5], 16), int(color2[5:7], 16)
-    r, g, b = (r1 + r2) // 2, (g1 + g2) // 2, (b1 + b2) // 2
-    return "#{:02x}{:02x}{:02x}".format(r, g, b)
+    return _format_hex(_mix_rgb(_parse_rgb(color1), _parse_rgb(color2)))
 
 class CloseSwatch(TypedDict):
     """TypedDict for a color swatch with a hex value."""
@@ -36,95 +86,565 @@ class CloseSwatch(TypedDict):
     name: Optional[str]
     combinations: Optional[list[str]]
 
+# Maximum RGB distance at which a swatch still counts as "close enough".
+SWATCH_THRESHOLD = 20
+
+def _as_close_swatch(swatch) -> CloseSwatch:
+    """Project a swatch record onto the CloseSwatch shape."""
+    return {
+        'hex': swatch.get('hex', '#000000'),
+        'name': swatch.get('name'),
+        'combinations': swatch.get('combinations', []),
+    }
+
 def find_closest_swatch(color: Optional[str], swatches) -> Optional[CloseSwatch]:
-    """Find the closest swatch to the given color. Returns None if not close enough."""
+    """Find the closest swatch to the given color. Returns None if not close enough.
+
+    swatches may be a plain list of swatch dicts (scanned linearly) or a
+    prebuilt core.swatch_index.SwatchIndex, which answers the same query
+    without visiting every swatch.
+    """
+    closest = getattr(swatches, 'closest', None)
+    if closest is not None:
+        return closest(color)
     color = normalize(color)
     if color == 'INVALID':
         return None
+    r1, g1, b1 = _parse_rgb(color)
     closest_swatch = None
     closest_distance = float('inf')
     for swatch in swatches:
         swatch_color = normalize(swatch.get('hex'))
         if swatch_color == 'INVALID':
             continue
-        r1, g1, b1 = int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
-        r2, g2, b2 = int(swatch_color[1:3], 16), int(swatch_color[3:5], 16), int(swatch_color[5:7], 16)
+        r2, g2, b2 = _parse_rgb(swatch_color)
         distance = ((r1 - r2) ** 2 + (g1 - g2) ** 2 + (b1 - b2) ** 2) ** 0.5
         if distance < closest_distance:
             closest_distance = distance
             closest_swatch = swatch
-    if closest_distance > 20 or closest_swatch is None:  # Threshold for "close enough"
+    if closest_distance > SWATCH_THRESHOLD or closest_swatch is None:  # Threshold for "close enough"
         return None
-    # Ensure output matches CloseSwatch TypedDict
-    return {
-        'hex': closest_swatch.get('hex', '#000000'),
-        'name': closest_swatch.get('name'),
-        'combinations': closest_swatch.get('combinations', []),
-    }
+    return _as_close_swatch(closest_swatch)
+
+# Contrast target (WCAG AA for normal text) used by get_complementary_color.
+MIN_CONTRAST = 4.5
+
+def _channel_linear(c: int) -> float:
+    """Linearize one 8-bit sRGB channel for the WCAG relative luminance formula."""
+    v = c / 255.0
+    return v / 12.92 if v <= 0.03928 else ((v + 0.055) / 1.055) ** 2.4
+
+# Linearized value of every 8-bit channel, shared with the vectorized engine in core.batch.
+_LINEAR = tuple(_channel_linear(c) for c in range(256))
+
+def _luminance(rgb) -> float:
+    """Relative luminance of an (r, g, b) tuple of ints."""
+    return 0.2126 * _LINEAR[rgb[0]] + 0.7152 * _LINEAR[rgb[1]] + 0.0722 * _LINEAR[rgb[2]]
+
+def _contrast(l1: float, l2: float) -> float:
+    """Contrast ratio between two relative luminances."""
+    lighter = max(l1, l2)
+    darker = min(l1, l2)
+    return (lighter + 0.05) / (darker + 0.05)
+
+# Value offsets tried, in order, when the plain complement lacks contrast.
+_VALUE_STEPS = tuple(0.05 * i for i in range(1, 11))
+
+def _rgb8_to_hsv(r: int, g: int, b: int) -> tuple[float, float, float]:
+    """colorsys.rgb_to_hsv on 8-bit channels, with the same float operations inlined."""
+    r, g, b = r / 255, g / 255, b / 255
+    maxc = max(r, g, b)
+    minc = min(r, g, b)
+    if minc == maxc:
+        return 0.0, 0.0, maxc
+    rangec = maxc - minc
+    s = rangec / maxc
+    rc = (maxc - r) / rangec
+    gc = (maxc - g) / rangec
+    bc = (maxc - b) / rangec
+    if r == maxc:
+        h = bc - gc
+    elif g == maxc:
+        h = 2.0 + rc - bc
+    else:
+        h = 4.0 + gc - rc
+    return (h / 6.0) % 1.0, s, maxc
+
+def _hue_multipliers(h: float, s: float) -> tuple[float, float, float]:
+    """Per-channel factors m such that colorsys.hsv_to_rgb(h, s, v) == (v*m0, v*m1, v*m2).
+
+    colorsys computes p, q and t as v*(1.0 - s), v*(1.0 - s*f) and
+    v*(1.0 - s*(1.0-f)), so precomputing the brackets for a fixed hue and
+    saturation reproduces its results exactly for any value v.
+    """
+    i = int(h * 6.0)
+    f = (h * 6.0) - i
+    p = 1.0 - s
+    q = 1.0 - s * f
+    t = 1.0 - s * (1.0 - f)
+    return ((1.0, t, p), (q, 1.0, p), (p, 1.0, t), (p, q, 1.0), (t, p, 1.0), (1.0, p, q))[i % 6]
+
+def _value_ladder(v: float, sign: int) -> list[float]:
+    """The distinct HSV values the contrast search tries on one side of v, in order.
+
+    Steps past 1.0 (or below 0.0) clamp, and repeating a clamped candidate
+    cannot change the outcome, so the ladder stops at the first clamp.
+    """
+    if sign > 0:
+        ladder = [v + delta for delta in _VALUE_STEPS]
+        cap = bisect_left(ladder, 1.0)
+        clamp = 1.0
+    else:
+        ladder = [v - delta for delta in _VALUE_STEPS]
+        cap = bisect_left(_VALUE_STEPS, v)  # v - delta <= 0.0 exactly when delta >= v
+        clamp = 0.0
+    if cap < len(ladder):
+        del ladder[cap:]
+        ladder.append(clamp)
+    return ladder
+
+def _complement_rgb(rgb: tuple[int, int, int]) -> tuple[int, int, int]:
+    """Complement an (r, g, b) tuple, nudging its HSV value until it contrasts with rgb.
+
+    Gray-ish colors are inverted; others are rotated 180 degrees in hue. If
+    the result contrasts less than MIN_CONTRAST with rgb, the HSV value is
+    stepped by _VALUE_STEPS, alternating up and down, and the first candidate
+    reaching the target wins, else the first with the best contrast.
+
+    Rather than walking all 20 steps, each side is bisected: luminance is
+    monotonic in the value, so once the first step on a side fails, the
+    passing steps on that side form a suffix, and without a pass the best
+    contrast on a side sits at one of its ends. Every candidate shares one
+    set of hue multipliers and luminance comes from the _LINEAR table, so
+    the result is identical to the step-by-step search.
+    """
+    lin = _LINEAR
+    r, g, b = rgb
+    if max(rgb) - min(rgb) < 10:
+        comp_rgb = (255 - r, 255 - g, 255 - b)
+    else:
+        h, s, v = _rgb8_to_hsv(r, g, b)
+        m0, m1, m2 = _hue_multipliers((h + 0.5) % 1.0, s)
+        comp_rgb = (int(v * m0 * 255), int(v * m1 * 255), int(v * m2 * 255))
+
+    base = 0.2126 * lin[r] + 0.7152 * lin[g] + 0.0722 * lin[b]
+    cr, cg, cb = comp_rgb
+    comp = 0.2126 * lin[cr] + 0.7152 * lin[cg] + 0.0722 * lin[cb]
+    initial_contrast = (max(base, comp) + 0.05) / (min(base, comp) + 0.05)
+    if initial_contrast >= MIN_CONTRAST:
+        return comp_rgb
+
+    h, s, v = _rgb8_to_hsv(cr, cg, cb)
+    m0, m1, m2 = _hue_multipliers(h, s)
+
+    def candidate(new_v: float) -> tuple[float, tuple[int, int, int]]:
+        ar, ag, ab = int(new_v * m0 * 255), int(new_v * m1 * 255), int(new_v * m2 * 255)
+        adj = 0.2126 * lin[ar] + 0.7152 * lin[ag] + 0.0722 * lin[ab]
+        return (max(base, adj) + 0.05) / (min(base, adj) + 0.05), (ar, ag, ab)
+
+    # Steps alternate up, down, up, ...: step k on a side has order 2k (+1 for down).
+    first_pass = None
+    ends = []
+    for offset, ladder in ((0, _value_ladder(v, 1)), (1, _value_ladder(v, -1))):
+        head = candidate(ladder[0])
+        if head[0] >= MIN_CONTRAST:
+            found = (offset, head[1])
+        else:
+            last = len(ladder) - 1
+            tail = candidate(ladder[last]) if last else head
+            ends.append((offset, head))
+            ends.append((2 * last + offset, tail))
+            if tail[0] < MIN_CONTRAST:
+                continue
+            lo, hi, found_rgb = 0, last, tail[1]
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                cval, mid_rgb = candidate(ladder[mid])
+                if cval >= MIN_CONTRAST:
+                    hi, found_rgb = mid, mid_rgb
+                else:
+                    lo = mid
+            found = (2 * hi + offset, found_rgb)
+        if first_pass is None or found[0] < first_pass[0]:
+            first_pass = found
+    if first_pass is not None:
+        return first_pass[1]
+
+    # If no adjustment meets threshold, return the best found
+    best_contrast, best_rgb = initial_contrast, comp_rgb
+    for _, (cval, adj_rgb) in sorted(ends, key=lambda end: end[0]):
+        if cval > best_contrast:
+            best_contrast, best_rgb = cval, adj_rgb
+    return best_rgb
+
+# Precomputed table of every complement, set by core.complement_lut.install();
+# None means complements are computed live.
+_complement_table = None
+
+def _complement(rgb: tuple[int, int, int]) -> tuple[int, int, int]:
+    """_complement_rgb(), read from the precomputed table when one is installed."""
+    table = _complement_table
+    return table.lookup(rgb) if table is not None else _complement_rgb(rgb)
 
 def get_complementary_color(hex_color: Optional[str]) -> str:
     """Return a complementary color for the given hex color, ensuring sufficient contrast."""
-    def luminance(rgb: tuple) -> float:
-        def channel(c: float) -> float:
-            c = c / 255.0
-            return c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4
-        r, g, b = rgb
-        return 0.2126 * channel(r) + 0.7152 * channel(g) + 0.0722 * channel(b)
-
-    def contrast(rgb1: tuple, rgb2: tuple) -> float:
-        l1 = luminance(rgb1)
-        l2 = luminance(rgb2)
-        lighter = max(l1, l2)
-        darker = min(l1, l2)
-        return (lighter + 0.05) / (darker + 0.05)
+    return _format_hex(_complement(_parse_rgb(normalize(hex_color))))
 
-    hex_color = normalize(hex_color)
-    rgb = tuple(int(hex_color[i:i+2], 16) for i in (1, 3, 5))
-    if max(rgb) - min(rgb) < 10:
-        inv = tuple(255 - c for c in rgb)
-        comp_rgb = inv
+def luminance(color: Optional[str]) -> float:
+    """Return the WCAG relative luminance of a color."""
+    return _luminance(hex_to_rgb(color)['tuple'])
+
+def contrast_ratio(color1: Optional[str], color2: Optional[str]) -> float:
+    """Return the WCAG contrast ratio between two colors."""
+    return _contrast(luminance(color1), luminance(color2))
+
+# --- CIELAB ---
+# The Lab values stored in swatches.json are D50-relative, so queries are
+# converted through the Bradford-adapted sRGB -> XYZ(D50) matrix to match them.
+_SRGB_TO_XYZ_D50 = (
+    (0.4360747, 0.3850649, 0.1430804),
+    (0.2225045, 0.7168786, 0.0606169),
+    (0.0139322, 0.0971045, 0.7141733),
+)
+_D50_WHITE = (0.96422, 1.0, 0.82521)
+_LAB_EPSILON = 216 / 24389
+_LAB_KAPPA = 24389 / 27
+
+def _srgb_linear(c: int) -> float:
+    """Linearize one 8-bit sRGB channel using the IEC 61966-2-1 transfer function."""
+    v = c / 255.0
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+_SRGB_LINEAR = tuple(_srgb_linear(c) for c in range(256))
+
+def _lab_f(t: float) -> float:
+    return t ** (1 / 3) if t > _LAB_EPSILON else (_LAB_KAPPA * t + 16) / 116
+
+@lru_cache(maxsize=4096)
+def _packed_to_lab(packed: int) -> tuple[float, float, float]:
+    r = _SRGB_LINEAR[packed >> 16]
+    g = _SRGB_LINEAR[(packed >> 8) & 0xFF]
+    b = _SRGB_LINEAR[packed & 0xFF]
+    fx, fy, fz = (
+        _lab_f((row[0] * r + row[1] * g + row[2] * b) / white)
+        for row, white in zip(_SRGB_TO_XYZ_D50, _D50_WHITE)
+    )
+    return (116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz))
+
+def _rgb_to_lab(rgb) -> tuple[float, float, float]:
+    """Convert an (r, g, b) tuple of ints to CIELAB (D50)."""
+    return _packed_to_lab((rgb[0] << 16) | (rgb[1] << 8) | rgb[2])
+
+def to_lab(color: Optional[str]) -> tuple[float, float, float]:
+    """Convert a color to CIELAB (D50). Conversions are cached by color."""
+    return _rgb_to_lab(hex_to_rgb(color)['tuple'])
+
+def delta_e76(lab1, lab2) -> float:
+    """CIE76 color difference: Euclidean distance in Lab."""
+    return math.dist(lab1, lab2)
+
+def delta_e94(lab1, lab2) -> float:
+    """CIE94 color difference (graphic arts weights), with lab1 as the reference."""
+    L1, a1, b1 = lab1
+    L2, a2, b2 = lab2
+    c1 = math.hypot(a1, b1)
+    c2 = math.hypot(a2, b2)
+    dl = L1 - L2
+    dc = c1 - c2
+    dh2 = max(0.0, (a1 - a2) ** 2 + (b1 - b2) ** 2 - dc * dc)
+    sc = 1 + 0.045 * c1
+    sh = 1 + 0.015 * c1
+    return math.sqrt(dl * dl + (dc / sc) ** 2 + dh2 / (sh * sh))
+
+def delta_e2000(lab1, lab2) -> float:
+    """CIEDE2000 color difference (kL = kC = kH = 1)."""
+    L1, a1, b1 = lab1
+    L2, a2, b2 = lab2
+    c_bar = (math.hypot(a1, b1) + math.hypot(a2, b2)) / 2
+    c_bar7 = c_bar ** 7
+    g = 0.5 * (1 - math.sqrt(c_bar7 / (c_bar7 + 25 ** 7)))
+    a1p = (1 + g) * a1
+    a2p = (1 + g) * a2
+    c1p = math.hypot(a1p, b1)
+    c2p = math.hypot(a2p, b2)
+    h1p = math.degrees(math.atan2(b1, a1p)) % 360 if c1p else 0.0
+    h2p = math.degrees(math.atan2(b2, a2p)) % 360 if c2p else 0.0
+
+    dlp = L2 - L1
+    dcp = c2p - c1p
+    if c1p * c2p == 0:
+        dhp = 0.0
+    elif abs(h2p - h1p) <= 180:
+        dhp = h2p - h1p
+    elif h2p - h1p > 180:
+        dhp = h2p - h1p - 360
     else:
-        hsv = colorsys.rgb_to_hsv(rgb[0]/255, rgb[1]/255, rgb[2]/255)
-        complementary_hsv = ((hsv[0] + 0.5) % 1.0, hsv[1], hsv[2])
-        comp_rgb = tuple(int(x * 255) for x in colorsys.hsv_to_rgb(*complementary_hsv))
-
-    # If contrast is insufficient, adjust value (lightness) of the complementary color
-    if contrast(rgb, comp_rgb) < 4.5:
-        # Try increasing and decreasing value in small steps
-        h, s, v = colorsys.rgb_to_hsv(*[c/255 for c in comp_rgb])
-        best_rgb = comp_rgb
-        best_contrast = contrast(rgb, comp_rgb)
-        for delta in [0.05 * i for i in range(1, 11)]:
-            for new_v in [min(1.0, v + delta), max(0.0, v - delta)]:
-                adj_rgb = tuple(int(x * 255) for x in colorsys.hsv_to_rgb(h, s, new_v))
-                cval = contrast(rgb, adj_rgb)
-                if cval > best_contrast:
-                    best_contrast = cval
-                    best_rgb = adj_rgb
-                if cval >= 4.5:
-                    return "#{:02x}{:02x}{:02x}".format(*adj_rgb)
-        # If no adjustment meets threshold, return the best found
-        comp_rgb = best_rgb
-    return "#{:02x}{:02x}{:02x}".format(*comp_rgb)
+        dhp = h2p - h1p + 360
+    dHp = 2 * math.sqrt(c1p * c2p) * math.sin(math.radians(dhp / 2))
+
+    lp_bar = (L1 + L2) / 2
+    cp_bar = (c1p + c2p) / 2
+    if c1p * c2p == 0:
+        hp_bar = h1p + h2p
+    elif abs(h1p - h2p) <= 180:
+        hp_bar = (h1p + h2p) / 2
+    elif h1p + h2p < 360:
+        hp_bar = (h1p + h2p + 360) / 2
+    else:
+        hp_bar = (h1p + h2p - 360) / 2
+    t = (1 - 0.17 * math.cos(math.radians(hp_bar - 30))
+         + 0.24 * math.cos(math.radians(2 * hp_bar))
+         + 0.32 * math.cos(math.radians(3 * hp_bar + 6))
+         - 0.20 * math.cos(math.radians(4 * hp_bar - 63)))
+    d_theta = 30 * math.exp(-(((hp_bar - 275) / 25) ** 2))
+    cp_bar7 = cp_bar ** 7
+    rc = 2 * math.sqrt(cp_bar7 / (cp_bar7 + 25 ** 7))
+    sl = 1 + 0.015 * (lp_bar - 50) ** 2 / math.sqrt(20 + (lp_bar - 50) ** 2)
+    sc = 1 + 0.045 * cp_bar
+    sh = 1 + 0.015 * cp_bar * t
+    rt = -math.sin(math.radians(2 * d_theta)) * rc
+    return math.sqrt(
+        (dlp / sl) ** 2 + (dcp / sc) ** 2 + (dHp / sh) ** 2 + rt * (dcp / sc) * (dHp / sh)
+    )
+
+# Color difference formulas selectable for perceptual swatch matching.
+DELTA_E = {
+    'cie76': delta_e76,
+    'cie94': delta_e94,
+    'ciede2000': delta_e2000,
+}
+
+# --- Mixing ---
+# Inverse of _SRGB_TO_XYZ_D50, for turning mixed Lab values back into sRGB.
+_XYZ_D50_TO_SRGB = (
+    (3.133856367791653, -1.616866770291181, -0.49061477279830157),
+    (-0.9787685631270271, 1.9161415526243255, 0.033454116302537244),
+    (0.07194516828173432, -0.2289912772988825, 1.4052426741535713),
+)
+# OKLab (Ottosson 2020): linear sRGB -> LMS, and cube-rooted LMS -> Lab, with inverses.
+_SRGB_TO_LMS = (
+    (0.4122214708, 0.5363325363, 0.0514459929),
+    (0.2119034982, 0.6806995451, 0.1073969566),
+    (0.0883024619, 0.2817188376, 0.6299787005),
+)
+_LMS_TO_OKLAB = (
+    (0.2104542553, 0.7936177850, -0.0040720468),
+    (1.9779984951, -2.4285922050, 0.4505937099),
+    (0.0259040371, 0.7827717662, -0.8086757660),
+)
+_OKLAB_TO_LMS = (
+    (1.0, 0.3963377774, 0.2158037573),
+    (1.0, -0.1055613458, -0.0638541728),
+    (1.0, -0.0894841775, -1.2914855480),
+)
+_LMS_TO_SRGB = (
+    (4.0767416621, -3.3077115913, 0.2309699292),
+    (-1.2684380046, 2.6097574011, -0.3413193965),
+    (-0.0041960863, -0.7034186147, 1.7076147010),
+)
+
+MIX_SPACES = ('srgb', 'linear', 'lab', 'oklab')
+
+def _mat3(m, v) -> tuple[float, float, float]:
+    return (
+        m[0][0] * v[0] + m[0][1] * v[1] + m[0][2] * v[2],
+        m[1][0] * v[0] + m[1][1] * v[1] + m[1][2] * v[2],
+        m[2][0] * v[0] + m[2][1] * v[1] + m[2][2] * v[2],
+    )
+
+def _srgb_encode(v: float) -> int:
+    """Gamma-encode one linear channel, clamped to gamut, to the nearest 8-bit value."""
+    v = min(1.0, max(0.0, v))
+    v = v * 12.92 if v <= 0.0031308 else 1.055 * v ** (1 / 2.4) - 0.055
+    return round(v * 255)
+
+def _lab_f_inv(f: float) -> float:
+    return f ** 3 if f ** 3 > _LAB_EPSILON else (116 * f - 16) / _LAB_KAPPA
+
+def _lab_to_rgb(lab) -> tuple[int, int, int]:
+    """Convert CIELAB (D50) to the nearest in-gamut 8-bit sRGB tuple."""
+    fy = (lab[0] + 16) / 116
+    fx = fy + lab[1] / 500
+    fz = fy - lab[2] / 200
+    xyz = (_lab_f_inv(fx) * _D50_WHITE[0], _lab_f_inv(fy) * _D50_WHITE[1], _lab_f_inv(fz) * _D50_WHITE[2])
+    r, g, b = _mat3(_XYZ_D50_TO_SRGB, xyz)
+    return (_srgb_encode(r), _srgb_encode(g), _srgb_encode(b))
+
+def _rgb_to_oklab(rgb) -> tuple[float, float, float]:
+    lms = _mat3(_SRGB_TO_LMS, (_SRGB_LINEAR[rgb[0]], _SRGB_LINEAR[rgb[1]], _SRGB_LINEAR[rgb[2]]))
+    return _mat3(_LMS_TO_OKLAB, tuple(math.copysign(abs(c) ** (1 / 3), c) for c in lms))
+
+def _oklab_to_rgb(lab) -> tuple[int, int, int]:
+    lms = tuple(c ** 3 for c in _mat3(_OKLAB_TO_LMS, lab))
+    r, g, b = _mat3(_LMS_TO_SRGB, lms)
+    return (_srgb_encode(r), _srgb_encode(g), _srgb_encode(b))
+
+def _rgb_to_linear(rgb) -> tuple[float, float, float]:
+    return (_SRGB_LINEAR[rgb[0]], _SRGB_LINEAR[rgb[1]], _SRGB_LINEAR[rgb[2]])
+
+def _linear_to_rgb(linear) -> tuple[int, int, int]:
+    return (_srgb_encode(linear[0]), _srgb_encode(linear[1]), _srgb_encode(linear[2]))
+
+# Per space: (8-bit rgb -> coordinates, averaged coordinates -> 8-bit rgb).
+_MIX_CONVERTERS = {
+    'linear': (_rgb_to_linear, _linear_to_rgb),
+    'lab': (_rgb_to_lab, _lab_to_rgb),
+    'oklab': (_rgb_to_oklab, _oklab_to_rgb),
+}
+
+def _mix_weights(count: int, weights) -> list:
+    if count == 0:
+        raise ValueError('At least one color is required')
+    if weights is None:
+        return [1] * count
+    weights = list(weights)
+    if len(weights) != count:
+        raise ValueError(f'Expected {count} weights, got {len(weights)}')
+    if any(w < 0 for w in weights) or not sum(weights) > 0:
+        raise ValueError('Weights must be non-negative and not all zero')
+    return weights
+
+def mix_colors(colors, weights=None, space: str = 'srgb') -> str:
+    """Mix any number of colors by weight and return the resulting hex color.
+
+    weights are relative amounts (paint-style ratios such as (2, 1)); equal
+    weights are used when omitted. space is where the weighted average is
+    taken: 'srgb' (the classic hexmixer behaviour, rounding down), 'linear'
+    light, CIELAB 'lab', or 'oklab'. Results outside sRGB are clamped.
+    mix_colors((a, b)) is hexmixer(a, b).
+    """
+    if space not in MIX_SPACES:
+        raise ValueError(f"Unknown mix space {space!r}; expected one of {MIX_SPACES}")
+    colors = [normalize(color) for color in colors]
+    if 'INVALID' in colors:
+        raise ValueError('Invalid color input')
+    weights = _mix_weights(len(colors), weights)
+    total = sum(weights)
+    rgbs = [_parse_rgb(color) for color in colors]
+    if space == 'srgb':
+        sums = [sum(w * rgb[c] for w, rgb in zip(weights, rgbs)) for c in range(3)]
+        if all(isinstance(w, int) for w in weights):
+            return _format_hex([s // total for s in sums])
+        # The epsilon keeps float weights such as (0.3, 0.7) from flooring 191.99999... to 191.
+        return _format_hex([min(255, math.floor(s / total + 1e-9)) for s in sums])
+    to_space, from_space = _MIX_CONVERTERS[space]
+    points = [to_space(rgb) for rgb in rgbs]
+    mean = tuple(sum(w * p[c] for w, p in zip(weights, points)) / total for c in range(3))
+    return _format_hex(from_space(mean))
 
 class RGBDict(TypedDict):
     """TypedDict for RGB color representation."""
     string: str
     tuple: tuple[int, int, int]
 
-def _hex_to_rgb(hex_color: Optional[str]) -> RGBDict:
-    """Convert a hex color to an RGB tuple."""
+def hex_to_rgb(hex_color: Optional[str]) -> RGBDict:
+    """Convert a hex color to its RGB tuple and '(r, g, b)' string."""
     hex_color = normalize(hex_color)
     if hex_color == 'INVALID':
         raise ValueError('Invalid hex color input')
-    rgb = (int(hex_color[1:3], 16), int(hex_color[3:5], 16), int(hex_color[5:7], 16))
+    rgb = _parse_rgb(hex_color)
     return {
         "string": f"({rgb[0]}, {rgb[1]}, {rgb[2]})",
         "tuple": rgb,
     }
 
 class HexToRgb():
-    def __init__(self, hex_color: str):
-        rgb = _hex_to_rgb(hex_color)
-        self.tuple = rgb['tuple']
-        self.string = rgb['string']
\ No newline at end of file
+    """RGB tuple and '(r, g, b)' string of a color."""
+    __slots__ = ('tuple', 'string')
+
+    def __init__(self, hex_color: Union[str, 'Color']):
+        hex_color = normalize(hex_color)
+        if hex_color == 'INVALID':
+            raise ValueError('Invalid hex color input')
+        self.tuple = _parse_rgb(hex_color)
+        self.string = "({}, {}, {})".format(*self.tuple)
+
+class Color:
+    """An immutable sRGB color packed into a single 24-bit int (0xRRGGBB).
+
+    Colors built from any spelling of the same color are equal
+    (Color('#FFF') == Color('#ffffff')). Against plain strings they hash and
+    compare like their canonical '#rrggbb' string, so they can sit in
+    history, palette and session collections alongside the hex strings the
+    app stores; normalize() other spellings before comparing. The hex string
+    and Lab value are computed once, on first use.
+    """
+    __slots__ = ('_value', '_hex', '_lab')
+
+    def __init__(self, value: Union[int, str]):
+        hex_color = None
+        if isinstance(value, str):
+            hex_color = normalize(value)
+            if hex_color == 'INVALID':
+                raise ValueError(f'Invalid color input: {value!r}')
+            value = int(hex_color[1:], 16)
+        if not isinstance(value, int) or not 0 <= value <= 0xFFFFFF:
+            raise ValueError(f'Color value must be an int in 0..0xFFFFFF, got {value!r}')
+        object.__setattr__(self, '_value', value)
+        object.__setattr__(self, '_hex', hex_color)
+        object.__setattr__(self, '_lab', None)
+
+    @classmethod
+    def parse(cls, color: Union[str, int, tuple, 'Color', None]) -> 'Color':
+        """Build a Color from a color string, packed int, (r, g, b) tuple or Color."""
+        if isinstance(color, Color):
+            return color
+        if isinstance(color, int):
+            return cls(color)
+        if isinstance(color, tuple):
+            return cls.from_rgb(*color)
+        return cls(color)
+
+    @classmethod
+    def from_rgb(cls, r: int, g: int, b: int) -> 'Color':
+        if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+            raise ValueError(f'RGB channels must be in 0..255, got {(r, g, b)}')
+        return cls((r << 16) | (g << 8) | b)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Color is immutable')
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    @property
+    def hex(self) -> str:
+        if self._hex is None:
+            object.__setattr__(self, '_hex', f"#{self._value:06x}")
+        return self._hex
+
+    @property
+    def rgb(self) -> tuple[int, int, int]:
+        value = self._value
+        return (value >> 16, (value >> 8) & 0xFF, value & 0xFF)
+
+    @property
+    def rgb_string(self) -> str:
+        return "({}, {}, {})".format(*self.rgb)
+
+    @property
+    def lab(self) -> tuple[float, float, float]:
+        if self._lab is None:
+            object.__setattr__(self, '_lab', _packed_to_lab(self._value))
+        return self._lab
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Color):
+            return self._value == other._value
+        if isinstance(other, str):
+            # Only the canonical string, so equal objects hash alike.
+            return self.hex == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.hex)
+
+    def __str__(self) -> str:
+        return self.hex
+
+    def __repr__(self) -> str:
+        return f"Color('{self.hex}')"
+
+    def __reduce__(self):
+        return (Color, (self._value,))
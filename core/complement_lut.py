@@ -0,0 +1,167 @@
+"""Precomputed complement of every 24-bit color.
+
+get_complementary_color is a pure function of its RGB input, so all 2^24
+answers fit in one table: a small header followed by 3 bytes (r, g, b) per
+color, indexed by the packed 0xRRGGBB value -- 48 MB in all. The table is
+memory-mapped rather than read, so opening it costs next to nothing, pages
+load on demand, and one complement is one 3-byte read.
+
+Build it once (needs NumPy, the ``batch`` extra)::
+
+    python -m core.complement_lut            # writes complements.lut
+
+install() points core.color_utils (and so core.cache and core.batch) at
+the table. When the file is missing, truncated, or does not match the
+live algorithm on a sample of colors (e.g. built by an older version),
+nothing is installed and complements are computed live as before.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Callable, Optional, Tuple
+
+import core.color_utils as color_utils
+from core.color_utils import _complement_rgb
+from core.config import APP_DIR, CONFIG
+
+MAGIC = b'CMCL'
+VERSION = 1
+ENTRIES = 1 << 24
+# magic, version, entry count
+_HEADER = struct.Struct('<4sHI')
+TABLE_SIZE = _HEADER.size + 3 * ENTRIES
+# Colors checked against the live algorithm whenever a table is opened.
+SAMPLE = tuple(range(0, ENTRIES, 65521)) + (0xFFFFFF, 0x808080, 0x7F7F80)
+
+_DEFAULT_PATH = os.path.join(APP_DIR, 'complements.lut')
+
+class ComplementLUT:
+    """Read-only, memory-mapped complement table."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._array = None
+        if len(self._buffer) != TABLE_SIZE:
+            self.close()
+            raise ValueError(f'{path} is not a complete complement table')
+        magic, version, entries = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or entries != ENTRIES:
+            self.close()
+            raise ValueError(f'{path} is not a complement table')
+        if version != VERSION:
+            self.close()
+            raise ValueError(f'Unsupported complement table version {version} in {path}')
+
+    def close(self) -> None:
+        # The NumPy view holds the map open; drop it first.
+        self._array = None
+        self._buffer.close()
+
+    def lookup(self, rgb: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        """The complement of an (r, g, b) tuple."""
+        offset = _HEADER.size + 3 * ((rgb[0] << 16) | (rgb[1] << 8) | rgb[2])
+        data = self._buffer[offset:offset + 3]
+        return (data[0], data[1], data[2])
+
+    def lookup_packed(self, packed):
+        """Complements of a NumPy array of packed colors, as an (N, 3) uint8 array."""
+        import numpy as np
+        if self._array is None:
+            self._array = np.frombuffer(self._buffer, dtype=np.uint8, count=3 * ENTRIES, offset=_HEADER.size).reshape(ENTRIES, 3)
+        return self._array[np.asarray(packed, dtype=np.int64)]
+
+    def verify(self) -> bool:
+        """Whether the table agrees with the live algorithm on SAMPLE."""
+        return all(
+            self.lookup(rgb) == _complement_rgb(rgb)
+            for rgb in ((p >> 16, (p >> 8) & 0xFF, p & 0xFF) for p in SAMPLE)
+        )
+
+def build(path: Optional[str] = None, chunk: int = 1 << 20, progress: Optional[Callable[[int], None]] = None) -> str:
+    """Compute every complement with core.batch and write the table; returns its path."""
+    import numpy as np
+    from core import batch
+
+    path = path or _DEFAULT_PATH
+    tmp_path = path + '.tmp'
+    # Always compute live, even if a table is installed in this process.
+    installed, color_utils._complement_table = color_utils._complement_table, None
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, ENTRIES))
+            for start in range(0, ENTRIES, chunk):
+                packed = np.arange(start, min(start + chunk, ENTRIES), dtype=np.int64)
+                file.write(batch.complementary(packed).tobytes())
+                if progress is not None:
+                    progress(start + len(packed))
+    finally:
+        color_utils._complement_table = installed
+    os.replace(tmp_path, path)
+    return path
+
+def load(path: Optional[str] = None) -> Optional[ComplementLUT]:
+    """Open and verify a table, or None if it is missing or unusable."""
+    path = path or _DEFAULT_PATH
+    try:
+        table = ComplementLUT(path)
+    except (OSError, ValueError):
+        return None
+    if not table.verify():
+        table.close()
+        return None
+    return table
+
+def install(path: Optional[str] = None) -> bool:
+    """Serve complements from the table at path (default: CONFIG['complement_lut_file']).
+
+    Returns whether a table is in use; without one, complements stay live.
+    """
+    current = color_utils._complement_table
+    if path is None:
+        configured = CONFIG.get('complement_lut_file', 'complements.lut')
+        if not configured:
+            return current is not None
+        path = configured if os.path.isabs(configured) else os.path.join(APP_DIR, configured)
+    if current is not None and current.path == path:
+        return True
+    table = load(path)
+    if table is not None:
+        color_utils._complement_table = table
+    return table is not None
+
+def uninstall() -> None:
+    """Go back to computing complements live."""
+    color_utils._complement_table = None
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m core.complement_lut', description='Precompute the complement of every 24-bit color.')
+    parser.add_argument('-o', '--output', default=_DEFAULT_PATH, help='table path (default: complements.lut in the app directory)')
+    args = parser.parse_args(argv)
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print('error: building the table needs NumPy (pip install .[batch])', file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+
+    def progress(done: int) -> None:
+        print(f'\r{done * 100 // ENTRIES:3d}%', end='', flush=True)
+    try:
+        path = build(args.output, progress=progress)
+    except OSError as exc:
+        print(f'\nerror: {exc}', file=sys.stderr)
+        return 1
+    table = load(path)
+    if table is None:
+        print(f'\nerror: {path} does not match the live complement algorithm', file=sys.stderr)
+        return 1
+    table.close()
+    print(f'\r{path}: {ENTRIES} complements, {os.path.getsize(path)} bytes in {time.perf_counter() - started:.1f}s')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
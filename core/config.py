@@ -1,4 +1,8 @@
 # App configuration (replaces config.yaml)
+import os
+
+# Directory holding main.py and the core package; relative paths below resolve against it.
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 CONFIG = {
     "font_family": "VCR OSD Mono",
@@ -6,5 +10,61 @@ CONFIG = {
     "theme": {
         "font_family": "VCR OSD Mono"
     },
-    "swatches_file": "swatches.json"
+    # Swatch catalogue (.json or .swdb), relative to the app directory; None uses the one bundled in core/
+    "swatches_file": None,
+    # Closest-swatch distance: "rgb", or perceptual "cie76", "cie94", "ciede2000"
+    "swatch_metric": "rgb",
+    # Derived-color cache (core.cache): entries per fact, and "lru" or "fifo" eviction
+    "color_cache_size": 4096,
+    "color_cache_eviction": "lru",
+    # Space the two input colors are mixed in: "srgb" (classic), "linear", "lab" or "oklab"
+    "mix_space": "srgb",
+    # Color history (core.state.HistoryStore): entries kept, and how many recent entries a new color must not repeat
+    "history_capacity": 500,
+    "history_dedup_window": 10,
+    # History strip (components.history.HistoryRow): items kept as live controls around the
+    # scroll position, extra items on each side, and the compact image-strip mode with its width per entry
+    "history_window": 40,
+    "history_overscan": 10,
+    "history_compact": False,
+    "history_strip_item_width": 12,
+    # Quiet time after the last keystroke in a color field before the colors are remixed (0 disables)
+    "input_debounce_ms": 150,
+    # Run color changes as async tasks with lookups on a compute pool (core.tasks), and its size
+    "async_handlers": False,
+    "compute_workers": 2,
+    # Arrow-key engine (core.hotkeys): starting axes ("rgb", "hsv", "lab"), per-space base steps,
+    # Alt/Ctrl step multipliers, speed-up per auto-repeat and its cap, repeat and settle windows, frame cap
+    "hotkey_space": "rgb",
+    "hotkey_steps": {"rgb": (10.0, 10.0, 10.0), "hsv": (10.0, 5.0, 5.0), "lab": (5.0, 5.0, 5.0)},
+    "hotkey_fine": 0.1,
+    "hotkey_coarse": 4.0,
+    "hotkey_acceleration": 0.25,
+    "hotkey_max_acceleration": 4.0,
+    "hotkey_repeat_ms": 250,
+    "hotkey_settle_ms": 400,
+    "hotkey_max_fps": 30,
+    # Combination bottom sheets kept built for reopening
+    "sheet_cache_size": 32,
+    # Paint the first frame before filling in history and swatch combinations, and an optional
+    # JSON-lines file that each run's startup timings (core.metrics) are appended to
+    "deferred_startup": True,
+    "startup_metrics_file": None,
+    # Lines the colormixer command (core.cli) reads and processes at a time
+    "cli_chunk_size": 10000,
+    # Local HTTP service (core.service): bind address, seconds an idle kept-alive connection
+    # stays open, largest request body in bytes and most items in one batch
+    "service_host": "127.0.0.1",
+    "service_port": 8765,
+    "service_idle_timeout": 15,
+    "service_max_body": 1048576,
+    "service_max_batch": 10000,
+    # Hot-path instrumentation (core.profiling, also on with COLORMIXER_PROFILE=1): spans kept for
+    # the Chrome trace, and files the report (JSON) and trace are written to at exit or from the F12 overlay
+    "profiling": False,
+    "profiling_max_events": 20000,
+    "profiling_json": None,
+    "profiling_trace": None,
+    # Precomputed complement table (core.complement_lut), relative to the app directory; None disables it
+    "complement_lut_file": "complements.lut"
 }
@@ -1,72 +1,300 @@
-from core.color_utils import normalize, HexToRgb, get_complementary_color
+from core.color_utils import normalize, _lab_to_rgb, _parse_rgb, _rgb8_to_hsv, _rgb_to_lab
+from core.cache import color_cache
+from core.config import CONFIG
+import colorsys
+import threading
+import time
 import flet as ft
-from typing import Any, Callable
+from typing import Any, Callable, Dict, Optional, Tuple
 
 def clamp(val, minval=0, maxval=255):
     return max(minval, min(maxval, val))
 
-def make_hotkey_handler(page: ft.Page, change_bg: Callable[[Any], None]) -> Callable[[ft.KeyboardEvent], None]:
+# Color spaces the arrow keys can move through, with their axis names.
+HOTKEY_SPACES = {
+    'rgb': ('red', 'green', 'blue'),
+    'hsv': ('hue', 'saturation', 'value'),
+    'lab': ('lightness', 'a', 'b'),
+}
+# Base step per axis for one key press: 8-bit units, degrees/percent, Lab units.
+DEFAULT_STEPS = {
+    'rgb': (10.0, 10.0, 10.0),
+    'hsv': (10.0, 5.0, 5.0),
+    'lab': (5.0, 5.0, 5.0),
+}
+# (key, shift) -> (axis, direction)
+BINDINGS = {
+    ('Arrow Right', False): (0, 1),
+    ('Arrow Left', False): (0, -1),
+    ('Arrow Up', False): (1, 1),
+    ('Arrow Down', False): (1, -1),
+    ('Arrow Up', True): (2, 1),
+    ('Arrow Down', True): (2, -1),
+}
+
+Coords = Tuple[float, float, float]
+
+def _to_coords(space: str, hex_color: str) -> Coords:
+    rgb = _parse_rgb(hex_color)
+    if space == 'hsv':
+        h, s, v = _rgb8_to_hsv(*rgb)
+        return (h * 360, s * 100, v * 100)
+    if space == 'lab':
+        return _rgb_to_lab(rgb)
+    return (float(rgb[0]), float(rgb[1]), float(rgb[2]))
+
+def _clamp_coords(space: str, coords: Coords) -> Coords:
+    a, b, c = coords
+    if space == 'hsv':
+        return (a % 360, clamp(b, 0, 100), clamp(c, 0, 100))
+    if space == 'lab':
+        return (clamp(a, 0, 100), clamp(b, -128, 127), clamp(c, -128, 127))
+    return (clamp(a), clamp(b), clamp(c))
+
+def _from_coords(space: str, coords: Coords) -> str:
+    if space == 'hsv':
+        rgb = colorsys.hsv_to_rgb(coords[0] / 360, coords[1] / 100, coords[2] / 100)
+        rgb = tuple(round(channel * 255) for channel in rgb)
+    elif space == 'lab':
+        rgb = _lab_to_rgb(coords)
+    else:
+        rgb = tuple(round(channel) for channel in coords)
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+class HotkeyEngine:
+    """Turn arrow-key presses into smooth, coalesced background changes.
+
+    Presses add to one pending delta, which is applied at most max_fps times
+    a second: the first press of a burst applies at once, later ones are
+    folded into the next frame. Held keys accelerate, Alt moves in fine
+    steps and Ctrl/Cmd in coarse ones, and 'm' cycles the axes between RGB,
+    HSV and Lab. The burst works on unrounded coordinates, so small HSV or
+    Lab steps do not get lost to 8-bit rounding.
+
+    When on_settle is given, frames are applied as transient changes (no
+    history entry) and on_settle(hex) runs once the keys have been idle for
+    settle_ms, so a whole burst becomes one history entry.
+
+    Frames and settles that come due on a timer are handed to the page's
+    event loop rather than run on the timer thread, so the controls are only
+    touched where Flet expects it. Pages without a loop (tests, scripts) run
+    them on the timer thread.
+    """
+    def __init__(
+        self,
+        page: Any,
+        change_bg: Callable[..., None],
+        on_settle: Optional[Callable[[str], None]] = None,
+        space: Optional[str] = None,
+        steps: Optional[Dict[str, Coords]] = None,
+        max_fps: Optional[float] = None,
+        settle_ms: Optional[float] = None,
+    ):
+        self.page = page
+        self.change_bg = change_bg
+        self.on_settle = on_settle
+        self.space = space or CONFIG.get('hotkey_space', 'rgb')
+        if self.space not in HOTKEY_SPACES:
+            raise ValueError(f"Unknown hotkey space {self.space!r}; expected one of {tuple(HOTKEY_SPACES)}")
+        self.steps = {**DEFAULT_STEPS, **CONFIG.get('hotkey_steps', {}), **(steps or {})}
+        self.fine = CONFIG.get('hotkey_fine', 0.1)
+        self.coarse = CONFIG.get('hotkey_coarse', 4.0)
+        self.acceleration = CONFIG.get('hotkey_acceleration', 0.25)
+        self.max_acceleration = CONFIG.get('hotkey_max_acceleration', 4.0)
+        self.repeat_window = CONFIG.get('hotkey_repeat_ms', 250) / 1000
+        self.frame_interval = 1 / (max_fps or CONFIG.get('hotkey_max_fps', 30))
+        self.settle_delay = (CONFIG.get('hotkey_settle_ms', 400) if settle_ms is None else settle_ms) / 1000
+        self._lock = threading.RLock()
+        self._pending = [0.0, 0.0, 0.0]
+        self._has_pending = False
+        self._coords: Optional[Coords] = None
+        self._start_hex: Optional[str] = None
+        self._hex: Optional[str] = None
+        self._last_binding: Optional[Tuple[str, bool]] = None
+        self._last_press = 0.0
+        self._repeats = 0
+        self._next_frame = 0.0
+        self._frame_timer: Optional[threading.Timer] = None
+        self._settle_timer: Optional[threading.Timer] = None
+        self._settle_generation = 0
+        self.frames = 0
+        self.presses = 0
+
+    def handle(self, e: ft.KeyboardEvent) -> bool:
+        """Handle a key event; returns whether it was an engine key."""
+        binding = (e.key, bool(getattr(e, 'shift', False)))
+        if binding in BINDINGS:
+            axis, direction = BINDINGS[binding]
+            scale = 1.0
+            if getattr(e, 'alt', False):
+                scale = self.fine
+            elif getattr(e, 'ctrl', False) or getattr(e, 'meta', False):
+                scale = self.coarse
+            self.press(binding, axis, direction, scale)
+            return True
+        if e.key.lower() == 'm' and not binding[1]:
+            self.cycle_space()
+            return True
+        return False
+
+    def press(self, binding: Tuple[str, bool], axis: int, direction: int, scale: float = 1.0) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.presses += 1
+            if binding == self._last_binding and now - self._last_press <= self.repeat_window:
+                self._repeats += 1
+            else:
+                self._repeats = 0
+            self._last_binding = binding
+            self._last_press = now
+            boost = min(self.max_acceleration, 1 + self.acceleration * self._repeats)
+            self._pending[axis] += direction * self.steps[self.space][axis] * scale * boost
+            self._has_pending = True
+            change = None
+            if now >= self._next_frame:
+                change = self._apply(now)
+            elif self._frame_timer is None:
+                self._frame_timer = self._start_timer(self._next_frame - now, self._on_frame)
+            self._restart_settle()
+        self._emit(change)
+
+    def cycle_space(self) -> str:
+        """Switch the arrow keys to the next color space."""
+        with self._lock:
+            change = self._flush()
+            spaces = list(HOTKEY_SPACES)
+            self.space = spaces[(spaces.index(self.space) + 1) % len(spaces)]
+            self._coords = None
+        self._emit(change)
+        return self.space
+
+    def _start_timer(self, delay: float, callback: Callable[..., None], *args: Any) -> threading.Timer:
+        timer = threading.Timer(max(0.0, delay), self._call_on_loop, (callback, *args))
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _call_on_loop(self, callback: Callable[..., None], *args: Any) -> None:
+        loop = getattr(self.page, 'loop', None)
+        if loop is None or loop.is_closed():
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _restart_settle(self) -> None:
+        if self._settle_timer is not None:
+            self._settle_timer.cancel()
+        self._settle_generation += 1
+        self._settle_timer = self._start_timer(self.settle_delay, self._on_settle, self._settle_generation)
+
+    def _on_settle(self, generation: int) -> None:
+        # A press may have restarted the timer after this one was queued on the loop.
+        with self._lock:
+            if generation != self._settle_generation:
+                return
+        self.settle()
+
+    def _on_frame(self) -> None:
+        with self._lock:
+            self._frame_timer = None
+            change = self._apply(time.monotonic()) if self._has_pending else None
+        self._emit(change)
+
+    def _flush(self) -> Optional[Dict[str, Any]]:
+        if self._frame_timer is not None:
+            self._frame_timer.cancel()
+            self._frame_timer = None
+        return self._apply(time.monotonic()) if self._has_pending else None
+
+    def _emit(self, change: Optional[Dict[str, Any]]) -> None:
+        # Called outside the lock, so a slow repaint never blocks key presses.
+        if change is not None:
+            self.change_bg(change)
+
+    def _apply(self, now: float) -> Optional[Dict[str, Any]]:
+        """Fold the pending delta into the burst; returns the change to emit, if any."""
+        if self._coords is None:
+            # Mid-burst (after a space switch) continue from the last applied color,
+            # which page.bgcolor may not show yet when changes are dispatched as tasks.
+            current = self._hex or normalize(self.page.bgcolor)
+            if current == 'INVALID':
+                self._pending = [0.0, 0.0, 0.0]
+                self._has_pending = False
+                return None
+            self._coords = _to_coords(self.space, current)
+            self._start_hex = self._start_hex or current
+            self._hex = current
+        delta, self._pending = self._pending, [0.0, 0.0, 0.0]
+        self._has_pending = False
+        self._coords = _clamp_coords(self.space, tuple(c + d for c, d in zip(self._coords, delta)))
+        self._next_frame = now + self.frame_interval
+        new_hex = _from_coords(self.space, self._coords)
+        if new_hex == self._hex:
+            return None
+        self._hex = new_hex
+        self.frames += 1
+        if self.on_settle is not None:
+            return {'hex': new_hex, 'transient': True}
+        return {'hex': new_hex}
+
+    def settle(self) -> None:
+        """End the burst: apply what is pending and record it once."""
+        with self._lock:
+            if self._settle_timer is not None:
+                self._settle_timer.cancel()
+                self._settle_timer = None
+            change = self._flush()
+            final, start = self._hex, self._start_hex
+            self._coords = self._hex = self._start_hex = None
+            self._last_binding = None
+            self._repeats = 0
+        self._emit(change)
+        if self.on_settle is not None and final is not None and final != start:
+            self.on_settle(final)
+
+def _show_help(page: ft.Page) -> None:
+    dialog = ft.AlertDialog(
+        title=ft.Text("Hotkeys", style=ft.TextStyle(color=page.bgcolor)),
+        bgcolor=color_cache.complement(page.bgcolor),
+        content=ft.Text(
+            "Use the arrow keys to adjust the background color:\n"
+            "- Left/Right: Adjust red channel (hue, or lightness)\n"
+            "- Up/Down: Adjust green channel (saturation, or a)\n"
+            "- Shift + Up/Down: Adjust blue channel (value, or b)\n"
+            "- Hold Alt for fine steps, Ctrl for coarse steps\n"
+            "- M: Switch between RGB, HSV and Lab\n"
+            "Press Escape to close this dialog.",
+            style=ft.TextStyle(color=page.bgcolor)
+        ),
+        actions=[ft.TextButton(
+            "Close",
+            on_click=lambda _: page.close(dialog),
+            style=ft.ButtonStyle(color=color_cache.complement(page.bgcolor), bgcolor=page.bgcolor)
+        )],
+    )
+    page.open(dialog)
+    page.update()
+
+def make_hotkey_handler(
+    page: ft.Page,
+    change_bg: Callable[[Any], None],
+    on_settle: Optional[Callable[[str], None]] = None,
+    is_typing: Optional[Callable[[], bool]] = None,
+) -> Callable[[ft.KeyboardEvent], None]:
+    """Build the page's keyboard handler.
+
+    While is_typing() is true (a text field has focus) every key is left to
+    the field, so typing a color or moving the cursor does not change it.
+    """
+    engine = HotkeyEngine(page, change_bg, on_settle=on_settle)
+
     def on_hotkey(e: ft.KeyboardEvent) -> None:
-        if e.shift:
-            match e.key:
-                case "Arrow Up":
-                    hex_color = normalize(page.bgcolor)
-                    if hex_color != 'INVALID':
-                        r, g, b = HexToRgb(hex_color).tuple
-                        new_hex = "#{:02x}{:02x}{:02x}".format(r, g, clamp(b + 10))
-                        change_bg({'hex': new_hex})
-                case "Arrow Down":
-                    hex_color = normalize(page.bgcolor)
-                    if hex_color != 'INVALID':
-                        r, g, b = HexToRgb(hex_color).tuple
-                        new_hex = "#{:02x}{:02x}{:02x}".format(r, g, clamp(b - 10))
-                        change_bg({'hex': new_hex})
+        if is_typing is not None and is_typing():
             return
-        match e.key:
-            case "Arrow Left":
-                hex_color = normalize(page.bgcolor)
-                if hex_color != 'INVALID':
-                    r, g, b = HexToRgb(hex_color).tuple
-                    new_hex = "#{:02x}{:02x}{:02x}".format(clamp(r - 10), g, b)
-                    change_bg({'hex': new_hex})
-            case "Arrow Right":
-                hex_color = normalize(page.bgcolor)
-                if hex_color != 'INVALID':
-                    r, g, b = HexToRgb(hex_color).tuple
-                    new_hex = "#{:02x}{:02x}{:02x}".format(clamp(r + 10), g, b)
-                    change_bg({'hex': new_hex})
-            case "Arrow Up":
-                hex_color = normalize(page.bgcolor)
-                if hex_color != 'INVALID':
-                    r, g, b = HexToRgb(hex_color).tuple
-                    new_hex = "#{:02x}{:02x}{:02x}".format(r, clamp(g + 10), b)
-                    change_bg({'hex': new_hex})
-            case "Arrow Down":
-                hex_color = normalize(page.bgcolor)
-                if hex_color != 'INVALID':
-                    r, g, b = HexToRgb(hex_color).tuple
-                    new_hex = "#{:02x}{:02x}{:02x}".format(r, clamp(g - 10), b)
-                    change_bg({'hex': new_hex})
-        if e.key.lower() == "h":
-            dialog = ft.AlertDialog(
-                title=ft.Text("Hotkeys", style=ft.TextStyle(color=page.bgcolor)),
-                bgcolor=get_complementary_color(page.bgcolor),
-                content=ft.Text(
-                    "Use the arrow keys to adjust the background color:\n"
-                    "- Left/Right: Adjust red channel\n"
-                    "- Up/Down: Adjust green channel\n"
-                    "- Shift + Up/Down: Adjust blue channel\n"
-                    "Press Escape to close this dialog.",
-                    style=ft.TextStyle(color=page.bgcolor)
-                ),
-                actions=[ft.TextButton(
-                    "Close", 
-                    on_click=lambda _: page.close(dialog),
-                    style=ft.ButtonStyle(color=get_complementary_color(page.bgcolor), bgcolor=page.bgcolor)
-                )],
-            )
-            page.open(dialog)
-            page.update()
-        else:
+        if engine.handle(e):
             return
+        if e.key.lower() == "h":
+            _show_help(page)
+
+    on_hotkey.engine = engine  # type: ignore[attr-defined]
     return on_hotkey
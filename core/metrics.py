@@ -0,0 +1,50 @@
+"""Startup timing.
+
+Marks are seconds since the origin, which main() resets as it starts
+building a page, so each session is timed from its own start. main() marks
+'first_frame' once the minimal UI has been sent and 'hydrated' once
+history, palette and swatch combinations have been filled in. Set
+CONFIG['startup_metrics_file'] to append each run's marks as one JSON line,
+for tracking cold-start regressions over time.
+"""
+import json
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class StartupMetrics:
+    """Named timestamps relative to a fixed origin."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.origin = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        """Record name at the current time and return its offset in seconds."""
+        elapsed = time.perf_counter() - self.origin
+        self.marks[name] = elapsed
+        logger.debug('startup %s at %.1f ms', name, elapsed * 1000)
+        return elapsed
+
+    def get(self, name: str) -> Optional[float]:
+        return self.marks.get(name)
+
+    @property
+    def time_to_first_frame(self) -> Optional[float]:
+        return self.marks.get('first_frame')
+
+    def as_dict(self) -> Dict[str, float]:
+        """Marks in milliseconds, in the order they were recorded."""
+        return {name: round(elapsed * 1000, 3) for name, elapsed in self.marks.items()}
+
+    def write(self, path: str) -> None:
+        """Append this run's marks to a JSON-lines file."""
+        record = {'timestamp': time.time(), **self.as_dict()}
+        with open(path, 'a') as file:
+            file.write(json.dumps(record) + '\n')
+
+startup_metrics = StartupMetrics()
@@ -0,0 +1,267 @@
+"""Opt-in instrumentation of the app's hot paths.
+
+Off unless CONFIG['profiling'] is true or the COLORMIXER_PROFILE environment
+variable is set (to anything but '', '0' or 'false'). When on, it records:
+
+* latency histograms for the handlers main.py wraps in profiler.timed()
+  (change_bg, _update_text_colors, build_combination_row, ...) and for
+  every page.update() round trip sent through core.updates
+* call counts and total time of the public core.color_utils functions,
+  once install() has wrapped them; core.cache computes its misses through
+  these, so cache misses are counted too
+* the color cache hit rates and the update counters, read at snapshot time
+
+snapshot() returns all of it as a dict; dump_json() writes that and
+dump_chrome_trace() writes the recorded spans in Chrome's trace event
+format (open in chrome://tracing or Perfetto). components.debug_overlay
+shows report() in the app (F12). While profiling is off, timed() and
+span() cost one attribute check.
+"""
+import atexit
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.config import CONFIG
+
+# Upper bucket bounds in milliseconds; the last bucket is everything slower.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+def _env_enabled() -> bool:
+    return os.environ.get('COLORMIXER_PROFILE', '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+class Histogram:
+    """Latency distribution over fixed millisecond buckets."""
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile (max for the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'min_ms': self.min_ms if self.count else 0.0,
+            'max_ms': self.max_ms,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'buckets_ms': {
+                (f'<={bound:g}' if i < len(BUCKETS_MS) else f'>{BUCKETS_MS[-1]:g}'): n
+                for i, (bound, n) in enumerate(zip(BUCKETS_MS + (BUCKETS_MS[-1],), self.buckets))
+            },
+        }
+
+class Profiler:
+    def __init__(self, enabled: Optional[bool] = None, max_events: Optional[int] = None):
+        self.enabled = bool(CONFIG.get('profiling', False) or _env_enabled()) if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.histograms: Dict[str, Histogram] = {}
+        self.calls: Dict[str, List[float]] = {}  # name -> [count, total seconds]
+        self.events: deque = deque(maxlen=max_events or CONFIG.get('profiling_max_events', 20000))
+        self._installed: List[Tuple[Any, str, Any]] = []
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.calls.clear()
+            self.events.clear()
+
+    # --- Recording ---
+    def record(self, name: str, start: float, end: float) -> None:
+        """Add one span (perf_counter seconds) to name's histogram and the trace."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add((end - start) * 1000)
+            self.events.append((name, start, end, threading.get_ident()))
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def span(self, name: str):
+        """Context manager timing its body as one span of name."""
+        return self._span(name) if self.enabled else nullcontext()
+
+    def timed(self, name: Optional[str] = None) -> Callable[[Callable], Callable]:
+        """Decorator timing every call of the function while profiling is on."""
+        def decorate(func: Callable) -> Callable:
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(label, start, time.perf_counter())
+            return wrapper
+        return decorate
+
+    def _counted(self, name: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    entry = self.calls.setdefault(name, [0, 0.0])
+                    entry[0] += 1
+                    entry[1] += elapsed
+        wrapper.__profiled__ = func  # type: ignore[attr-defined]
+        return wrapper
+
+    def install(self, module_name: str = 'core.color_utils') -> int:
+        """Count calls to the module's public functions, wherever they were imported.
+
+        Replaces each function in the module and in every loaded app module
+        that imported it by name. Returns how many references were wrapped;
+        uninstall() puts the originals back.
+        """
+        module = sys.modules.get(module_name) or __import__(module_name, fromlist=['_'])
+        originals = {
+            id(value): (attr, value) for attr, value in vars(module).items()
+            if not attr.startswith('_') and callable(value) and not inspect.isclass(value)
+            and getattr(value, '__module__', None) == module_name
+        }
+        wrappers = {key: self._counted(attr, func) for key, (attr, func) in originals.items()}
+        patched = 0
+        for loaded in list(sys.modules.values()):
+            name = getattr(loaded, '__name__', '')
+            if not (name in ('main', '__main__') or name.split('.')[0] in ('core', 'components')):
+                continue
+            for attr, value in list(vars(loaded).items()):
+                wrapper = wrappers.get(id(value))
+                if wrapper is not None and originals[id(value)][1] is value:
+                    setattr(loaded, attr, wrapper)
+                    self._installed.append((loaded, attr, value))
+                    patched += 1
+        return patched
+
+    def uninstall(self) -> None:
+        for module, attr, original in reversed(self._installed):
+            setattr(module, attr, original)
+        self._installed.clear()
+
+    # --- Reporting ---
+    def snapshot(self) -> Dict[str, Any]:
+        from core.cache import color_cache
+        from core.updates import update_counters
+        with self._lock:
+            handlers = {name: h.as_dict() for name, h in sorted(self.histograms.items())}
+            calls = {
+                name: {'count': count, 'total_ms': total * 1000}
+                for name, (count, total) in sorted(self.calls.items(), key=lambda item: -item[1][0])
+            }
+        return {
+            'enabled': self.enabled,
+            'handlers': handlers,
+            'calls': calls,
+            'cache': color_cache.stats(),
+            'updates': update_counters.stats(),
+        }
+
+    def report(self) -> str:
+        """The snapshot as a plain-text table for the debug overlay."""
+        data = self.snapshot()
+        lines = [f"{'handler':<24}{'n':>7}{'mean':>9}{'p95':>9}{'max':>9}  (ms)"]
+        for name, h in data['handlers'].items():
+            lines.append(f"{name[:24]:<24}{h['count']:>7}{h['mean_ms']:>9.2f}{h['p95_ms']:>9.2f}{h['max_ms']:>9.2f}")
+        lines.append('')
+        lines.append(f"{'color_utils call':<24}{'n':>7}{'total ms':>12}")
+        for name, c in data['calls'].items():
+            lines.append(f"{name[:24]:<24}{c['count']:>7}{c['total_ms']:>12.2f}")
+        lines.append('')
+        lines.append(f"{'cache':<24}{'hit rate':>9}{'hits':>9}{'misses':>9}")
+        for name, c in data['cache'].items():
+            lines.append(f"{name:<24}{c['hit_rate']:>9.0%}{c['hits']:>9}{c['misses']:>9}")
+        updates = data['updates']
+        lines.append('')
+        lines.append(f"updates: {updates['requested']} requested, {updates['flushed']} sent, {updates['saved']} saved")
+        return '\n'.join(lines)
+
+    def dump_json(self, path: str) -> str:
+        with open(path, 'w') as file:
+            json.dump(self.snapshot(), file, indent=2)
+        return path
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Recorded spans as Chrome trace 'complete' events (microseconds)."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+        return {
+            'traceEvents': [
+                {
+                    'name': name, 'cat': 'colormixer', 'ph': 'X', 'pid': pid, 'tid': tid,
+                    'ts': (start - self._origin) * 1e6, 'dur': (end - start) * 1e6,
+                }
+                for name, start, end, tid in events
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def dump_chrome_trace(self, path: str) -> str:
+        with open(path, 'w') as file:
+            json.dump(self.chrome_trace(), file)
+        return path
+
+    def dump_configured(self) -> List[str]:
+        """Write the files named by CONFIG['profiling_json'] / ['profiling_trace']; returns their paths."""
+        written = []
+        if CONFIG.get('profiling_json'):
+            written.append(self.dump_json(CONFIG['profiling_json']))
+        if CONFIG.get('profiling_trace'):
+            written.append(self.dump_chrome_trace(CONFIG['profiling_trace']))
+        return written
+
+profiler = Profiler()
+
+def setup() -> bool:
+    """Wrap color_utils and dump configured files at exit, if profiling is on. Idempotent."""
+    if not profiler.enabled or profiler._installed:
+        return profiler.enabled
+    profiler.install()
+    atexit.register(profiler.dump_configured)
+    return True
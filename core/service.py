@@ -0,0 +1,290 @@
+"""Local HTTP color service.
+
+Serves the desktop app's color math to other tools from one long-lived
+process, so the swatch index and color caches stay warm instead of being
+rebuilt by every caller::
+
+    python -m core.service --port 8765
+
+Endpoints take and return JSON; every batch endpoint answers with
+{"results": [...]} in request order, with null for inputs that are not
+valid colors:
+
+* POST /mix         {"pairs": [["#f00", "#00f"], ...], "space": "srgb"}
+                    ("colors" may be used instead of "pairs" for mixes of
+                    more than two colors)
+* POST /complement  {"colors": ["#123456", ...]}
+* POST /match       {"colors": ["#123456", ...]} -> closest swatch or null
+* GET  /health, GET /stats
+
+Connections are kept alive (HTTP/1.1) until the client closes them or they
+sit idle for service_idle_timeout seconds. The math runs on the shared
+compute pool (core.tasks), and concurrent identical requests are coalesced
+into one computation. Only the standard library is used, and the service
+binds to localhost unless told otherwise.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from core.cache import color_cache
+from core.color_utils import MIX_SPACES, mix_colors
+from core.config import CONFIG
+from core.swatch_db import DEFAULT_SWATCHES, open_catalogue
+from core.swatch_index import SwatchIndex
+from core.tasks import run_blocking
+
+logger = logging.getLogger(__name__)
+
+class RequestError(Exception):
+    """A request the service refuses, with the HTTP status to answer it with."""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class Coalescer:
+    """Share one in-flight computation between concurrent identical requests."""
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.computed = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, func: Callable[..., Any], *args: Any) -> Any:
+        """Await func(*args) on the compute pool, or join the computation already running for key."""
+        future = self._inflight.get(key)
+        if future is None:
+            self.computed += 1
+            future = asyncio.ensure_future(run_blocking(func, *args))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shielded, so one client hanging up does not cancel the others' result.
+        return await asyncio.shield(future)
+
+class ColorService:
+    """The HTTP service around one swatch index."""
+    def __init__(self, swatches: Optional[Sequence[Dict[str, Any]]] = None, swatches_path: Optional[str] = None, metric: Optional[str] = None):
+        if swatches is None:
+            swatches = open_catalogue(swatches_path or DEFAULT_SWATCHES)
+        self.index = SwatchIndex(swatches, metric=metric or CONFIG.get('swatch_metric', 'rgb'))
+        self.idle_timeout = CONFIG.get('service_idle_timeout', 15)
+        self.max_body = CONFIG.get('service_max_body', 1 << 20)
+        self.max_batch = CONFIG.get('service_max_batch', 10000)
+        self.coalescer = Coalescer()
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._routes: Dict[Tuple[str, str], Callable[[Any], Awaitable[Dict[str, Any]]]] = {
+            ('GET', '/health'): self._health,
+            ('GET', '/stats'): self._stats,
+            ('POST', '/mix'): self._mix,
+            ('POST', '/complement'): self._complement,
+            ('POST', '/match'): self._match,
+        }
+
+    # --- Server lifecycle ---
+    async def start(self, host: Optional[str] = None, port: Optional[int] = None) -> asyncio.AbstractServer:
+        """Start listening; port 0 picks a free port (see .port)."""
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            host or CONFIG.get('service_host', '127.0.0.1'),
+            CONFIG.get('service_port', 8765) if port is None else port,
+        )
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    # --- HTTP ---
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                keep_alive = await self._handle_request(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_request(self, request_line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Read one request and write its response; returns whether to keep the connection."""
+        self.requests += 1
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'malformed request line'}, False)
+            return False
+        method, target, version = parts
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'invalid Content-Length'}, False)
+            return False
+        if length > self.max_body:
+            # The body is not read, so the connection cannot be reused.
+            self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': f'body exceeds {self.max_body} bytes'}, False)
+            return False
+        body = await reader.readexactly(length) if length else b''
+        status, payload = await self.dispatch(method, target.split('?', 1)[0], body)
+        self._respond(writer, status, payload, keep_alive)
+        return keep_alive
+
+    def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool) -> None:
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        head = (
+            f'HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n'
+            '\r\n'
+        )
+        writer.write(head.encode('latin-1') + body)
+
+    async def dispatch(self, method: str, path: str, body: bytes = b'') -> Tuple[int, Dict[str, Any]]:
+        """Route one request; returns (status, JSON payload)."""
+        handler = self._routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self._routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f'{method} not allowed on {path}'}
+            return HTTPStatus.NOT_FOUND, {'error': f'no endpoint {path}'}
+        try:
+            payload = None
+            if method == 'POST':
+                try:
+                    payload = json.loads(body or b'null')
+                except ValueError:
+                    raise RequestError(HTTPStatus.BAD_REQUEST, 'body is not valid JSON') from None
+                if not isinstance(payload, dict):
+                    raise RequestError(HTTPStatus.BAD_REQUEST, 'body must be a JSON object')
+            return HTTPStatus.OK, await handler(payload)
+        except RequestError as exc:
+            return exc.status, {'error': str(exc)}
+        except Exception:
+            # A bug or a bad catalogue record: answer, and keep the connection usable.
+            logger.exception('%s %s failed', method, path)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'internal error'}
+
+    # --- Endpoints ---
+    def _batch(self, payload: Dict[str, Any], *keys: str) -> List[Any]:
+        items = next((payload[key] for key in keys if key in payload), None)
+        if not isinstance(items, list):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f'expected a list in {keys[0]!r}')
+        if len(items) > self.max_batch:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f'batches are limited to {self.max_batch} items')
+        return items
+
+    async def _coalesced(self, name: str, func: Callable[..., Any], *args: Any) -> Dict[str, Any]:
+        key = (name, json.dumps(args, sort_keys=True))
+        return {'results': await self.coalescer.run(key, func, *args)}
+
+    async def _health(self, _payload: Any) -> Dict[str, Any]:
+        return {'status': 'ok', 'swatches': len(self.index)}
+
+    async def _stats(self, _payload: Any) -> Dict[str, Any]:
+        return {
+            'connections': self.connections,
+            'requests': self.requests,
+            'computed': self.coalescer.computed,
+            'coalesced': self.coalescer.coalesced,
+            'cache': color_cache.stats(),
+        }
+
+    async def _mix(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        items = self._batch(payload, 'pairs', 'colors')
+        space = payload.get('space', CONFIG.get('mix_space', 'srgb'))
+        if space not in MIX_SPACES:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f'unknown mix space {space!r}; expected one of {list(MIX_SPACES)}')
+        return await self._coalesced('mix', _mix_many, items, space)
+
+    async def _complement(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._coalesced('complement', _complement_many, self._batch(payload, 'colors'))
+
+    async def _match(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._coalesced('match', self._match_many, self._batch(payload, 'colors'))
+
+    def _match_many(self, colors: List[Any]) -> List[Any]:
+        results = []
+        for color in colors:
+            match = color_cache.closest_swatch(color, self.index) if isinstance(color, str) else None
+            results.append(None if match is None else {
+                'hex': match['hex'],
+                'name': match['name'],
+                'combinations': list(match['combinations'] or ()),
+            })
+        return results
+
+def _mix_many(items: List[Any], space: str) -> List[Optional[str]]:
+    results = []
+    for item in items:
+        try:
+            results.append(mix_colors(item, space=space) if isinstance(item, list) and item else None)
+        except (TypeError, ValueError):
+            results.append(None)
+    return results
+
+def _complement_many(colors: List[Any]) -> List[Optional[str]]:
+    results = []
+    for color in colors:
+        valid = isinstance(color, str) and color_cache.normalize(color) != 'INVALID'
+        results.append(color_cache.complement(color) if valid else None)
+    return results
+
+async def serve(host: Optional[str] = None, port: Optional[int] = None, swatches_path: Optional[str] = None) -> None:
+    service = ColorService(swatches_path=swatches_path)
+    server = await service.start(host, port)
+    print(f'Serving on http://{server.sockets[0].getsockname()[0]}:{service.port}', flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m core.service', description='Serve color mixing, complements and swatch matches over local HTTP.')
+    parser.add_argument('--host', default=CONFIG.get('service_host', '127.0.0.1'), help='interface to bind (default: localhost only)')
+    parser.add_argument('--port', type=int, default=CONFIG.get('service_port', 8765))
+    parser.add_argument('--swatches', default=DEFAULT_SWATCHES, help='swatch catalogue (.json or .swdb)')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.swatches))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as exc:
+        print(f'error: {exc}', file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
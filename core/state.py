@@ -1,7 +1,104 @@
-from typing import List, Dict, Any
+from collections import Counter, deque
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 from flet import Page
+from core.color_utils import Color
+from core.config import CONFIG
+from core.updates import defer
 
-def add_to_history(page: Page, history: List[Dict[str, Any]], new_color: str, pair=None) -> None:
+class HistoryStore:
+    """Fixed-capacity color history with O(1) duplicate detection.
+
+    Entries live in a deque that drops the oldest once capacity is reached.
+    The hexes of the last dedup_window entries are counted in a Counter, so
+    checking a new color against the window does not scan the history.
+    The store is placed in the session once and then mutated in place, so
+    an addition never rewrites the whole history.
+
+    Supports the list operations the app uses on history: len(), iteration,
+    reversed(), indexing and append().
+    """
+    def __init__(self, entries: Iterable[Dict[str, Any]] = (), capacity: Optional[int] = None, dedup_window: Optional[int] = None):
+        capacity = CONFIG.get('history_capacity', 500) if capacity is None else capacity
+        dedup_window = CONFIG.get('history_dedup_window', 10) if dedup_window is None else dedup_window
+        if capacity < 1:
+            raise ValueError('History capacity must be at least 1')
+        if dedup_window < 0:
+            raise ValueError('History dedup window must not be negative')
+        self.capacity = capacity
+        self.dedup_window = min(dedup_window, capacity)
+        self._entries: deque = deque(maxlen=capacity)
+        self._window: deque = deque()
+        self._window_counts: Counter = Counter()
+        for entry in entries:
+            self.append(entry)
+
+    @classmethod
+    def from_session(cls, page) -> 'HistoryStore':
+        """Return the session's history store, converting a stored plain list."""
+        history = page.session.get('history')
+        if not isinstance(history, HistoryStore):
+            history = cls(history or ())
+            page.session.set('history', history)
+        return history
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._entries)
+
+    def __reversed__(self) -> Iterator[Dict[str, Any]]:
+        return reversed(self._entries)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self._entries[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, HistoryStore):
+            return list(self._entries) == list(other._entries)
+        if isinstance(other, list):
+            return list(self._entries) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"HistoryStore({list(self._entries)!r}, capacity={self.capacity}, dedup_window={self.dedup_window})"
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Record an entry unconditionally."""
+        self._entries.append(entry)
+        if self.dedup_window:
+            hex_color = str(entry.get('hex')) if isinstance(entry, dict) else str(entry)
+            self._window.append(hex_color)
+            self._window_counts[hex_color] += 1
+            if len(self._window) > self.dedup_window:
+                oldest = self._window.popleft()
+                self._window_counts[oldest] -= 1
+                if not self._window_counts[oldest]:
+                    del self._window_counts[oldest]
+
+    def recent(self, color: Union[str, Color]) -> bool:
+        """Whether color is among the last dedup_window entries."""
+        return str(color) in self._window_counts
+
+    def add(self, color: Union[str, Color], pair=None) -> bool:
+        """Add a color unless it repeats within the dedup window. Returns whether it was added."""
+        if self.recent(color) or (self._entries and str(self._entries[-1].get('hex')) == str(color)):
+            return False
+        entry = {"hex": color}
+        if pair:
+            entry["pair"] = pair
+        self.append(entry)
+        return True
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """A snapshot of the entries, oldest first."""
+        return list(self._entries)
+
+def add_to_history(page: Page, history: Union[HistoryStore, List[Dict[str, Any]]], new_color: Union[str, Color], pair=None) -> None:
+    if isinstance(history, HistoryStore):
+        if history.add(new_color, pair) and page.session.get("history") is not history:
+            page.session.set("history", history)
+        return
     entry = {"hex": new_color}
     if pair:
         entry["pair"] = pair
@@ -16,38 +113,157 @@ def clear_fields(color1, color2):
     color1.value = ""
     color2.value = ""
 
+# field -> (session key, key inside the session dict or None for the whole value, default)
+STATE_FIELDS: Dict[str, Tuple[str, Optional[str], Any]] = {
+    'bgcolor': ('current', 'bgcolor', None),
+    'complementary': ('current', 'complementary', None),
+    'palette': ('current', 'palette', None),
+    'palette_colors': ('current', 'palette_colors', ()),
+    'user_palette': ('user_palette', None, ()),
+    'saved_palette': ('palette', None, ()),
+}
+
+Subscriber = Callable[[Dict[str, Any]], None]
+
+def _freeze(value: Any) -> Any:
+    # Lists are held as tuples, so callers cannot change state behind its back
+    # and equal contents compare equal.
+    if isinstance(value, (list, tuple)):
+        return tuple(str(v) if isinstance(v, Color) else v for v in value)
+    return str(value) if isinstance(value, Color) else value
+
+class SessionState:
+    """Typed per-session app state that writes to page.session only on change.
+
+    Fields are listed in STATE_FIELDS and kept in the session layout the app
+    has always used ('current', 'user_palette', 'palette'). set() and
+    update() ignore values equal to the current ones. Real changes are
+    written to the session, and subscribers notified, once per event: when
+    the open core.updates transaction commits, or immediately outside one.
+
+    Subscribers get a dict of the fields that changed in that flush.
+    """
+    def __init__(self, page: Any):
+        self.page = page
+        self._values: Dict[str, Any] = {}
+        for name, (key, subkey, default) in STATE_FIELDS.items():
+            stored = page.session.get(key)
+            if subkey is not None:
+                stored = stored.get(subkey) if isinstance(stored, dict) else None
+            self._values[name] = _freeze(default if stored is None else stored)
+        self._flushed = dict(self._values)
+        self._dirty: set = set()
+        self._subscribers: List[Tuple[Subscriber, frozenset]] = []
+        self.writes = 0
+
+    @classmethod
+    def for_page(cls, page: Any) -> 'SessionState':
+        """Return the session's state, creating it from the stored keys on first use."""
+        state = page.session.get('state')
+        if not isinstance(state, SessionState):
+            state = cls(page)
+            page.session.set('state', state)
+        return state
+
+    def get(self, name: str) -> Any:
+        return self._values[name]
+
+    def __getattr__(self, name: str) -> Any:
+        if name in STATE_FIELDS:
+            return self._values[name]
+        raise AttributeError(name)
+
+    def current(self) -> Dict[str, Any]:
+        """The 'current' color state as a dict, or {} before a color was set."""
+        if self._values['bgcolor'] is None:
+            return {}
+        return {
+            'bgcolor': self._values['bgcolor'],
+            'complementary': self._values['complementary'],
+            'palette': self._values['palette'],
+            'palette_colors': list(self._values['palette_colors']),
+        }
+
+    def set(self, name: str, value: Any) -> bool:
+        return self.update(**{name: value})
+
+    def update(self, **values: Any) -> bool:
+        """Change fields; returns whether any of them actually changed."""
+        changed = False
+        for name, value in values.items():
+            if name not in STATE_FIELDS:
+                raise KeyError(f'Unknown state field {name!r}')
+            value = _freeze(value)
+            if self._values[name] == value:
+                continue
+            self._values[name] = value
+            self._dirty.add(name)
+            changed = True
+        if changed and not defer(('session_state', id(self)), self.flush):
+            self.flush()
+        return changed
+
+    def subscribe(self, callback: Subscriber, *names: str) -> Callable[[], None]:
+        """Call callback(changes) after flushes that change any of names (any field if none given).
+
+        Returns a function that removes the subscription.
+        """
+        unknown = set(names) - set(STATE_FIELDS)
+        if unknown:
+            raise KeyError(f'Unknown state fields {sorted(unknown)}')
+        entry = (callback, frozenset(names))
+        self._subscribers.append(entry)
+        return lambda: self._subscribers.remove(entry) if entry in self._subscribers else None
+
+    def flush(self) -> None:
+        """Write the changed fields to the session and notify subscribers."""
+        dirty, self._dirty = self._dirty, set()
+        # A field changed and changed back within the event is no change.
+        changes = {name: self._values[name] for name in dirty if self._values[name] != self._flushed[name]}
+        if not changes:
+            return
+        self._flushed.update(changes)
+        for key in {STATE_FIELDS[name][0] for name in changes}:
+            if key == 'current':
+                value: Any = self.current()
+            else:
+                name = next(n for n, (k, _, _) in STATE_FIELDS.items() if k == key)
+                value = list(self._values[name])
+            self.page.session.set(key, value)
+            self.writes += 1
+        for callback, names in list(self._subscribers):
+            if not names or names & changes.keys():
+                callback(changes)
+
 def set_current_state(page, bgcolor, complementary, palette=None, palette_colors=None):
-    current = page.session.get('current') or {}
-    current.update({
-        'bgcolor': bgcolor,
-        'complementary': complementary,
-        'palette': palette,
-        'palette_colors': palette_colors or []
-    })
-    page.session.set('current', current)
+    SessionState.for_page(page).update(
+        bgcolor=bgcolor,
+        complementary=complementary,
+        palette=palette,
+        palette_colors=palette_colors or (),
+    )
 
 def get_current_state(page):
-    val = page.session.get('current')
-    return val if val is not None else {}
+    return SessionState.for_page(page).current()
 
 # Palette state management
 
 def get_palette(page) -> list[str]:
     """Get the current palette from session, or return an empty list."""
-    return page.session.get('palette') or []
+    return list(SessionState.for_page(page).saved_palette)
 
-def add_to_palette(page, color: str) -> list[str]:
+def add_to_palette(page, color: Union[str, Color]) -> list[str]:
     """Add a color to the palette if not present. Returns updated palette."""
     palette = get_palette(page)
-    if color not in palette:
-        palette.append(color)
-        page.session.set('palette', palette)
+    if str(color) not in palette:
+        palette.append(str(color))
+        SessionState.for_page(page).set('saved_palette', palette)
     return palette
 
-def remove_from_palette(page, color: str) -> list[str]:
+def remove_from_palette(page, color: Union[str, Color]) -> list[str]:
     """Remove a color from the palette. Returns updated palette."""
     palette = get_palette(page)
-    if color in palette:
-        palette.remove(color)
-        page.session.set('palette', palette)
+    if str(color) in palette:
+        palette.remove(str(color))
+        SessionState.for_page(page).set('saved_palette', palette)
     return palette
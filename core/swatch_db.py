@@ -0,0 +1,302 @@
+"""Compiled binary swatch database.
+
+swatches.json is parsed in full at startup and kept as one dict of Python
+lists per swatch. The compiled form (.swdb) is a single little-endian file
+that is memory-mapped instead: opening it reads only the header, and a
+swatch's record is decoded the first time it is asked for.
+
+Layout, in order after the header:
+
+* records: one fixed-size row per swatch (packed rgb, Lab, CMYK, swatch
+  number, and offsets into the string table and combination pool)
+* combination pool: the combination ids of every swatch, back to back
+* combination index: (id, member offset, member count) rows sorted by id
+* member pool: swatch positions of every combination, back to back
+* string table: UTF-8 swatch names
+
+Build one with ``python -m core.swatch_db core/swatches.json``.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+from importlib import resources
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.color_utils import _parse_rgb, _rgb_to_lab, normalize
+
+SWATCH_DB_SUFFIX = '.swdb'
+# The catalogue shipped as package data with core (compile it in place for a .swdb).
+DEFAULT_SWATCHES = str(resources.files('core').joinpath('swatches.json'))
+MAGIC = b'CMSW'
+VERSION = 1
+
+# magic, version, record count, combination pool length, index rows, member pool length, string table bytes
+_HEADER = struct.Struct('<4sHIIIII')
+# rgb, L, a, b, c, m, y, k, swatch number, name offset, name length, combinations offset, combinations count
+_RECORD = struct.Struct('<I3d4hIIHIH')
+_INDEX_ROW = struct.Struct('<III')
+_U32 = struct.Struct('<I')
+
+_NO_CMYK = (-1, -1, -1, -1)
+_NO_NUMBER = 0xFFFFFFFF
+
+class SwatchDB:
+    """Read-only, memory-mapped view of a compiled swatch catalogue.
+
+    Behaves as a sequence of swatch dicts shaped like the swatches.json
+    entries; combinations answers CombinationIndex queries straight from
+    the file. Decoded swatches are kept so repeated lookups return the same
+    dict.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError(f'{path} is not a swatch database')
+        magic, version, count, combos, rows, members, strings = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a swatch database')
+        if version != VERSION:
+            raise ValueError(f'Unsupported swatch database version {version} in {path}')
+        self._count = count
+        self._records_at = _HEADER.size
+        self._combos_at = self._records_at + count * _RECORD.size
+        self._index_at = self._combos_at + combos * _U32.size
+        self._members_at = self._index_at + rows * _INDEX_ROW.size
+        self._strings_at = self._members_at + members * _U32.size
+        if len(self._buffer) != self._strings_at + strings:
+            raise ValueError(f'{path} is truncated or corrupt')
+        self._rows = rows
+        self._combinations: Optional[CompiledCombinations] = None
+        self._decoded: Dict[int, Dict[str, Any]] = {}
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def __enter__(self) -> 'SwatchDB':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._count):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('swatch index out of range')
+        swatch = self._decoded.get(i)
+        if swatch is None:
+            swatch = self._decoded[i] = self._decode(i)
+        return swatch
+
+    def _record(self, i: int) -> Tuple:
+        return _RECORD.unpack_from(self._buffer, self._records_at + i * _RECORD.size)
+
+    def _u32s(self, base: int, offset: int, count: int) -> Tuple[int, ...]:
+        return struct.unpack_from(f'<{count}I', self._buffer, base + offset * _U32.size)
+
+    def _decode(self, i: int) -> Dict[str, Any]:
+        rgb, l, a, b, c, m, y, k, number, name_at, name_len, combos_at, combos_len = self._record(i)
+        start = self._strings_at + name_at
+        swatch: Dict[str, Any] = {
+            'name': self._buffer[start:start + name_len].decode('utf-8'),
+            'combinations': list(self._u32s(self._combos_at, combos_at, combos_len)),
+        }
+        if number != _NO_NUMBER:
+            swatch['swatch'] = number
+        if (c, m, y, k) != _NO_CMYK:
+            swatch['cmyk'] = [c, m, y, k]
+        swatch['lab'] = [l, a, b]
+        swatch['rgb'] = [rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF]
+        swatch['hex'] = f'#{rgb:06x}'
+        return swatch
+
+    def packed_rgb(self, i: int) -> int:
+        """The swatch's color as a 24-bit int, without decoding the record."""
+        return _U32.unpack_from(self._buffer, self._records_at + i * _RECORD.size)[0]
+
+    def lab(self, i: int) -> Tuple[float, float, float]:
+        """The swatch's stored Lab value, without decoding the record."""
+        return struct.unpack_from('<3d', self._buffer, self._records_at + i * _RECORD.size + _U32.size)
+
+    @property
+    def combinations(self) -> 'CompiledCombinations':
+        """Combination lookups served from the file's combination index."""
+        if self._combinations is None:
+            self._combinations = CompiledCombinations(self)
+        return self._combinations
+
+class CompiledCombinations:
+    """The CombinationIndex interface over a SwatchDB's on-disk combination index."""
+    def __init__(self, db: SwatchDB):
+        self._db = db
+        self._keys = [
+            _INDEX_ROW.unpack_from(db._buffer, db._index_at + r * _INDEX_ROW.size)[0] for r in range(db._rows)
+        ]
+
+    def _row(self, combination: Any) -> Optional[Tuple[int, ...]]:
+        try:
+            key = int(combination)
+        except (TypeError, ValueError):
+            return None
+        r = bisect_left(self._keys, key)
+        if r == len(self._keys) or self._keys[r] != key:
+            return None
+        _, offset, count = _INDEX_ROW.unpack_from(self._db._buffer, self._db._index_at + r * _INDEX_ROW.size)
+        return self._db._u32s(self._db._members_at, offset, count)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, combination: Any) -> bool:
+        return self._row(combination) is not None
+
+    def members(self, combination: Any) -> List[Dict[str, Any]]:
+        """Swatches in a combination, in catalogue order."""
+        return [self._db[i] for i in self._row(combination) or ()]
+
+    def palette(self, combination: Any) -> List[str]:
+        """Hex colors of a combination's swatches, as a new list the caller may keep."""
+        return [f'#{self._db.packed_rgb(i):06x}' for i in self._row(combination) or ()]
+
+    def combinations_of(self, swatch: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Combination ids a swatch belongs to."""
+        return tuple(swatch.get('combinations') or ())
+
+def _whole_number(label: str, field: str, value: Any, high: int) -> int:
+    """value as an int from 0 to high, or a ValueError naming the swatch and field."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= high:
+        raise ValueError(f'{label} has {field} {value!r}; expected a whole number from 0 to {high}')
+    return value
+
+def compile_swatches(swatches: Sequence[Dict[str, Any]]) -> bytes:
+    """Encode a swatches.json-style list as a swatch database.
+
+    Raises ValueError naming the swatch when a field cannot be stored:
+    CMYK values are whole numbers up to 32767, swatch numbers and
+    combination ids fit in 32 bits.
+    """
+    records = []
+    combo_pool: List[int] = []
+    members: Dict[int, List[int]] = {}
+    strings = bytearray()
+    for i, swatch in enumerate(swatches):
+        label = f'Swatch {i} ({swatch["name"]!r})' if swatch.get('name') else f'Swatch {i}'
+        hex_color = normalize(swatch.get('hex'))
+        if hex_color == 'INVALID':
+            raise ValueError(f'{label} has an invalid hex color: {swatch.get("hex")!r}')
+        rgb = _parse_rgb(hex_color)
+        lab = swatch.get('lab')
+        if isinstance(lab, (list, tuple)) and len(lab) == 3:
+            try:
+                lab = tuple(float(v) for v in lab)
+            except (TypeError, ValueError):
+                raise ValueError(f'{label} has a non-numeric lab value: {lab!r}') from None
+        else:
+            lab = _rgb_to_lab(rgb)
+        cmyk = swatch.get('cmyk')
+        if isinstance(cmyk, (list, tuple)) and len(cmyk) == 4:
+            cmyk = tuple(_whole_number(label, 'cmyk value', v, 0x7FFF) for v in cmyk)
+        else:
+            cmyk = _NO_CMYK
+        number = swatch.get('swatch')
+        number = _NO_NUMBER if number is None else _whole_number(label, 'swatch number', number, _NO_NUMBER - 1)
+        name = (swatch.get('name') or '').encode('utf-8')
+        if len(name) > 0xFFFF:
+            raise ValueError(f'{label} has a name longer than {0xFFFF} bytes')
+        combinations = [_whole_number(label, 'combination id', c, 0xFFFFFFFF) for c in swatch.get('combinations') or ()]
+        if len(combinations) > 0xFFFF:
+            raise ValueError(f'{label} belongs to more than {0xFFFF} combinations')
+        for combination in combinations:
+            member_list = members.setdefault(combination, [])
+            if not member_list or member_list[-1] != i:
+                member_list.append(i)
+        records.append(_RECORD.pack(
+            (rgb[0] << 16) | (rgb[1] << 8) | rgb[2],
+            *lab,
+            *cmyk,
+            number,
+            len(strings), len(name),
+            len(combo_pool), len(combinations),
+        ))
+        strings += name
+        combo_pool.extend(combinations)
+
+    index_rows = []
+    member_pool: List[int] = []
+    for combination in sorted(members):
+        index_rows.append(_INDEX_ROW.pack(combination, len(member_pool), len(members[combination])))
+        member_pool.extend(members[combination])
+
+    header = _HEADER.pack(MAGIC, VERSION, len(records), len(combo_pool), len(index_rows), len(member_pool), len(strings))
+    return b''.join((
+        header,
+        *records,
+        struct.pack(f'<{len(combo_pool)}I', *combo_pool),
+        *index_rows,
+        struct.pack(f'<{len(member_pool)}I', *member_pool),
+        bytes(strings),
+    ))
+
+def convert(json_path: str, db_path: Optional[str] = None) -> str:
+    """Compile a swatches.json file; returns the path written."""
+    if db_path is None:
+        db_path = os.path.splitext(json_path)[0] + SWATCH_DB_SUFFIX
+    with open(json_path, 'r') as file:
+        data = compile_swatches(json.load(file))
+    tmp_path = db_path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, db_path)
+    return db_path
+
+def compiled_path(json_path: str) -> Optional[str]:
+    """The compiled sibling of json_path, if it exists and is not older than the JSON."""
+    db_path = os.path.splitext(json_path)[0] + SWATCH_DB_SUFFIX
+    try:
+        if os.path.getmtime(db_path) >= os.path.getmtime(json_path):
+            return db_path
+    except OSError:
+        pass
+    return None
+
+def open_catalogue(path: str) -> Sequence[Dict[str, Any]]:
+    """Open a swatch catalogue: a .swdb as is, a JSON file through its fresh compiled sibling if any."""
+    db_path = path if path.endswith(SWATCH_DB_SUFFIX) else compiled_path(path)
+    if db_path:
+        return SwatchDB(db_path)
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m core.swatch_db', description='Compile swatches.json into a binary swatch database.')
+    parser.add_argument('source', help='swatches JSON file')
+    parser.add_argument('-o', '--output', help=f'output path (default: source with {SWATCH_DB_SUFFIX})')
+    args = parser.parse_args(argv)
+    try:
+        path = convert(args.source, args.output)
+    except (OSError, ValueError) as exc:
+        print(f'error: {exc}', file=sys.stderr)
+        return 1
+    with SwatchDB(path) as db:
+        print(f'{path}: {len(db)} swatches, {os.path.getsize(path)} bytes')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
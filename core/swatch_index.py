@@ -0,0 +1,312 @@
+"""Nearest-neighbour index over the swatch catalogue.
+
+The index is created when the swatch catalogue is loaded and replaces the
+linear scan in find_closest_swatch; its trees are built on the first query. Distances are compared squared, and ties are
+broken by catalogue order, so results match the linear scan exactly.
+
+Besides sRGB distance the index can match perceptually (CIE76, CIE94 or
+CIEDE2000) against the Lab values stored with each swatch. CIE76 and CIE94
+queries run on a second k-d tree over Lab, built on first use; CIEDE2000
+has no distance bound the tree can use, so it scans the catalogue.
+
+CombinationIndex maps each numbered combination to its member swatches and
+each swatch to its combinations, so opening a combination is a lookup.
+"""
+import math
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.color_utils import (
+    CloseSwatch, DELTA_E, SWATCH_THRESHOLD, _as_close_swatch, _parse_rgb, _rgb_to_lab, normalize,
+)
+from core.swatch_db import SwatchDB
+
+Point = Tuple[float, float, float]
+
+# Default ΔE below which a perceptual match counts as "close enough".
+PERCEPTUAL_THRESHOLD = 10.0
+METRICS = ('rgb',) + tuple(DELTA_E)
+
+class KDTree:
+    """A static 3-D k-d tree over (point, key) pairs with bucketed leaves.
+
+    Keys are integers used both as payload and as the tie-breaker: among
+    equally distant points the smallest key wins.
+    """
+    def __init__(self, points: Iterable[Tuple[Point, int]], leaf_size: int = 8):
+        self.leaf_size = leaf_size
+        entries = [(tuple(point), key) for point, key in points]
+        self.size = len(entries)
+        self._root = self._build(entries, 0) if entries else None
+
+    def _build(self, entries: List[Tuple[Point, int]], depth: int):
+        if len(entries) <= self.leaf_size:
+            return (None, 0.0, entries, None)
+        axis = depth % 3
+        entries.sort(key=lambda entry: entry[0][axis])
+        mid = len(entries) // 2
+        split = entries[mid][0][axis]
+        return (axis, split, self._build(entries[:mid], depth + 1), self._build(entries[mid:], depth + 1))
+
+    def nearest(self, point: Point) -> Optional[Tuple[float, int]]:
+        """Return (squared distance, key) of the nearest point, or None if empty."""
+        best = self.k_nearest(point, 1)
+        return best[0] if best else None
+
+    def k_nearest(self, point: Point, k: int) -> List[Tuple[float, int]]:
+        """Return up to k (squared distance, key) pairs, nearest first."""
+        if self._root is None or k <= 0:
+            return []
+        x, y, z = point
+        heap: List[Tuple[float, int]] = []  # max-heap of (-d2, -key)
+        # Each stack entry carries a lower bound on the squared distance to its region.
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(heap) == k and bound > -heap[0][0]:
+                continue
+            axis, split, left, right = node
+            if axis is None:
+                for (px, py, pz), key in left:
+                    d2 = (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d2, -key))
+                    elif (d2, key) < (-heap[0][0], -heap[0][1]):
+                        heapq.heapreplace(heap, (-d2, -key))
+                continue
+            diff = point[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Push the far side first so the near side is searched first.
+            stack.append((far, max(bound, diff * diff)))
+            stack.append((near, bound))
+        return sorted((-d2, -key) for d2, key in heap)
+
+    def within(self, point: Point, radius: float) -> List[Tuple[float, int]]:
+        """Return all (squared distance, key) pairs within radius, nearest first."""
+        if self._root is None:
+            return []
+        x, y, z = point
+        r2 = radius * radius
+        found: List[Tuple[float, int]] = []
+        stack = [self._root]
+        while stack:
+            axis, split, left, right = stack.pop()
+            if axis is None:
+                for (px, py, pz), key in left:
+                    d2 = (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2
+                    if d2 <= r2:
+                        found.append((d2, key))
+                continue
+            diff = point[axis] - split
+            if diff - radius <= 0:
+                stack.append(left)
+            if diff + radius >= 0:
+                stack.append(right)
+        found.sort()
+        return found
+
+class CombinationIndex:
+    """Inverted index between swatches and the numbered combinations they appear in.
+
+    Combination ids are matched by their string form, so 176 and "176" (as
+    read back from a clicked TextSpan) name the same combination. Members
+    keep catalogue order.
+    """
+    def __init__(self, swatches: Sequence[Dict[str, Any]]):
+        self._members: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_swatch: Dict[int, Tuple[Any, ...]] = {}
+        for swatch in swatches:
+            combinations = tuple(swatch.get('combinations') or ())
+            self._by_swatch[id(swatch)] = combinations
+            for combination in combinations:
+                members = self._members.setdefault(str(combination), [])
+                if not members or members[-1] is not swatch:
+                    members.append(swatch)
+        self._hexes = {key: tuple(swatch['hex'] for swatch in members) for key, members in self._members.items()}
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, combination: Any) -> bool:
+        return str(combination) in self._members
+
+    def members(self, combination: Any) -> List[Dict[str, Any]]:
+        """Swatches in a combination, in catalogue order."""
+        return list(self._members.get(str(combination), ()))
+
+    def palette(self, combination: Any) -> List[str]:
+        """Hex colors of a combination's swatches, as a new list the caller may keep."""
+        return list(self._hexes.get(str(combination), ()))
+
+    def combinations_of(self, swatch: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Combination ids a swatch from the indexed catalogue belongs to."""
+        return self._by_swatch.get(id(swatch), tuple(swatch.get('combinations') or ()))
+
+def _chroma_slack(lab: Point) -> float:
+    """Ratio by which a ΔE94 distance can undershoot ΔE76 for a query of this chroma."""
+    return 1 + 0.045 * math.hypot(lab[1], lab[2])
+
+class SwatchIndex:
+    """Prebuilt nearest-neighbour index over a list of swatch dicts.
+
+    metric selects the default distance: 'rgb' (Euclidean sRGB, the classic
+    behaviour) or one of 'cie76', 'cie94', 'ciede2000' for perceptual matching
+    on each swatch's stored 'lab' field. Every query method also takes a
+    metric override. The combinations attribute is the catalogue's
+    CombinationIndex.
+    """
+    def __init__(self, swatches: Sequence[Dict[str, Any]], threshold: Optional[float] = None, metric: str = 'rgb'):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown swatch metric {metric!r}; expected one of {METRICS}")
+        # A SwatchDB is kept as is, so only the swatches a query returns are decoded.
+        self.swatches = swatches if isinstance(swatches, SwatchDB) else list(swatches)
+        self.metric = metric
+        self.threshold = threshold
+        self._labs: Dict[int, Point] = {}
+        self._rgb_tree: Optional[KDTree] = None
+        self._lab_tree: Optional[KDTree] = None
+        self._combinations: Any = None
+
+    @property
+    def combinations(self):
+        """The catalogue's CombinationIndex, or a SwatchDB's compiled equivalent."""
+        if self._combinations is None:
+            if isinstance(self.swatches, SwatchDB):
+                self._combinations = self.swatches.combinations
+            else:
+                self._combinations = CombinationIndex(self.swatches)
+        return self._combinations
+
+    def __len__(self) -> int:
+        return len(self.swatches)
+
+    def __iter__(self):
+        return iter(self.swatches)
+
+    def _rgb_index(self) -> KDTree:
+        """Build the sRGB tree on first use."""
+        if self._rgb_tree is None:
+            self._rgb_tree = KDTree(self._rgb_points())
+        return self._rgb_tree
+
+    def _rgb_points(self):
+        if isinstance(self.swatches, SwatchDB):
+            for i in range(len(self.swatches)):
+                value = self.swatches.packed_rgb(i)
+                yield (value >> 16, (value >> 8) & 0xFF, value & 0xFF), i
+            return
+        for i, swatch in enumerate(self.swatches):
+            hex_color = normalize(swatch.get('hex'))
+            if hex_color != 'INVALID':
+                yield _parse_rgb(hex_color), i
+
+    def _lab_index(self) -> KDTree:
+        """Build the Lab tree from stored 'lab' values, converting hex where missing."""
+        if self._lab_tree is None and isinstance(self.swatches, SwatchDB):
+            self._labs = {i: self.swatches.lab(i) for i in range(len(self.swatches))}
+            self._lab_tree = KDTree((lab, key) for key, lab in self._labs.items())
+        if self._lab_tree is None:
+            for i, swatch in enumerate(self.swatches):
+                lab = swatch.get('lab')
+                if isinstance(lab, (list, tuple)) and len(lab) == 3:
+                    self._labs[i] = (float(lab[0]), float(lab[1]), float(lab[2]))
+                else:
+                    hex_color = normalize(swatch.get('hex'))
+                    if hex_color != 'INVALID':
+                        self._labs[i] = _rgb_to_lab(_parse_rgb(hex_color))
+            self._lab_tree = KDTree((lab, key) for key, lab in self._labs.items())
+        return self._lab_tree
+
+    def _resolve(self, metric: Optional[str]) -> str:
+        metric = metric or self.metric
+        if metric not in METRICS:
+            raise ValueError(f"Unknown swatch metric {metric!r}; expected one of {METRICS}")
+        return metric
+
+    def _limit(self, metric: str, threshold: Optional[float]) -> float:
+        if threshold is not None:
+            return threshold
+        if self.threshold is not None:
+            return self.threshold
+        return SWATCH_THRESHOLD if metric == 'rgb' else PERCEPTUAL_THRESHOLD
+
+    def _query_point(self, color: Optional[str], metric: str = 'rgb') -> Optional[Point]:
+        color = normalize(color)
+        if color == 'INVALID':
+            return None
+        rgb = _parse_rgb(color)
+        return rgb if metric == 'rgb' else _rgb_to_lab(rgb)
+
+    def _ranked(self, lab: Point, metric: str, radius: float, k: int = 0, shrink: bool = False) -> List[Tuple[float, int]]:
+        """(ΔE, key) pairs for the candidates near lab, reranked by the chosen formula.
+
+        Candidates are every swatch within a ΔE76 ball around the query plus
+        the k nearest by ΔE76. For CIE94 the ball is widened by the query's
+        chroma factor: ΔE94 is never less than ΔE76 divided by it, so no
+        swatch within radius is missed. CIEDE2000 has no such bound (its
+        weights depend on both colors), so it ranks the whole catalogue.
+        With shrink, the ball is first narrowed to the best ΔE among the
+        nearest few swatches, which is all a closest-match query needs.
+        """
+        tree = self._lab_index()
+        if metric == 'cie76':
+            hits = {key: d2 for d2, key in tree.within(lab, radius)}
+            hits.update((key, d2) for d2, key in tree.k_nearest(lab, k))
+            return sorted((math.sqrt(d2), key) for key, d2 in hits.items())
+        delta_e = DELTA_E[metric]
+        if metric == 'ciede2000':
+            return sorted((delta_e(lab, other), key) for key, other in self._labs.items())
+        ranked = {key: delta_e(lab, self._labs[key]) for _, key in tree.k_nearest(lab, max(k, 8))}
+        if shrink and ranked:
+            radius = min(radius, min(ranked.values()))
+        # The tiny extra margin keeps rounding from dropping a swatch on the boundary.
+        for _, key in tree.within(lab, radius * _chroma_slack(lab) * (1 + 1e-9)):
+            if key not in ranked:
+                ranked[key] = delta_e(lab, self._labs[key])
+        return sorted((distance, key) for key, distance in ranked.items())
+
+    def closest(self, color: Optional[str], threshold: Optional[float] = None, metric: Optional[str] = None) -> Optional[CloseSwatch]:
+        """Return the closest swatch within threshold, like find_closest_swatch.
+
+        The default threshold is 20 sRGB units for the 'rgb' metric and
+        PERCEPTUAL_THRESHOLD ΔE for the perceptual ones.
+        """
+        metric = self._resolve(metric)
+        point = self._query_point(color, metric)
+        if point is None:
+            return None
+        limit = self._limit(metric, threshold)
+        if metric in ('rgb', 'cie76'):
+            best = (self._rgb_index() if metric == 'rgb' else self._lab_index()).nearest(point)
+            if best is None or best[0] > limit * limit:
+                return None
+            return _as_close_swatch(self.swatches[best[1]])
+        ranked = self._ranked(point, metric, limit, shrink=True)
+        if not ranked or ranked[0][0] > limit:
+            return None
+        return _as_close_swatch(self.swatches[ranked[0][1]])
+
+    def nearest(self, color: Optional[str], k: int = 1, metric: Optional[str] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return up to k (distance, swatch) pairs, nearest first, ignoring the threshold."""
+        metric = self._resolve(metric)
+        point = self._query_point(color, metric)
+        if point is None:
+            return []
+        if metric == 'rgb':
+            return [(d2 ** 0.5, self.swatches[key]) for d2, key in self._rgb_index().k_nearest(point, k)]
+        ranked = self._ranked(point, metric, 0.0, k=k)
+        if metric == 'cie94' and len(ranked) >= k > 0:
+            # The ΔE76 k-nearest only bound the answer: every true neighbour lies
+            # within the k-th ΔE94 found, so rerank that ball.
+            ranked = self._ranked(point, metric, ranked[k - 1][0], k=k)
+        return [(distance, self.swatches[key]) for distance, key in ranked[:k]]
+
+    def within(self, color: Optional[str], radius: float, metric: Optional[str] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return every (distance, swatch) pair within radius, nearest first."""
+        metric = self._resolve(metric)
+        point = self._query_point(color, metric)
+        if point is None:
+            return []
+        if metric == 'rgb':
+            return [(d2 ** 0.5, self.swatches[key]) for d2, key in self._rgb_index().within(point, radius)]
+        return [(distance, self.swatches[key]) for distance, key in self._ranked(point, metric, radius) if distance <= radius]
@@ -0,0 +1,74 @@
+"""Off-thread color computation for Flet's async handler mode.
+
+With CONFIG['async_handlers'] enabled, main.py registers coroutine handlers
+that hand the expensive lookups (complement search, closest swatch,
+bottom-sheet construction) to a small thread pool, then apply the result
+on the event loop. Events that arrive while an earlier one is still
+computing make it stale: LatestOnly lets the earlier one notice and drop
+its result, so rapid hotkey or FAB presses never queue up repaints.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from core.cache import color_cache
+from core.config import CONFIG
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """The shared compute pool, sized by CONFIG['compute_workers']."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=CONFIG.get('compute_workers', 2),
+                thread_name_prefix='colormixer-compute',
+            )
+        return _executor
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run func(*args, **kwargs) on the compute pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+class LatestOnly:
+    """Generation counter that marks all but the newest event as stale."""
+    def __init__(self):
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def begin(self) -> int:
+        """Start a new event and return its token."""
+        with self._lock:
+            self._generation += 1
+            return self._generation
+
+    def is_current(self, token: int) -> bool:
+        return token == self._generation
+
+def prefetch_color(color: Optional[str], swatches: Any = None) -> Optional[str]:
+    """Warm the shared cache with everything a color change looks up.
+
+    Returns the normalized color, or None for invalid input. Meant to run
+    on the compute pool so the handler that follows only reads the cache.
+    """
+    hex_color = color_cache.normalize(color)
+    if hex_color == 'INVALID':
+        return None
+    complement = color_cache.complement(hex_color)
+    color_cache.complement(complement)
+    color_cache.rgb(hex_color)
+    if swatches is not None:
+        color_cache.closest_swatch(hex_color, swatches)
+    return hex_color
@@ -0,0 +1,148 @@
+"""Coalesced page updates.
+
+A single user event (a keystroke in a color field, a swatch click) used to
+call page.update() and control.update() several times, each one a separate
+diff sent to the client. Inside update_transaction(page), request_update()
+only records what needs refreshing; the outermost transaction then flushes
+everything as one update. Outside a transaction request_update() updates
+immediately, as before.
+
+Work that should happen once per event rather than once per call, such as
+writing session state (core.state.SessionState), registers with defer() and
+runs when the outermost transaction commits, just before the flush.
+
+Transactions are tracked per thread of execution (a ContextVar), so Flet
+handlers running concurrently for different sessions do not share one.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+from core.profiling import profiler
+
+class UpdateCounters:
+    """How many updates were requested and how many were actually sent."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.requested = 0
+        self.flushed = 0
+        self.transactions = 0
+
+    @property
+    def saved(self) -> int:
+        """Update round trips avoided by coalescing."""
+        return max(0, self.requested - self.flushed)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'requested': self.requested,
+            'flushed': self.flushed,
+            'saved': self.saved,
+            'transactions': self.transactions,
+        }
+
+update_counters = UpdateCounters()
+
+class UpdateTransaction:
+    """Updates requested while a transaction is open, flushed on commit()."""
+    def __init__(self, page: Any):
+        self.page = page
+        self.depth = 0
+        self.page_requested = False
+        self.controls: Dict[int, Any] = {}
+        self.deferred: Dict[Hashable, Callable[[], None]] = {}
+
+    def begin(self) -> None:
+        self.depth += 1
+
+    def request(self, target: Any) -> None:
+        update_counters.requested += 1
+        if target is self.page:
+            self.page_requested = True
+        else:
+            self.controls.setdefault(id(target), target)
+
+    def commit(self) -> None:
+        """Close one level; the outermost commit sends a single update."""
+        self.depth -= 1
+        if self.depth > 0:
+            return
+        if self.deferred:
+            # Keep the transaction open while deferred work runs, so the
+            # updates it requests go out with this flush.
+            self.depth += 1
+            try:
+                while self.deferred:
+                    key = next(iter(self.deferred))
+                    self.deferred.pop(key)()
+            finally:
+                self.depth -= 1
+        page_requested, self.page_requested = self.page_requested, False
+        controls: List[Any] = list(self.controls.values())
+        self.controls.clear()
+        if page_requested:
+            with profiler.span('page.update'):
+                self.page.update()
+        elif controls:
+            # Controls detached since they were changed have nothing to send.
+            attached = [control for control in controls if getattr(control, 'page', None) is not None]
+            if not attached:
+                return
+            with profiler.span('page.update'):
+                self.page.update(*attached)
+        else:
+            return
+        update_counters.flushed += 1
+
+_current: ContextVar[Optional[UpdateTransaction]] = ContextVar('update_transaction', default=None)
+
+@contextmanager
+def update_transaction(page: Any) -> Iterator[UpdateTransaction]:
+    """Collect update requests for page and flush them once on exit.
+
+    Nested transactions join the outer one. The flush also happens when the
+    body raises, so the client still sees whatever changed before the error.
+    """
+    transaction = _current.get()
+    token = None
+    if transaction is None or transaction.page is not page:
+        transaction = UpdateTransaction(page)
+        token = _current.set(transaction)
+        update_counters.transactions += 1
+    transaction.begin()
+    try:
+        yield transaction
+    finally:
+        try:
+            transaction.commit()
+        finally:
+            if token is not None:
+                _current.reset(token)
+
+def request_update(target: Any) -> None:
+    """Update a page or control now, or at the end of the open transaction."""
+    transaction = _current.get()
+    if transaction is not None:
+        transaction.request(target)
+        return
+    update_counters.requested += 1
+    update_counters.flushed += 1
+    with profiler.span('page.update'):
+        target.update()
+
+def defer(key: Hashable, callback: Callable[[], None]) -> bool:
+    """Run callback once when the open transaction commits.
+
+    Registering the same key again before then keeps a single call. Returns
+    False, without calling anything, when no transaction is open.
+    """
+    transaction = _current.get()
+    if transaction is None:
+        return False
+    transaction.deferred.setdefault(key, callback)
+    return True
+
+def in_transaction() -> bool:
+    return _current.get() is not None
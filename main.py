@@ -1,34 +1,72 @@
 import flet as ft
 import random
-import json
 import os
-from typing import Optional, List, Dict, Any
-from components import ColorInput, MixedColorText, MixedRGBText, RandomFAB, InputRow, CombinationRow, CombinationRowContainer, HistoryRow, ComplementaryColorText, ColorDisplayColumn
-from core.color_utils import *
-from core.state import add_to_history, set_current_state, get_current_state, get_palette
-import core.hotkeys
-from core.config import CONFIG
+import threading
+from typing import Optional, List, Dict, Any, Sequence
+from components.debug_overlay import DebugOverlay
 from components.display import MixedColorText, MixedRGBText, ComplementaryColorText, ColorDisplayColumn
 from components.fab import RandomFAB
+from components.history import HistoryRow
 from components.inputs import ColorInput, InputRow
-from components.swatches import CombinationRow, CombinationRowContainer
+from components.swatches import CombinationRowContainer
 from components.user_palette import UserPalette
-from components.history import HistoryRow
-from core.color_utils import normalize, hexmixer, find_closest_swatch, get_complementary_color, HexToRgb
-from core.state import add_to_history, set_current_state, get_current_state, get_palette
 import core.hotkeys
-from core.config import CONFIG
+from core.cache import color_cache
+from core.color_utils import normalize, mix_colors
+from core.complement_lut import install as install_complement_lut
+from core.config import APP_DIR, CONFIG
+from core.metrics import startup_metrics
+from core.profiling import profiler, setup as setup_profiling
+from core.state import HistoryStore, SessionState, add_to_history, set_current_state
+from core.swatch_db import DEFAULT_SWATCHES, open_catalogue
+from core.swatch_index import SwatchIndex
+from core.tasks import LatestOnly, prefetch_color, run_blocking
+from core.updates import request_update, update_transaction
 
 # --- Load Config ---
 config = CONFIG
 
 # --- Load Swatches ---
-with open(os.path.join(os.path.dirname(__file__), config['swatches_file']), 'r') as file:
-    swatches = json.load(file)
+def load_swatches(path: str) -> tuple[Sequence[Dict[str, Any]], SwatchIndex]:
+    """Load the swatch catalogue and build its match and combination indexes, dropping cached matches from any previous set.
+
+    A compiled .swdb next to the JSON (see core.swatch_db.open_catalogue) is
+    memory-mapped instead of parsing the JSON, as long as it is not older
+    than the JSON.
+    """
+    swatch_list = open_catalogue(path)
+    color_cache.invalidate_swatches()
+    return swatch_list, SwatchIndex(swatch_list, metric=config.get('swatch_metric', 'rgb'))
+
+_swatches: Optional[tuple[Sequence[Dict[str, Any]], SwatchIndex]] = None
+_swatches_lock = threading.Lock()
+
+def get_swatches() -> tuple[Sequence[Dict[str, Any]], SwatchIndex]:
+    """The configured swatch catalogue and its index, loaded on first use.
+
+    Nothing on the first frame needs the catalogue, so it is no longer read
+    at import time; startup hydration loads it (on the compute pool when
+    handlers are async).
+    """
+    global _swatches
+    with _swatches_lock:
+        if _swatches is None:
+            configured = config.get('swatches_file')
+            path = os.path.join(APP_DIR, configured) if configured else DEFAULT_SWATCHES
+            _swatches = load_swatches(path)
+        return _swatches
+
+def reset_swatches() -> None:
+    """Forget the loaded catalogue so the next get_swatches() reads it again."""
+    global _swatches
+    with _swatches_lock:
+        _swatches = None
 
 # --- Main App ---
 def main(page: ft.Page) -> None:
     """Main entry point for the Color Mixer app."""
+    # Time this page's startup from here, not from a previous session's run.
+    startup_metrics.reset()
     # Font and theme
     page.fonts = {
         config['font_family']: config['font_path'],
@@ -37,16 +75,19 @@ def main(page: ft.Page) -> None:
     page.theme.font_family = config.get('theme', {}).get('font_family', 'VCR_OSD_MONO')
     page.title = "Color Mixer"
     page.vertical_alignment = ft.MainAxisAlignment.CENTER
+    # Complements come from the precomputed table when it has been built.
+    install_complement_lut()
     initial_bg = "#{:06x}".format(random.randint(0, 0xFFFFFF))
     page.bgcolor = initial_bg
+    initial_complement = color_cache.complement(initial_bg)
 
     # --- UI State ---
     # Use session-based history if available
-    history: List[Dict[str, Any]] = page.session.get("history") or []
+    history = HistoryStore.from_session(page)
     text_elements: List[Any] = []
 
     # Palette state and UI
-    palette = get_palette(page)
+    session_state = SessionState.for_page(page)
 
     # --- UI Logic ---
     def text_click(e: ft.ControlEvent) -> None:
@@ -57,20 +98,20 @@ def main(page: ft.Page) -> None:
                 value=f"Copied {e.control.text}",
                 color=page.bgcolor
             ),
-            bgcolor=get_complementary_color(page.bgcolor),
+            bgcolor=color_cache.complement(page.bgcolor),
         ))
 
+    @profiler.timed('build_combination_row')
     def build_combination_row(color: Optional[str] = None) -> None:
         """Update the combination row based on the current or given color."""
-        match = find_closest_swatch(color or page.bgcolor, swatches)
-        def update_user_palette_event(e):
-            user_palette.update_palette()
+        swatch_index = get_swatches()[1]
+        match = color_cache.closest_swatch(color or page.bgcolor, swatch_index)
         if match is not None:
             combination_row.update_combination_row(
                 match,
                 page,
                 lambda c, m: combination_row.make_bottom_sheet(
-                    c, m, swatches, change_bg, text_click, update_user_palette=update_user_palette_event
+                    c, m, swatch_index, on_color_change, text_click
                 ),
             )
         else:
@@ -78,10 +119,11 @@ def main(page: ft.Page) -> None:
                 {'hex': '#000000', 'name': None, 'combinations': []},
                 page,
                 lambda c, m: combination_row.make_bottom_sheet(
-                    c, m, swatches, change_bg, text_click, update_user_palette=update_user_palette_event
+                    c, m, swatch_index, on_color_change, text_click
                 ),
             )
 
+    @profiler.timed('_update_text_colors')
     def _update_text_colors(color_info: Optional[Any] = None, palette: Optional[int] = None, palette_colors: Optional[list] = None) -> None:
         # Accepts either a list of colors or a single bg_color string
         if isinstance(color_info, list):
@@ -95,7 +137,7 @@ def main(page: ft.Page) -> None:
             for field in [color1, color2]:
                 field.update_bg_color(random.choice(palette_list))
                 field.update_focused_border_color(random.choice(palette_list))
-                field.update_color(get_complementary_color(field.value) if normalize(field.value) != 'INVALID' else random.choice(palette_list))
+                field.update_color(color_cache.complement(field.value) if color_cache.normalize(field.value) != 'INVALID' else random.choice(palette_list))
             random_fab.update_color(random.choice(palette_list))
             complementary_color_text.update_color(random.choice(palette_list))
             user_palette.update_button_color(random.choice(palette_list))
@@ -108,9 +150,9 @@ def main(page: ft.Page) -> None:
                         color=page.bgcolor
                     )
             # Store palette and palette_colors in session state
-            set_current_state(page, page.bgcolor, get_complementary_color(page.bgcolor), palette, palette_colors)
+            set_current_state(page, page.bgcolor, color_cache.complement(page.bgcolor), palette, palette_colors)
         elif isinstance(color_info, str):
-            complementary = get_complementary_color(color_info)
+            complementary = color_cache.complement(color_info)
             for element in text_elements:
                 if hasattr(element, 'update_color'):
                     element.update_color(complementary)
@@ -120,7 +162,7 @@ def main(page: ft.Page) -> None:
                 field.update_bg_color(color_info)
                 field.update_border_color(complementary)
                 field.update_focused_border_color(complementary)
-                field.update_color(get_complementary_color(field.value) if normalize(field.value) != 'INVALID' else complementary)
+                field.update_color(color_cache.complement(field.value) if color_cache.normalize(field.value) != 'INVALID' else complementary)
             random_fab.update_color(complementary)
             complementary_color_text.update_color(complementary)
             user_palette.update_button_color(complementary)
@@ -132,41 +174,50 @@ def main(page: ft.Page) -> None:
                 for combo in combination_row.controls:
                     if isinstance(combo, ft.Text) and combo.spans and combo.spans[0].text == palette:
                         combo.spans[0].style = ft.TextStyle(
-                            bgcolor=get_complementary_color(page.bgcolor), 
+                            bgcolor=color_cache.complement(page.bgcolor), 
                             color=page.bgcolor
                         )
-        page.update()
+        request_update(page)
 
+    @profiler.timed('change_bg')
     def change_bg(color: Optional[Any] = None, clear_fields: bool = False, palette: Optional[int] = None, palette_colors: Optional[list] = None) -> None:
-        """Change the background color and update history and UI as needed."""
-        # --- Preserve user_palette session key ---
-        user_palette_session = page.session.get('user_palette')
+        """Change the background color and update history and UI as needed.
+
+        Every control change made along the way reaches the client as one update.
+        """
+        with update_transaction(page):
+            _change_bg(color, clear_fields, palette, palette_colors)
+
+    def _change_bg(color: Optional[Any] = None, clear_fields: bool = False, palette: Optional[int] = None, palette_colors: Optional[list] = None) -> None:
         if not color:
             for field in [color1, color2]:
-                norm = normalize(field.value)
+                norm = color_cache.normalize(field.value)
                 if norm == 'INVALID':
                     pass
                 else:
                     field.bgcolor = norm
-                    field.color = get_complementary_color(field.bgcolor)
-                    page.update()
+                    field.color = color_cache.complement(field.bgcolor)
+                    request_update(page)
         elif clear_fields:
             color1.value = ""
             color2.value = ""
-            page.update()
+            request_update(page)
 
         try:
             c1 = c2 = ''
             pair = None
+            transient = False
             if not color:
                 c1 = (color1.value or '').strip()
                 c2 = (color2.value or '').strip()
-                new_color = hexmixer(c1, c2)
+                new_color = mix_colors((c1, c2), space=CONFIG.get('mix_space', 'srgb'))
                 pair = (c1, c2)
             else:
                 if isinstance(color, dict):
                     new_color = color.get("hex", "")
                     pair = color.get("pair", None)
+                    # Transient changes (frames of a hotkey burst) skip history.
+                    transient = color.get("transient", False)
                     if pair:
                         color1.value, color2.value = pair
                     # Accept palette and palette_colors from dict if present
@@ -174,13 +225,13 @@ def main(page: ft.Page) -> None:
                     palette_colors = color.get("palette_colors", color.get("colors", palette_colors))
                 else:
                     new_color = normalize(color)
-                    page.update()
-            complementary = get_complementary_color(new_color)
+                    request_update(page)
+            complementary = color_cache.complement(new_color)
             set_current_state(page, new_color, complementary, palette, palette_colors)
             page.bgcolor = new_color
             mixed_color.update_text(new_color)
             mixed_color.update_color(complementary)
-            mixed_rgb.update_text(HexToRgb(new_color).string)
+            mixed_rgb.update_text(color_cache.rgb_string(new_color))
             mixed_rgb.update_color(complementary)
             complementary_color_text.update_text(complementary)
             complementary_color_text.update_color(complementary)
@@ -188,43 +239,100 @@ def main(page: ft.Page) -> None:
                 _update_text_colors(palette_colors, palette, palette_colors)
             else:
                 _update_text_colors(new_color)
-            add_to_history(page, history, new_color, pair if not color and c1 and c2 else None)
-            history_row.update_history(history)
-            # Ensure user_palette buttons update according to new bg
+            if not transient:
+                add_to_history(page, history, new_color, pair if not color and c1 and c2 else None)
+                history_row.update_history(history)
+            # The remove button depends on whether the new bg is in the palette.
             user_palette.update_palette()
-            # --- Restore user_palette session key if it was clobbered ---
-            if user_palette_session is not None:
-                page.session.set('user_palette', user_palette_session)
-            page.update()
-        except Exception as e:
+            request_update(page)
+        except Exception:
             import traceback
             traceback.print_exc()
             return
 
+    # --- Async handler mode ---
+    # With async_handlers on, color changes are dispatched as tasks: the lookups
+    # run on the compute pool and a change superseded in the meantime is dropped.
+    latest_change = LatestOnly()
+
+    def _target_color(color: Optional[Any]) -> Optional[str]:
+        if isinstance(color, dict):
+            return color.get("hex")
+        if color:
+            return color
+        try:
+            return mix_colors(((color1.value or '').strip(), (color2.value or '').strip()), space=CONFIG.get('mix_space', 'srgb'))
+        except ValueError:
+            return None
+
+    async def change_bg_async(color: Optional[Any] = None, clear_fields: bool = False, palette: Optional[int] = None, palette_colors: Optional[list] = None) -> None:
+        token = latest_change.begin()
+        await run_blocking(prefetch_color, _target_color(color), get_swatches()[1])
+        if latest_change.is_current(token):
+            change_bg(color, clear_fields, palette, palette_colors)
+
+    def dispatch_change_bg(color: Optional[Any] = None, clear_fields: bool = False, palette: Optional[int] = None, palette_colors: Optional[list] = None) -> None:
+        if isinstance(color, str) and color_cache.normalize(color) != 'INVALID':
+            # Let handlers that read page.bgcolor (hotkeys) build on the pending change.
+            page.bgcolor = color_cache.normalize(color)
+        page.run_task(change_bg_async, color, clear_fields, palette, palette_colors)
+
+    on_color_change = dispatch_change_bg if CONFIG.get('async_handlers', False) and hasattr(page, 'run_task') else change_bg
+
     def update_user_palette():
         """Convenience function to update the user palette UI immediately."""
         user_palette.update_palette()
 
     # Palette state and UI (must be after change_bg is defined)
     user_palette = UserPalette(
-        change_bg=change_bg,
-        comp_color=get_complementary_color(initial_bg),
+        change_bg=on_color_change,
+        comp_color=initial_complement,
         text_click=text_click,
     )
+    # Palette replacements from a combination sheet arrive as state changes.
+    session_state.subscribe(lambda changes: user_palette.update_palette(), 'user_palette')
 
     # --- Hotkeys ---
-    page.on_keyboard_event = core.hotkeys.make_hotkey_handler(page, change_bg)
+    @profiler.timed('record_hotkey_color')
+    def record_hotkey_color(new_color: str) -> None:
+        """Add the color a hotkey burst settled on to history."""
+        with update_transaction(page):
+            add_to_history(page, history, new_color)
+            if history_row.update_history(history):
+                request_update(history_row)
+
+    on_hotkey = core.hotkeys.make_hotkey_handler(
+        page,
+        on_color_change,
+        on_settle=record_hotkey_color,
+        # The color fields are created below; hotkeys only arrive after main() returns.
+        is_typing=lambda: color1.has_focus or color2.has_focus,
+    )
+    page.on_keyboard_event = on_hotkey
+
+    # --- Profiling (opt-in, see core.profiling) ---
+    if setup_profiling():
+        debug_overlay = DebugOverlay()
+        page.overlay.append(debug_overlay)
+
+        def on_key(e: ft.KeyboardEvent) -> None:
+            if e.key == "F12":
+                debug_overlay.toggle()
+            else:
+                on_hotkey(e)
+
+        page.on_keyboard_event = on_key
 
     # --- UI Components (stateless) ---
-    color1 = ColorInput(border_color=get_complementary_color(initial_bg), on_change=lambda e: change_bg(), on_submit=lambda e: change_bg())
-    color2 = ColorInput(border_color=get_complementary_color(initial_bg), on_change=lambda e: change_bg(), on_submit=lambda e: change_bg())
+    color1 = ColorInput(border_color=initial_complement, on_change=lambda e: on_color_change(), on_submit=lambda e: on_color_change())
+    color2 = ColorInput(border_color=initial_complement, on_change=lambda e: on_color_change(), on_submit=lambda e: on_color_change())
     color1.set_page(page)
     color2.set_page(page)
 
     mixed_color = MixedColorText(initial_bg, on_click=text_click)
     mixed_rgb = MixedRGBText(initial_bg, on_click=text_click)
     complementary_color_text = ComplementaryColorText(
-        complementary_color=get_complementary_color(initial_bg),
+        complementary_color=initial_complement,
         on_click=text_click
     )
 
@@ -238,7 +346,7 @@ def main(page: ft.Page) -> None:
     combination_row = combination_row_container.combination_row
     history_row = HistoryRow(
         history=history,
-        change_bg=change_bg
+        change_bg=on_color_change
     )
     display_text = ColorDisplayColumn(
         complementary_color_text=complementary_color_text,
@@ -251,7 +359,7 @@ def main(page: ft.Page) -> None:
     # --- Random FAB ---
     random_fab = RandomFAB(
         page=page,
-        update_text_colors=change_bg,  # Pass change_bg as the callback
+        update_text_colors=on_color_change,  # Pass change_bg as the callback
         history=history,
         history_row=history_row,
     )
@@ -270,19 +378,48 @@ def main(page: ft.Page) -> None:
                 ]),
             ]
 
+    # --- Staged startup ---
+    # The first frame shows the inputs and color readouts only; history, palette
+    # colors and swatch combinations are filled in right after it is sent.
     page.add(ft.SafeArea(content=DisplayArea(), expand=True))
-    history.append(
-        {
-            "hex": initial_bg,
-            "pair": (color1.value, color2.value) if color1.value and color2.value else None
-        }
-    )
-    history_row.update_history(history)
-    _update_text_colors(initial_bg)    
-
     page.floating_action_button = random_fab
-
     page.update()
+    startup_metrics.mark('first_frame')
+
+    @profiler.timed('hydrate')
+    def hydrate() -> None:
+        """Fill in the secondary components and send them as one update."""
+        with update_transaction(page):
+            # A color picked before hydration already did all of this for its own color.
+            if page.bgcolor == initial_bg:
+                history.append(
+                    {
+                        "hex": initial_bg,
+                        "pair": (color1.value, color2.value) if color1.value and color2.value else None
+                    }
+                )
+                _update_text_colors(initial_bg)
+            history_row.update_history(history)
+            request_update(page)
+        startup_metrics.mark('hydrated')
+        metrics_file = CONFIG.get('startup_metrics_file')
+        if metrics_file:
+            try:
+                startup_metrics.write(metrics_file)
+            except OSError:
+                import traceback
+                traceback.print_exc()
+
+    async def hydrate_async() -> None:
+        # Load the catalogue and warm the lookups off the event loop.
+        _, swatch_index = await run_blocking(get_swatches)
+        await run_blocking(prefetch_color, initial_bg, swatch_index)
+        hydrate()
+
+    if CONFIG.get('deferred_startup', True) and hasattr(page, 'run_task'):
+        page.run_task(hydrate_async)
+    else:
+        hydrate()
 
 if __name__ == "__main__":
     ft.app(target=main, assets_dir="assets")
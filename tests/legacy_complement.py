@@ -0,0 +1,45 @@
+"""Reference implementation for get_complementary_color.
+
+The original colorsys-based search, which the optimized version must match
+exactly. Used by test_color_utils and by benchmarks/bench_complement.py.
+"""
+import colorsys
+
+def legacy_complementary_color(hex_color: str) -> str:
+    """The implementation get_complementary_color replaced, kept verbatim as the reference."""
+    def luminance(rgb: tuple) -> float:
+        def channel(c: float) -> float:
+            c = c / 255.0
+            return c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4
+        r, g, b = rgb
+        return 0.2126 * channel(r) + 0.7152 * channel(g) + 0.0722 * channel(b)
+
+    def contrast(rgb1: tuple, rgb2: tuple) -> float:
+        l1 = luminance(rgb1)
+        l2 = luminance(rgb2)
+        lighter = max(l1, l2)
+        darker = min(l1, l2)
+        return (lighter + 0.05) / (darker + 0.05)
+
+    rgb = tuple(int(hex_color[i:i+2], 16) for i in (1, 3, 5))
+    if max(rgb) - min(rgb) < 10:
+        comp_rgb = tuple(255 - c for c in rgb)
+    else:
+        hsv = colorsys.rgb_to_hsv(rgb[0]/255, rgb[1]/255, rgb[2]/255)
+        complementary_hsv = ((hsv[0] + 0.5) % 1.0, hsv[1], hsv[2])
+        comp_rgb = tuple(int(x * 255) for x in colorsys.hsv_to_rgb(*complementary_hsv))
+    if contrast(rgb, comp_rgb) < 4.5:
+        h, s, v = colorsys.rgb_to_hsv(*[c/255 for c in comp_rgb])
+        best_rgb = comp_rgb
+        best_contrast = contrast(rgb, comp_rgb)
+        for delta in [0.05 * i for i in range(1, 11)]:
+            for new_v in [min(1.0, v + delta), max(0.0, v - delta)]:
+                adj_rgb = tuple(int(x * 255) for x in colorsys.hsv_to_rgb(h, s, new_v))
+                cval = contrast(rgb, adj_rgb)
+                if cval > best_contrast:
+                    best_contrast = cval
+                    best_rgb = adj_rgb
+                if cval >= 4.5:
+                    return "#{:02x}{:02x}{:02x}".format(*adj_rgb)
+        comp_rgb = best_rgb
+    return "#{:02x}{:02x}{:02x}".format(*comp_rgb)
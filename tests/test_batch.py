@@ -0,0 +1,66 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core import batch
+from core.color_utils import normalize, hexmixer, get_complementary_color, contrast_ratio
+
+COLORS = ["#ffffff", "#000000", "#123456", "#abcdef", "#7f7f80", "#ff0000", "#00ff00", "#0a0b0c", "#c0ffee"]
+
+def test_to_rgb_accepts_strings_packed_and_arrays():
+    rgb = batch.to_rgb(["#ff0000", "00ff00", "(0,0,255)"])
+    assert rgb.dtype == np.uint8
+    assert rgb.tolist() == [[255, 0, 0], [0, 255, 0], [0, 0, 255]]
+    assert batch.to_rgb(np.array([0xFF0000, 0x00FF00, 0x0000FF])).tolist() == rgb.tolist()
+    assert batch.to_rgb(rgb) is rgb
+    assert batch.pack(rgb).tolist() == [0xFF0000, 0x00FF00, 0x0000FF]
+    assert batch.to_hex(rgb) == ["#ff0000", "#00ff00", "#0000ff"]
+
+def test_to_rgb_rejects_invalid():
+    with pytest.raises(ValueError):
+        batch.to_rgb(["#ffffff", "notacolor"])
+    with pytest.raises(ValueError):
+        batch.to_rgb(np.array([[256, 0, 0]]))
+    with pytest.raises(ValueError):
+        batch.to_rgb(np.array([0x1000000]))
+
+def test_normalize_many():
+    assert batch.normalize_many(["FFFFFF", None]) == [normalize("FFFFFF"), "INVALID"]
+
+def test_mix_matches_hexmixer():
+    mixed = batch.to_hex(batch.mix(COLORS, COLORS[::-1]))
+    assert mixed == [hexmixer(a, b) for a, b in zip(COLORS, COLORS[::-1])]
+
+def test_complementary_matches_scalar():
+    rng = np.random.default_rng(0)
+    packed = np.concatenate([rng.integers(0, 1 << 24, 5000), batch.pack(COLORS)])
+    expected = [get_complementary_color(f"#{v:06x}") for v in packed.tolist()]
+    assert batch.to_hex(batch.complementary(packed)) == expected
+
+def test_contrast_matches_scalar():
+    ratios = batch.contrast(COLORS, COLORS[::-1])
+    assert ratios.tolist() == [contrast_ratio(a, b) for a, b in zip(COLORS, COLORS[::-1])]
+
+def test_to_lab_matches_scalar():
+    from core.color_utils import to_lab
+    labs = batch.to_lab(COLORS)
+    assert labs.shape == (len(COLORS), 3)
+    for row, color in zip(labs.tolist(), COLORS):
+        assert row == pytest.approx(to_lab(color), abs=1e-9)
+
+@pytest.mark.parametrize("space", ["srgb", "linear", "lab", "oklab"])
+def test_mix_colors_matches_scalar(space):
+    from core.color_utils import mix_colors
+    columns = [COLORS, COLORS[::-1], COLORS[3:] + COLORS[:3]]
+    for weights in (None, (3, 1, 2), (0.2, 0.5, 0.3)):
+        mixed = batch.to_hex(batch.mix_colors(columns, weights, space))
+        assert mixed == [mix_colors(row, weights, space) for row in zip(*columns)]
+
+def test_mix_colors_per_row_weights():
+    weights = np.array([[1, 0], [0, 1]])
+    mixed = batch.mix_colors([["#ff0000", "#ff0000"], ["#00ff00", "#00ff00"]], weights)
+    assert batch.to_hex(mixed) == ["#ff0000", "#00ff00"]
+    with pytest.raises(ValueError):
+        batch.mix_colors([["#ff0000"], ["#00ff00", "#0000ff"]])
+    with pytest.raises(ValueError):
+        batch.mix_colors([["#ff0000"]], weights=(1, 2))
@@ -0,0 +1,66 @@
+import pytest
+from core.cache import BoundedCache, ColorCache, color_cache
+from core.color_utils import get_complementary_color, normalize, luminance
+
+def test_bounded_cache_lru_eviction_and_stats():
+    cache = BoundedCache(maxsize=2)
+    assert cache.get_or_compute('a', lambda: 1) == 1
+    assert cache.get_or_compute('b', lambda: 2) == 2
+    assert cache.get_or_compute('a', lambda: 99) == 1  # hit refreshes 'a'
+    cache.get_or_compute('c', lambda: 3)  # evicts 'b'
+    assert 'a' in cache and 'b' not in cache
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 3, 1)
+    assert stats['hit_rate'] == 0.25
+
+def test_bounded_cache_fifo_eviction():
+    cache = BoundedCache(maxsize=2, eviction='fifo')
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('b', lambda: 2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('c', lambda: 3)  # evicts 'a' despite the hit
+    assert 'a' not in cache and 'b' in cache
+    with pytest.raises(ValueError):
+        BoundedCache(eviction='random')
+
+def test_color_cache_matches_color_utils():
+    cache = ColorCache(maxsize=8)
+    assert cache.normalize('ABCDEF') == normalize('ABCDEF')
+    assert cache.complement('#abcdef') == get_complementary_color('#abcdef')
+    assert cache.complement('abcdef') == get_complementary_color('#abcdef')
+    assert cache.rgb_string('#010203') == '(1, 2, 3)'
+    assert cache.rgb_tuple('#010203') == (1, 2, 3)
+    assert cache.luminance('#abcdef') == luminance('#abcdef')
+    assert cache.stats()['complement']['hits'] == 1
+    with pytest.raises(ValueError):
+        cache.complement('notacolor')
+
+def test_closest_swatch_invalidation():
+    cache = ColorCache()
+    swatches = [{"hex": "#ff0000", "name": "Red", "combinations": ["A"]}]
+    assert cache.closest_swatch('#ff0001', swatches)['name'] == 'Red'
+    assert cache.closest_swatch('#ff0001', swatches)['name'] == 'Red'
+    assert cache.stats()['closest_swatch']['hits'] == 1
+    reloaded = [{"hex": "#ff0000", "name": "Scarlet", "combinations": []}]
+    assert cache.closest_swatch('#ff0001', reloaded)['name'] == 'Scarlet'
+    cache.invalidate_swatches()
+    assert cache.stats()['closest_swatch']['size'] == 0
+    cache.clear()
+    assert all(s['size'] == 0 for s in cache.stats().values())
+
+def test_cached_results_are_copies():
+    cache = ColorCache()
+    swatches = [{"hex": "#ff0000", "name": "Red", "combinations": ["A"]}]
+    match = cache.closest_swatch('#ff0001', swatches)
+    match['name'] = 'Changed'
+    match['combinations'].append('B')
+    assert cache.closest_swatch('#ff0001', swatches) == {'hex': '#ff0000', 'name': 'Red', 'combinations': ['A']}
+    assert swatches[0]['combinations'] == ['A']
+    rgb = cache.rgb('#010203')
+    rgb['tuple'] = (9, 9, 9)
+    assert cache.rgb('#010203') == {'string': '(1, 2, 3)', 'tuple': (1, 2, 3)}
+    assert cache.stats()['rgb']['hits'] == 1
+
+def test_shared_instance_configured():
+    assert isinstance(color_cache, ColorCache)
+    assert color_cache.maxsize >= 1
@@ -0,0 +1,61 @@
+import io
+import json
+import pytest
+from core import cli
+from core.color_utils import contrast_ratio, get_complementary_color, mix_colors
+
+def test_parse_line_formats():
+    assert cli.parse_line('#FF0000, 00f') == ['#ff0000', '#0000ff']
+    assert cli.parse_line('255 255 255; rgb(0, 0, 0)') == ['#ffffff', '#000000']
+    assert cli.parse_line('123456') == ['#123456']
+    assert cli.parse_line('{"color1": "#fff", "color2": [1, 2, 3]}') == ['#ffffff', '#010203']
+    assert cli.parse_line('[10, 20, 30]') == ['#0a141e']
+    assert cli.parse_line('   \n') == []
+    for bad in ('#12345g', '1 2', '{"colors": 5}', '[256, 0, 0]'):
+        with pytest.raises(cli.ParseError):
+            cli.parse_line(bad)
+
+def test_process_chunk_matches_scalar_helpers(monkeypatch):
+    lines = ['#123456,#abcdef\n', '\n', 'nope\n', '#000000 #ffffff #808080\n']
+    text, errors = cli.process_chunk(cli.Options('mix'), ('in', 7, lines))
+    assert text.splitlines() == [
+        f'#123456\t#abcdef\t{mix_colors(("#123456", "#abcdef"))}',
+        f'#000000\t#ffffff\t#808080\t{mix_colors(("#000000", "#ffffff", "#808080"))}',
+    ]
+    assert errors == ["in:9: invalid color 'nope'"]
+    for batch in (cli.batch, None):
+        monkeypatch.setattr(cli, 'batch', batch)
+        text, _ = cli.process_chunk(cli.Options('complement', output_format='csv'), ('in', 1, ['#123456\n', '#fedcba\n']))
+        assert text == f'#123456,{get_complementary_color("#123456")}\n#fedcba,{get_complementary_color("#fedcba")}\n'
+        text, _ = cli.process_chunk(cli.Options('contrast', output_format='jsonl'), ('in', 1, ['#123456 #fedcba\n']))
+        assert json.loads(text)['contrast'] == pytest.approx(contrast_ratio('#123456', '#fedcba'))
+
+def test_read_chunks_is_lazy_and_numbered():
+    chunks = cli.read_chunks(['-'], 2, stdin=io.StringIO('a\nb\nc\n'))
+    assert next(chunks) == ('<stdin>', 1, ['a\n', 'b\n'])
+    assert next(chunks) == ('<stdin>', 3, ['c\n'])
+
+def test_main_with_workers_keeps_order(tmp_path, capsys):
+    source = tmp_path / 'colors.txt'
+    colors = [f'#{i * 4099:06x}' for i in range(50)]
+    source.write_text('\n'.join(colors + ['#zzzzzz']) + '\n')
+    out = tmp_path / 'out.tsv'
+    assert cli.main(['complement', str(source), '-o', str(out), '--chunk-size', '7', '--workers', '2']) == 1
+    assert out.read_text().splitlines() == [f'{c}\t{get_complementary_color(c)}' for c in colors]
+    assert f'{source}:51' in capsys.readouterr().err
+
+def test_closest_uses_swatch_catalogue(tmp_path, capsys):
+    swatches = tmp_path / 'swatches.json'
+    swatches.write_text(json.dumps([{'hex': '#ff0000', 'name': 'Red', 'combinations': [1]}]))
+    source = tmp_path / 'colors.txt'
+    source.write_text('#fe0101\n#0000ff\n')
+    assert cli.main(['closest', str(source), '--swatches', str(swatches)]) == 0
+    assert capsys.readouterr().out.splitlines() == ['#fe0101\tRed\t#ff0000', '#0000ff\t\t']
+    with pytest.raises(SystemExit):
+        cli.main(['closest', str(source), '--swatches', str(swatches), '--metric', 'cie2000'])
+    assert "invalid choice: 'cie2000'" in capsys.readouterr().err
+
+def test_closest_defaults_to_bundled_catalogue(capsys, monkeypatch):
+    monkeypatch.setattr('sys.stdin', io.StringIO('#f9c1cf\n'))
+    assert cli.main(['closest']) == 0
+    assert capsys.readouterr().out == '#f9c1cf\tHermosa Pink\t#f9c1ce\n'
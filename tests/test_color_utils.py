@@ -1,5 +1,5 @@
 import pytest
-from core.color_utils import normalize, hexmixer, get_complementary_color, find_closest_swatch, CloseSwatch
+from core.color_utils import normalize, hexmixer, get_complementary_color, find_closest_swatch, CloseSwatch, contrast_ratio, luminance, to_lab, delta_e76, delta_e94, delta_e2000, Color, HexToRgb, mix_colors, MIX_SPACES
 
 @pytest.mark.parametrize("input_color,expected", [
     ("#ffffff", "#ffffff"),
@@ -9,10 +9,24 @@ from core.color_utils import normalize, hexmixer, get_complementary_color, find_
     ("255 255 255", "#ffffff"),
     (None, "INVALID"),
     ("notacolor", "INVALID"),
+    ("#FFF", "#ffffff"),
+    ("abc", "#aabbcc"),
+    ("  #AbCdEf ", "#abcdef"),
+    ("rgb(1, 2, 3)", "#010203"),
+    ("RGB( 1 2 3 )", "#010203"),
+    ("(300,-4,20)", "#ff0014"),
+    ("(a,b,c)", "INVALID"),
+    ("(1,2,3", "INVALID"),
+    ("1 2 3 4", "INVALID"),
+    ("#abcd", "INVALID"),
 ])
 def test_normalize(input_color, expected):
     assert normalize(input_color) == expected
 
+def test_normalize_returns_canonical_input_unchanged():
+    color = "#4edec1"
+    assert normalize(color) is color
+
 def test_hexmixer():
     assert hexmixer("#ffffff", "#000000") == "#7f7f7f"
     assert hexmixer("#ff0000", "#00ff00") == "#7f7f00"
@@ -35,3 +49,73 @@ def test_find_closest_swatch():
     assert "name" in result
     assert "combinations" in result
     assert find_closest_swatch("#123456", swatches) is None
+
+def test_contrast_ratio():
+    assert contrast_ratio("#ffffff", "#000000") == pytest.approx(21.0)
+    assert contrast_ratio("#123456", "#123456") == 1.0
+    assert luminance("#000000") == 0.0
+
+def test_to_lab_and_delta_e():
+    assert to_lab("#ffffff") == pytest.approx((100.0, 0.0, 0.0), abs=1e-3)
+    # Reference pair from Sharma, Wu & Dalal's CIEDE2000 test data
+    assert delta_e2000((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485)) == pytest.approx(2.0425, abs=1e-4)
+    assert delta_e76((0, 0, 0), (3, 4, 0)) == 5.0
+    assert delta_e94((50, 0, 0), (50, 0, 0)) == 0.0
+
+def test_get_complementary_color_matches_legacy_search():
+    import random
+    from tests.legacy_complement import legacy_complementary_color
+    rng = random.Random(4)
+    colors = [f"#{rng.randrange(1 << 24):06x}" for _ in range(3000)]
+    colors += ["#808080", "#000000", "#ffffff", "#0a0a0a", "#ff0000", "#7f7f80", "#fefe00"]
+    for color in colors:
+        assert get_complementary_color(color) == legacy_complementary_color(color), color
+
+def test_color_value_type():
+    color = Color.parse("ABC")
+    assert color.value == 0xAABBCC
+    assert color.hex == "#aabbcc" and str(color) == "#aabbcc"
+    assert color.rgb == (170, 187, 204)
+    assert color.rgb_string == HexToRgb("#aabbcc").string
+    assert color.lab == to_lab("#aabbcc")
+    assert color == Color(0xAABBCC) == "#aabbcc"
+    assert hash(color) == hash("#aabbcc")
+    assert "#aabbcc" in {color} and color in ["#aabbcc"]
+    assert Color.parse((170, 187, 204)) == color
+    assert normalize(color) == "#aabbcc"
+    assert get_complementary_color(color) == get_complementary_color("#aabbcc")
+    assert Color("#FFF") == Color("#ffffff")
+    assert hash(Color("#FFF")) == hash(Color(0xFFFFFF)) == hash("#ffffff")
+    # Equal only to strings it hashes like.
+    assert Color("#fff") == "#ffffff" and "#ffffff" in {Color("#FFF")}
+    assert Color("#ffffff") != "fff" and "fff" not in {Color("#ffffff")}
+    assert Color("#fff") != "#fffffe" and Color("#fff") != "notacolor"
+    with pytest.raises(ValueError):
+        Color("notacolor")
+    with pytest.raises(AttributeError):
+        color.value = 0  # type: ignore
+    with pytest.raises(ValueError):
+        Color(0x1000000)
+    with pytest.raises(ValueError):
+        Color.parse("notacolor")
+
+def test_mix_colors():
+    assert mix_colors(["#ffffff", "#000000"]) == hexmixer("#ffffff", "#000000")
+    assert mix_colors(["#ff0000", "#0000ff"], weights=(2, 1)) == "#aa0055"
+    assert mix_colors(["#ff0000", "#00ff00", "#0000ff"]) == "#555555"
+    assert mix_colors(["#ff0000", "#0000ff"], space="linear") == "#bc00bc"
+    for space in MIX_SPACES:
+        assert mix_colors(["#123456"], space=space) == "#123456"
+        assert mix_colors(["#c0ffee", "#c0ffee"], weights=(0.3, 0.7), space=space) == "#c0ffee"
+    # Mixing in Lab or OKLab keeps a neutral pair neutral.
+    assert mix_colors(["#ffffff", "#000000"], space="oklab") == "#636363"
+    with pytest.raises(ValueError):
+        mix_colors([])
+    with pytest.raises(ValueError):
+        mix_colors(["#ffffff", "#000000"], weights=(1,))
+    with pytest.raises(ValueError):
+        mix_colors(["#ffffff", "#000000"], weights=(0, 0))
+    with pytest.raises(ValueError):
+        mix_colors(["#ffffff", "nope"])
+    with pytest.raises(ValueError):
+        mix_colors(["#ffffff"], space="cmyk")
@@ -0,0 +1,72 @@
+import pytest
+import core.color_utils as color_utils
+from core import complement_lut
+from core.cache import color_cache
+from core.color_utils import _complement_rgb, get_complementary_color
+from core.complement_lut import ENTRIES, MAGIC, SAMPLE, TABLE_SIZE, VERSION, ComplementLUT, _HEADER, install, load, uninstall
+
+# Colors whose entries the sparse test table fills in besides SAMPLE.
+COLORS = ('#336699', '#4edec1', '#ff0000')
+
+def _write_table(path, colors=(), wrong=None, version=VERSION):
+    """A full-size but sparse table holding correct entries for SAMPLE and colors only."""
+    with open(path, 'wb') as file:
+        file.truncate(TABLE_SIZE)
+        file.write(_HEADER.pack(MAGIC, version, ENTRIES))
+        packed = list(SAMPLE) + [int(color[1:], 16) for color in colors]
+        for p in packed:
+            rgb = _complement_rgb((p >> 16, (p >> 8) & 0xFF, p & 0xFF))
+            if p == wrong:
+                rgb = tuple(255 - c for c in rgb)
+            file.seek(_HEADER.size + 3 * p)
+            file.write(bytes(rgb))
+    return str(path)
+
+@pytest.fixture(autouse=True)
+def live_complements():
+    uninstall()
+    color_cache.clear()
+    yield
+    uninstall()
+    color_cache.clear()
+
+def test_lookup_matches_live(tmp_path):
+    path = _write_table(tmp_path / 'complements.lut', COLORS)
+    expected = [get_complementary_color(color) for color in COLORS]
+    assert install(path)
+    assert isinstance(color_utils._complement_table, ComplementLUT)
+    assert [get_complementary_color(color) for color in COLORS] == expected
+    assert color_cache.complement('#336699') == expected[0]
+    assert install(path)  # already installed: no reload
+
+def test_batch_uses_table(tmp_path):
+    np = pytest.importorskip('numpy')
+    from core import batch
+    packed = np.array([int(color[1:], 16) for color in COLORS])
+    expected = batch.complementary(packed)
+    assert install(_write_table(tmp_path / 'complements.lut', COLORS))
+    assert np.array_equal(batch.complementary(packed), expected)
+
+def test_unusable_tables_are_rejected(tmp_path):
+    assert load(str(tmp_path / 'missing.lut')) is None
+    stale = _write_table(tmp_path / 'stale.lut', wrong=SAMPLE[3])
+    assert not install(stale)
+    assert color_utils._complement_table is None
+    future = _write_table(tmp_path / 'future.lut', version=VERSION + 1)
+    with pytest.raises(ValueError):
+        ComplementLUT(future)
+    short = tmp_path / 'short.lut'
+    short.write_bytes(_HEADER.pack(MAGIC, VERSION, ENTRIES))
+    with pytest.raises(ValueError):
+        ComplementLUT(str(short))
+    # Without a table the live path still answers.
+    assert get_complementary_color('#336699') == '#{:02x}{:02x}{:02x}'.format(*_complement_rgb((0x33, 0x66, 0x99)))
+
+def test_install_from_config(tmp_path, monkeypatch):
+    path = _write_table(tmp_path / 'configured.lut')
+    monkeypatch.setitem(complement_lut.CONFIG, 'complement_lut_file', path)
+    assert install()
+    assert color_utils._complement_table.path == path
+    uninstall()
+    monkeypatch.setitem(complement_lut.CONFIG, 'complement_lut_file', None)
+    assert not install()
@@ -52,3 +52,33 @@ def test_color_swatch_click(monkeypatch):
     swatch._handle_click(DummyControlEvent())  # type: ignore
     assert called['arg']['hex'] == '#00ff00'
     assert called['arg']['palette_colors'] == ['#00ff00']
+
+@pytest.mark.filterwarnings('ignore')
+def test_make_bottom_sheet_uses_combination_index():
+    from core.swatch_index import SwatchIndex
+    catalogue = [
+        {'hex': '#ff0000', 'name': 'Red', 'combinations': [1, 2]},
+        {'hex': '#00ff00', 'name': 'Green', 'combinations': [2]},
+        {'hex': '#0000ff', 'name': 'Blue', 'combinations': [1]},
+    ]
+    row = CombinationRow()
+    for source in (SwatchIndex(catalogue), catalogue):
+        sheet = row.make_bottom_sheet('1', catalogue[0], source, lambda arg: None, lambda e: None)
+        swatches = sheet.content.controls[0].controls
+        assert [s.name for s in swatches] == ['Red', 'Blue']
+        assert swatches[0].palette == ['#ff0000', '#0000ff']
+
+@pytest.mark.filterwarnings('ignore')
+def test_make_bottom_sheet_reuses_built_sheet():
+    from core.swatch_index import SwatchIndex
+    catalogue = [
+        {'hex': '#ff0000', 'name': 'Red', 'combinations': [1]},
+        {'hex': '#0000ff', 'name': 'Blue', 'combinations': [1]},
+    ]
+    index = SwatchIndex(catalogue)
+    row = CombinationRow()
+    sheet = row.make_bottom_sheet('1', catalogue[0], index, lambda arg: None, lambda e: None)
+    assert row.make_bottom_sheet(1, catalogue[0], index, lambda arg: None, lambda e: None) is sheet
+    assert row.make_bottom_sheet('1', catalogue[1], index, lambda arg: None, lambda e: None) is not sheet
+    row.clear_sheets()
+    assert row.make_bottom_sheet('1', catalogue[0], index, lambda arg: None, lambda e: None) is not sheet
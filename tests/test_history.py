@@ -29,3 +29,56 @@ def test_history_item():
     item = HistoryItem({"hex": "#abcdef"}, dummy_change_bg)
     item.on_click(DummyEvent())  # type: ignore
     assert called['arg']['hex'] == '#abcdef'
+
+def test_history_row_reuses_items():
+    history = [{"hex": "#111111"}, {"hex": "#222222"}]
+    row = HistoryRow(history, lambda arg, clear_fields=False: None)
+    assert [c.bgcolor for c in row.controls] == ["#222222", "#111111"]
+    first = list(row.controls)
+    assert row.update_history(history) is False
+    assert all(a is b for a, b in zip(row.controls, first))
+    history.append({"hex": "#111111"})
+    assert row.update_history(history) is True
+    assert [c.bgcolor for c in row.controls] == ["#111111", "#222222", "#111111"]
+    assert row.controls[1] is first[0] and row.controls[2] is first[1]
+    assert row.controls[0] is not first[1]
+    del history[0]
+    row.update_history(history)
+    assert len(row.controls) == 2 and row.controls[1] is first[0]
+
+def test_history_row_virtualizes_long_history():
+    history = [{"hex": "#%06x" % i} for i in range(200)]
+    row = HistoryRow(history, lambda arg, clear_fields=False: None, window=20, overscan=5, compact=False)
+    items = [c for c in row.controls if isinstance(c, HistoryItem)]
+    assert len(items) == 20 and items[0].bgcolor == "#0000c7"
+    assert row.controls[-1].width == 180 * 65
+    assert row.scroll_to_index(2, 10) is False
+    assert row.scroll_to_index(100, 10) is True
+    lead, first = row.controls[0], row.controls[1]
+    assert lead.width == 95 * 65 and first.bgcolor == "#%06x" % (199 - 95)
+    assert sum(isinstance(c, HistoryItem) for c in row.controls) == 20
+    assert row.controls[-1].width == (200 - 115) * 65
+
+def test_history_row_string_duplicates_get_own_items():
+    row = HistoryRow(["#111111", "#222222", "#111111"], lambda arg, clear_fields=False: None, compact=False)
+    assert len({id(c) for c in row.controls}) == 3
+
+def test_history_row_compact_strip():
+    import base64, struct, zlib
+    from components.history import encode_png_strip
+    called = {}
+    def dummy_change_bg(arg, clear_fields=False):
+        called['arg'] = arg
+    history = [{"hex": "#ff0000"}, {"hex": "#00ff00"}, {"hex": "#0000ff"}]
+    row = HistoryRow(history, dummy_change_bg, compact=True)
+    assert len(row.controls) == 1
+    png = base64.b64decode(row.controls[0].content.src_base64)
+    assert png == encode_png_strip(["#0000ff", "#00ff00", "#ff0000"])
+    assert png.startswith(b'\x89PNG') and struct.unpack('>II', png[16:24]) == (3, 1)
+    idat = png[33 + 8:-12 - 4]
+    assert zlib.decompress(idat) == b'\x00\x00\x00\xff\x00\xff\x00\xff\x00\x00'
+    tap = type('E', (), {'local_x': row.strip_item_width * 1.5})()
+    row._handle_strip_tap(tap)  # type: ignore
+    assert called['arg'] is history[1]
+    assert row.set_compact(False) is True
+    assert len(row.controls) == 3
@@ -18,3 +18,92 @@ def test_make_hotkey_handler_runs():
     e = type('E', (), {'key': 'Arrow Up', 'shift': False})()
     handler(e)  # type: ignore
     assert called['flag']
+
+def _key(key, shift=False, **mods):
+    return type('E', (), {'key': key, 'shift': shift, **mods})()
+
+def test_hotkey_engine_coalesces_frames_and_settles_once():
+    import time
+    from core.hotkeys import HotkeyEngine
+    page: Any = DummyPage()  # type: ignore
+    applied, settled = [], []
+    def change_bg(arg, clear_fields=False):
+        applied.append(arg)
+        page.bgcolor = arg['hex']
+    engine = HotkeyEngine(page, change_bg, on_settle=settled.append, space='rgb', max_fps=5, settle_ms=100)
+    for _ in range(5):
+        engine.handle(_key('Arrow Right'))  # type: ignore
+    # The first press applies at once; the rest wait for the next frame.
+    assert applied == [{'hex': '#1c3456', 'transient': True}]
+    time.sleep(0.45)
+    assert len(applied) == 2 and applied[-1]['transient']
+    # Four accelerated repeats on top of the first step.
+    assert int(applied[-1]['hex'][1:3], 16) > 0x12 + 50
+    assert settled == [applied[-1]['hex']]
+    assert engine.presses == 5 and engine.frames == 2
+
+def test_hotkey_engine_modifiers_and_spaces():
+    from core.hotkeys import HotkeyEngine
+    page: Any = DummyPage()  # type: ignore
+    applied = []
+    def change_bg(arg, clear_fields=False):
+        applied.append(arg['hex'])
+        page.bgcolor = arg['hex']
+    engine = HotkeyEngine(page, change_bg, space='rgb', max_fps=1000, settle_ms=10000)
+    engine.handle(_key('Arrow Up', shift=True, alt=True))  # type: ignore
+    assert applied[-1] == '#123457'
+    engine.settle()
+    engine._next_frame = 0
+    engine.handle(_key('Arrow Down', ctrl=True))  # type: ignore
+    assert applied[-1] == '#120c57'
+    engine.settle()
+    assert engine.handle(_key('m')) and engine.space == 'hsv'  # type: ignore
+    engine._next_frame = 0
+    engine.handle(_key('Arrow Right'))  # type: ignore
+    from core.color_utils import _rgb8_to_hsv, _parse_rgb
+    h_before = _rgb8_to_hsv(*_parse_rgb('#120c57'))[0] * 360
+    h_after = _rgb8_to_hsv(*_parse_rgb(applied[-1]))[0] * 360
+    assert abs(((h_after - h_before) % 360) - 10) < 2
+    engine.settle()
+    assert not engine.handle(_key('x'))  # type: ignore
+
+def test_hotkeys_ignored_while_typing():
+    page: Any = DummyPage()  # type: ignore
+    applied, helps = [], []
+    typing = {'focused': True}
+    page.open = helps.append
+    handler = make_hotkey_handler(page, applied.append, is_typing=lambda: typing['focused'])
+    for key in ('Arrow Up', 'm', 'h'):
+        handler(_key(key))  # type: ignore
+    assert applied == [] and helps == [] and handler.engine.space == 'rgb'  # type: ignore[attr-defined]
+    typing['focused'] = False
+    handler(_key('Arrow Up'))  # type: ignore
+    assert len(applied) == 1
+
+def test_hotkey_timers_emit_on_page_loop():
+    import asyncio
+    import threading
+    from core.hotkeys import HotkeyEngine
+    page: Any = DummyPage()  # type: ignore
+    page.loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=page.loop.run_forever, daemon=True)
+    loop_thread.start()
+    threads, settled = [], threading.Event()
+    def change_bg(arg, clear_fields=False):
+        threads.append(threading.current_thread())
+        page.bgcolor = arg['hex']
+    def on_settle(hex_color):
+        threads.append(threading.current_thread())
+        settled.set()
+    try:
+        engine = HotkeyEngine(page, change_bg, on_settle=on_settle, space='rgb', max_fps=5, settle_ms=50)
+        engine.handle(_key('Arrow Right'))  # type: ignore
+        engine.handle(_key('Arrow Right'))  # type: ignore
+        assert settled.wait(2)
+    finally:
+        page.loop.call_soon_threadsafe(page.loop.stop)
+        loop_thread.join(2)
+        page.loop.close()
+    # The first press applies on the caller's thread; the frame and settle come from the loop.
+    assert threads[0] is threading.current_thread()
+    assert threads[1:] and all(thread is loop_thread for thread in threads[1:])
@@ -31,3 +31,51 @@ def test_input_row():
         if controls and c1 in controls and c2 in controls:
             found = True
     assert found, 'ColorInput not found in InputRow controls/content'
+
+def test_debouncer_runs_last_call_once():
+    import time
+    from components.inputs import Debouncer
+    calls = []
+    debouncer = Debouncer(calls.append, 0.05)
+    for value in range(5):
+        debouncer.call(value)
+    assert calls == [] and debouncer.pending
+    time.sleep(0.2)
+    assert calls == [4] and not debouncer.pending
+    debouncer.call(5)
+    debouncer.cancel()
+    time.sleep(0.1)
+    assert calls == [4]
+    debouncer.call(6)
+    debouncer.flush()
+    assert calls == [4, 6]
+
+def test_color_input_validates_and_debounces():
+    changes, submits = [], []
+    ci = ColorInput(on_change=changes.append, on_submit=submits.append, debounce_ms=0)
+    ci.value = "#12"
+    ci._handle_change("partial")  # type: ignore
+    assert changes == []
+    ci.value = "#123"
+    ci._handle_change("full")  # type: ignore
+    assert changes == ["full"]
+    ci._handle_submit("enter")  # type: ignore
+    assert submits == ["enter"]
+
+def test_color_input_submit_drops_pending_change():
+    import time
+    changes, submits = [], []
+    ci = ColorInput(on_change=changes.append, on_submit=submits.append, debounce_ms=50)
+    ci.value = "#123456"
+    ci._handle_change("typed")  # type: ignore
+    ci._handle_submit("enter")  # type: ignore
+    time.sleep(0.15)
+    assert changes == [] and submits == ["enter"]
+
+def test_color_input_tracks_focus():
+    ci = ColorInput(on_change=lambda e: None, on_submit=lambda e: None)
+    assert not ci.has_focus
+    ci._handle_focus(DummyEvent())  # type: ignore
+    assert ci.has_focus
+    ci._handle_blur(DummyEvent())  # type: ignore
+    assert not ci.has_focus
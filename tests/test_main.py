@@ -28,6 +28,21 @@ class DummyPage:
     def update(self):
         self.events.append('update')
 
+@pytest.fixture(autouse=True)
+def fresh_swatches():
+    # The catalogue is cached per process; keep one test's stand-in from leaking into the next.
+    main.reset_swatches()
+    yield
+    main.reset_swatches()
+
+def test_get_swatches_loads_once_until_reset(monkeypatch):
+    loads = []
+    monkeypatch.setattr(main, 'load_swatches', lambda path: loads.append(path) or ([], None))
+    assert main.get_swatches() is main.get_swatches()
+    main.reset_swatches()
+    main.get_swatches()
+    assert len(loads) == 2
+
 def test_main_runs(monkeypatch):
     # Patch out config and random
     monkeypatch.setattr(main, 'CONFIG', {
@@ -36,10 +51,10 @@ def test_main_runs(monkeypatch):
         'theme': {'font_family': 'VCR OSD Mono'},
         'swatches_file': 'swatches.json',
     })
-    monkeypatch.setattr(main, 'json', types.SimpleNamespace(load=lambda f: [
+    monkeypatch.setattr(main, 'open_catalogue', lambda path: [
         {"hex": "#ff0000", "name": "Red", "combinations": ["A"]},
         {"hex": "#00ff00", "name": "Green", "combinations": ["B"]},
-    ]))
+    ])
     monkeypatch.setattr(main.random, 'randint', lambda a, b: 0x123456)
     # Run main
     page: Any = DummyPage()  # type: ignore
@@ -49,3 +64,32 @@ def test_main_runs(monkeypatch):
     assert any('update' in e for e in page.events)
     assert page.floating_action_button is not None
     assert page.controls
+
+def test_main_marks_startup(monkeypatch):
+    monkeypatch.setattr(main, 'CONFIG', {'swatches_file': 'swatches.json'})
+    monkeypatch.setattr(main.random, 'randint', lambda a, b: 0x123456)
+    # Marks left over from an earlier session must not leak into this one.
+    main.startup_metrics.mark('stale')
+    page: Any = DummyPage()  # type: ignore
+    main.main(page)
+    marks = main.startup_metrics.as_dict()
+    assert list(marks) == ['first_frame', 'hydrated']
+    # The first frame goes out before hydration sends its own update.
+    assert page.events.count('update') >= 2
+    assert [item['hex'] for item in page.session['history']] == ['#123456']
+
+def test_main_with_profiling(monkeypatch):
+    import core.profiling
+    monkeypatch.setattr(main, 'CONFIG', {'swatches_file': 'swatches.json'})
+    monkeypatch.setattr(main.random, 'randint', lambda a, b: 0x123456)
+    profiler = core.profiling.Profiler(enabled=True)
+    monkeypatch.setattr(main, 'profiler', profiler)
+    monkeypatch.setattr(main, 'setup_profiling', lambda: True)
+    page: Any = DummyPage()  # type: ignore
+    page.overlay = []
+    main.main(page)
+    assert len(page.overlay) == 1
+    assert {'hydrate', '_update_text_colors', 'build_combination_row'} <= profiler.histograms.keys()
+    overlay = page.overlay[0]
+    page.on_keyboard_event(types.SimpleNamespace(key='F12', shift=False, alt=False, ctrl=False, meta=False))
+    assert overlay.visible
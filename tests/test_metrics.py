@@ -0,0 +1,23 @@
+import json
+from core.metrics import StartupMetrics
+
+def test_marks_are_ordered_offsets():
+    metrics = StartupMetrics()
+    first = metrics.mark('first_frame')
+    second = metrics.mark('hydrated')
+    assert 0 <= first <= second
+    assert metrics.time_to_first_frame == first
+    assert list(metrics.as_dict()) == ['first_frame', 'hydrated']
+    metrics.reset()
+    assert metrics.get('first_frame') is None
+
+def test_write_appends_json_lines(tmp_path):
+    path = tmp_path / 'startup.jsonl'
+    metrics = StartupMetrics()
+    metrics.mark('first_frame')
+    metrics.write(str(path))
+    metrics.write(str(path))
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    record = json.loads(lines[0])
+    assert 'timestamp' in record and 'first_frame' in record
@@ -0,0 +1,86 @@
+import json
+import core.color_utils
+import core.hotkeys
+from core.profiling import Histogram, Profiler
+from core.updates import request_update, update_transaction
+
+def test_histogram_buckets_and_percentiles():
+    histogram = Histogram()
+    for ms in (0.05, 0.3, 0.3, 4, 2000):
+        histogram.add(ms)
+    data = histogram.as_dict()
+    assert data['count'] == 5 and data['max_ms'] == 2000
+    assert data['buckets_ms']['<=0.1'] == 1 and data['buckets_ms']['<=0.5'] == 2 and data['buckets_ms']['>1000'] == 1
+    assert histogram.percentile(50) == 0.5
+    assert histogram.percentile(100) == 2000
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    timed = profiler.timed('work')(lambda x: x + 1)
+    assert timed(1) == 2
+    with profiler.span('block'):
+        pass
+    assert profiler.histograms == {} and not profiler.events
+
+def test_timed_spans_and_chrome_trace(tmp_path):
+    profiler = Profiler(enabled=True)
+
+    @profiler.timed()
+    def handler():
+        with profiler.span('inner'):
+            pass
+    handler()
+    handler()
+    snapshot = profiler.snapshot()
+    assert snapshot['handlers']['handler']['count'] == 2
+    assert snapshot['handlers']['inner']['count'] == 2
+    assert {'cache', 'updates', 'calls'} <= snapshot.keys()
+    trace = json.loads(open(profiler.dump_chrome_trace(str(tmp_path / 'trace.json'))).read())
+    assert [event['name'] for event in trace['traceEvents']] == ['inner', 'handler', 'inner', 'handler']
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in trace['traceEvents'])
+    assert 'handler' in profiler.report()
+
+def test_install_counts_calls_wherever_imported():
+    profiler = Profiler(enabled=True)
+    original = core.color_utils.normalize
+    try:
+        assert profiler.install() > 0
+        assert core.hotkeys.normalize is not original
+        core.color_utils.normalize('#fff')
+        core.hotkeys.normalize('#000')
+        core.color_utils.get_complementary_color('#123456')
+        assert profiler.snapshot()['calls']['normalize']['count'] >= 2
+        assert profiler.calls['get_complementary_color'][0] == 1
+    finally:
+        profiler.uninstall()
+    assert core.color_utils.normalize is original and core.hotkeys.normalize is original
+
+def test_install_counts_color_cache_misses():
+    from core.cache import ColorCache
+    profiler = Profiler(enabled=True)
+    cache = ColorCache()
+    try:
+        profiler.install()
+        cache.complement('#123456')
+        cache.complement('#123456')
+        cache.luminance('#123456')
+        cache.rgb('#654321')
+        assert profiler.calls['get_complementary_color'][0] == 1
+        assert profiler.calls['luminance'][0] == 1
+        assert profiler.calls['hex_to_rgb'][0] >= 1
+    finally:
+        profiler.uninstall()
+
+def test_page_updates_are_timed(monkeypatch):
+    import core.updates
+    profiler = Profiler(enabled=True)
+    monkeypatch.setattr(core.updates, 'profiler', profiler)
+
+    class Page:
+        def update(self, *controls):
+            pass
+    page = Page()
+    with update_transaction(page):
+        request_update(page)
+    request_update(page)
+    assert profiler.histograms['page.update'].count == 2
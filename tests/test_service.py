@@ -0,0 +1,101 @@
+import asyncio
+import http.client
+import json
+import threading
+from core.color_utils import get_complementary_color, mix_colors
+from core.service import ColorService, Coalescer
+
+SWATCHES = [
+    {"hex": "#ff0000", "name": "Red", "combinations": [1]},
+    {"hex": "#0000ff", "name": "Blue", "combinations": [1, 2]},
+]
+
+def run_with_service(scenario):
+    """Start a service on a free localhost port and run scenario(port) in a thread."""
+    async def main():
+        svc = ColorService(swatches=SWATCHES)
+        await svc.start('127.0.0.1', 0)
+        try:
+            return svc, await asyncio.to_thread(scenario, svc.port)
+        finally:
+            await svc.close()
+    return asyncio.run(main())
+
+def post(conn, path, payload):
+    conn.request('POST', path, body=json.dumps(payload), headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_batched_endpoints_over_one_connection():
+    def scenario(port):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        results = [
+            post(conn, '/mix', {'pairs': [['#ff0000', '#0000ff'], ['#fff', 'bogus']], 'space': 'srgb'}),
+            post(conn, '/complement', {'colors': ['#123456', 5]}),
+            post(conn, '/match', {'colors': ['#fe0000', '#00ff00']}),
+        ]
+        conn.request('GET', '/stats')
+        stats = json.loads(conn.getresponse().read())
+        conn.close()
+        return results, stats
+    svc, (results, stats) = run_with_service(scenario)
+    assert results[0] == (200, {'results': [mix_colors(('#ff0000', '#0000ff')), None]})
+    assert results[1] == (200, {'results': [get_complementary_color('#123456'), None]})
+    assert results[2] == (200, {'results': [{'hex': '#ff0000', 'name': 'Red', 'combinations': [1]}, None]})
+    # Keep-alive: four requests, one connection.
+    assert stats['connections'] == 1 and stats['requests'] == 4
+
+def test_errors_and_connection_close():
+    def scenario(port):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        answers = [
+            post(conn, '/mix', {'pairs': 'nope'})[0],
+            post(conn, '/mix', {'pairs': [], 'space': 'cmyk'})[0],
+            post(conn, '/nowhere', {})[0],
+        ]
+        conn.request('GET', '/mix')
+        response = conn.getresponse()
+        response.read()
+        answers.append(response.status)
+        conn.request('POST', '/match', body=b'{not json', headers={'Connection': 'close'})
+        response = conn.getresponse()
+        answers.append((response.status, response.getheader('Connection')))
+        conn.close()
+        return answers
+    _, answers = run_with_service(scenario)
+    assert answers == [400, 400, 404, 405, (400, 'close')]
+
+def test_handler_failure_answers_500_and_keeps_connection(monkeypatch, caplog):
+    async def broken(self, payload):
+        raise KeyError('hex')
+    monkeypatch.setattr(ColorService, '_match', broken)
+    def scenario(port):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        answers = [post(conn, '/match', {'colors': ['#fe0000']}), post(conn, '/complement', {'colors': ['#123456']})[0]]
+        conn.close()
+        return answers
+    with caplog.at_level('ERROR', logger='core.service'):
+        svc, answers = run_with_service(scenario)
+    assert answers == [(500, {'error': 'internal error'}), 200]
+    assert svc.connections == 1
+    assert 'POST /match failed' in caplog.text
+
+def test_coalescer_shares_concurrent_identical_work(monkeypatch):
+    calls = []
+    gate = threading.Event()
+    def work(value):
+        calls.append(value)
+        gate.wait(5)
+        return value * 2
+    async def main():
+        coalescer = Coalescer()
+        tasks = [asyncio.ensure_future(coalescer.run('same', work, 21)) for _ in range(5)]
+        tasks.append(asyncio.ensure_future(coalescer.run('other', work, 1)))
+        await asyncio.sleep(0.05)
+        gate.set()
+        results = await asyncio.gather(*tasks)
+        return coalescer, results
+    coalescer, results = asyncio.run(main())
+    assert results == [42] * 5 + [2]
+    assert sorted(calls) == [1, 21]
+    assert (coalescer.computed, coalescer.coalesced) == (2, 4)
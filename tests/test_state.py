@@ -30,3 +30,92 @@ def test_add_to_history():
     assert history[-1]["hex"] == "#abcdef"
     # Should store in session
     assert page.session._data["history"] == history
+
+def test_add_to_history_accepts_color():
+    from core.color_utils import Color
+    page = DummyPage()  # type: ignore
+    history = [{"hex": "#123456"}]
+    add_to_history(page, history, Color.parse("#123456"))  # type: ignore
+    assert len(history) == 1
+    add_to_history(page, history, Color.parse("#abcdef"))  # type: ignore
+    assert history[-1]["hex"] == "#abcdef"
+
+def test_history_store_dedup_and_capacity():
+    from core.state import HistoryStore
+    store = HistoryStore(capacity=5, dedup_window=2)
+    assert store.add("#000001") and store.add("#000002")
+    assert not store.add("#000001")
+    assert store.add("#000003")
+    assert store.add("#000001")
+    for i in range(4, 8):
+        store.add(f"#00000{i}")
+    assert len(store) == 5
+    assert [e["hex"] for e in store] == ["#000001", "#000004", "#000005", "#000006", "#000007"]
+    assert store[-1]["hex"] == "#000007"
+    assert [e["hex"] for e in reversed(store)][0] == "#000007"
+    with pytest.raises(ValueError):
+        HistoryStore(capacity=0)
+
+def test_history_store_in_session():
+    from core.state import HistoryStore
+    page = DummyPage()  # type: ignore
+    page.session.set("history", [{"hex": "#123456"}])
+    store = HistoryStore.from_session(page)
+    assert isinstance(store, HistoryStore) and store == [{"hex": "#123456"}]
+    assert HistoryStore.from_session(page) is store
+    add_to_history(page, store, "#123456")  # type: ignore
+    add_to_history(page, store, "#abcdef", pair=("#aaaaaa", "#bbbbbb"))  # type: ignore
+    assert store.to_list() == [{"hex": "#123456"}, {"hex": "#abcdef", "pair": ("#aaaaaa", "#bbbbbb")}]
+    assert page.session.get("history") is store
+
+class CountingSession(DummySession):
+    def __init__(self):
+        super().__init__()
+        self.sets = []
+    def set(self, key, value):
+        self.sets.append(key)
+        super().set(key, value)
+
+class CountingPage:
+    def __init__(self):
+        self.session = CountingSession()
+    def update(self, *controls):
+        pass
+
+def test_session_state_writes_only_real_changes():
+    from core.state import SessionState, set_current_state, get_current_state
+    page = CountingPage()
+    page.session._data['user_palette'] = ['#111111']
+    state = SessionState.for_page(page)
+    assert state.user_palette == ('#111111',)
+    page.session.sets.clear()
+    assert not state.set('user_palette', ['#111111'])
+    set_current_state(page, '#123456', '#edcba9')
+    set_current_state(page, '#123456', '#edcba9')
+    assert page.session.sets == ['current']
+    assert get_current_state(page) == page.session.get('current') == {
+        'bgcolor': '#123456', 'complementary': '#edcba9', 'palette': None, 'palette_colors': [],
+    }
+
+def test_session_state_batches_per_transaction_and_notifies():
+    from core.state import SessionState
+    from core.updates import update_transaction
+    page = CountingPage()
+    state = SessionState.for_page(page)
+    page.session.sets.clear()
+    seen = []
+    unsubscribe = state.subscribe(seen.append, 'user_palette')
+    with update_transaction(page):
+        state.set('user_palette', ['#aaaaaa'])
+        state.set('user_palette', ['#aaaaaa', '#bbbbbb'])
+        state.set('bgcolor', '#000000')
+        state.set('bgcolor', None)
+        assert page.session.sets == [] and seen == []
+    assert page.session.sets == ['user_palette']
+    assert page.session.get('user_palette') == ['#aaaaaa', '#bbbbbb']
+    assert seen == [{'user_palette': ('#aaaaaa', '#bbbbbb')}]
+    unsubscribe()
+    state.set('user_palette', [])
+    assert len(seen) == 1
+    with pytest.raises(KeyError):
+        state.set('nope', 1)
@@ -0,0 +1,98 @@
+import json
+import os
+import pytest
+from core.swatch_db import SwatchDB, compile_swatches, compiled_path, convert, main as swatch_db_main
+from core.swatch_index import CombinationIndex, SwatchIndex
+
+CATALOGUE = [
+    {'name': 'Red', 'combinations': [1, 2], 'swatch': 0, 'cmyk': [0, 100, 100, 0], 'lab': [54.0, 80.0, 69.0], 'rgb': [255, 0, 0], 'hex': '#ff0000'},
+    {'name': 'Grün', 'combinations': [2], 'swatch': 1, 'cmyk': [100, 0, 100, 0], 'lab': [87.8, -79.3, 80.9], 'rgb': [0, 255, 0], 'hex': '#00ff00'},
+    {'name': 'Blue', 'combinations': [], 'swatch': 2, 'cmyk': [100, 100, 0, 0], 'lab': [29.6, 68.3, -112.0], 'rgb': [0, 0, 255], 'hex': '#0000ff'},
+]
+
+@pytest.fixture
+def db_path(tmp_path):
+    source = tmp_path / 'swatches.json'
+    source.write_text(json.dumps(CATALOGUE))
+    return convert(str(source))
+
+def test_round_trip(db_path):
+    with SwatchDB(db_path) as db:
+        assert len(db) == 3
+        assert db._decoded == {}
+        assert list(db) == CATALOGUE
+        assert db[-1] is db[2]
+        assert db.packed_rgb(1) == 0x00FF00
+        assert db.lab(2) == (29.6, 68.3, -112.0)
+
+def test_combinations_match_combination_index(db_path):
+    with SwatchDB(db_path) as db:
+        index = CombinationIndex(CATALOGUE)
+        for combination in (1, '2', 3, 'x'):
+            assert db.combinations.palette(combination) == index.palette(combination)
+            assert db.combinations.members(combination) == index.members(combination)
+        assert len(db.combinations) == len(index) == 2
+        assert 2 in db.combinations and 3 not in db.combinations
+
+def test_swatch_index_over_db(db_path):
+    with SwatchDB(db_path) as db:
+        index = SwatchIndex(db)
+        assert index.swatches is db
+        assert index.closest('#fe0101')['name'] == 'Red'
+        assert index.closest('#00fe00', metric='ciede2000')['name'] == 'Grün'
+        assert len(db._decoded) == 2
+
+def test_missing_fields_and_errors(tmp_path):
+    path = tmp_path / 'minimal.swdb'
+    path.write_bytes(compile_swatches([{'hex': 'abc'}]))
+    with SwatchDB(str(path)) as db:
+        swatch = db[0]
+        assert swatch['hex'] == '#aabbcc' and swatch['name'] == '' and swatch['combinations'] == []
+        assert 'cmyk' not in swatch and 'swatch' not in swatch
+    with pytest.raises(ValueError):
+        compile_swatches([{'hex': 'nope'}])
+    path.write_bytes(b'JUNKJUNKJUNKJUNKJUNKJUNKJUNK')
+    with pytest.raises(ValueError):
+        SwatchDB(str(path))
+
+@pytest.mark.parametrize('field, value, message', [
+    ('cmyk', [0, 12.5, 0, 0], "cmyk value 12.5"),
+    ('cmyk', [0, 40000, 0, 0], "cmyk value 40000"),
+    ('cmyk', [0, -3, 0, 0], "cmyk value -3"),
+    ('swatch', 'first', "swatch number 'first'"),
+    ('combinations', [1, -2], "combination id -2"),
+    ('lab', [1, 'x', 2], "non-numeric lab value"),
+])
+def test_unstorable_fields_name_the_swatch(field, value, message):
+    swatch = {**CATALOGUE[1], field: value}
+    with pytest.raises(ValueError, match=r"Swatch 1 \('Grün'\).*" + message):
+        compile_swatches([CATALOGUE[0], swatch])
+
+def test_whole_floats_and_digit_strings_are_stored(tmp_path):
+    path = tmp_path / 'coerced.swdb'
+    path.write_bytes(compile_swatches([{**CATALOGUE[0], 'cmyk': [0.0, 100.0, 106, 0], 'swatch': 4.0, 'combinations': ['176']}]))
+    with SwatchDB(str(path)) as db:
+        assert db[0]['cmyk'] == [0, 100, 106, 0]
+        assert db[0]['swatch'] == 4 and db[0]['combinations'] == [176]
+
+def test_cli_reports_bad_swatch(tmp_path, capsys):
+    source = tmp_path / 'swatches.json'
+    source.write_text(json.dumps([{**CATALOGUE[0], 'cmyk': [0, 1.5, 0, 0]}]))
+    assert swatch_db_main([str(source)]) == 1
+    assert "Swatch 0 ('Red') has cmyk value 1.5" in capsys.readouterr().err
+
+def test_compiled_path_and_cli(tmp_path, capsys):
+    source = tmp_path / 'swatches.json'
+    source.write_text(json.dumps(CATALOGUE))
+    assert compiled_path(str(source)) is None
+    assert swatch_db_main([str(source)]) == 0
+    assert '3 swatches' in capsys.readouterr().out
+    assert compiled_path(str(source)) == str(tmp_path / 'swatches.swdb')
+    os.utime(source, (os.path.getmtime(source) + 10,) * 2)
+    assert compiled_path(str(source)) is None
+
+def test_load_swatches_prefers_fresh_database(db_path):
+    import main
+    swatches, index = main.load_swatches(db_path.replace('.swdb', '.json'))
+    assert isinstance(swatches, SwatchDB)
+    assert index.combinations.palette(1) == ['#ff0000']
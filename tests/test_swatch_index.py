@@ -0,0 +1,105 @@
+import math
+import random
+import pytest
+from core.color_utils import find_closest_swatch
+from core.swatch_index import SwatchIndex, KDTree
+
+SWATCHES = [
+    {"hex": "#ff0000", "name": "Red", "combinations": ["A"]},
+    {"hex": "#00ff00", "name": "Green", "combinations": ["B"]},
+    {"hex": "#0000ff", "name": "Blue", "combinations": ["C"]},
+    {"hex": "bogus", "name": "Broken", "combinations": []},
+    {"hex": "#ff0000", "name": "Second Red", "combinations": ["D"]},
+]
+
+def test_closest_matches_linear_scan():
+    index = SwatchIndex(SWATCHES)
+    assert index.closest("#ff0001") == find_closest_swatch("#ff0001", SWATCHES)
+    assert index.closest("#ff0001")["name"] == "Red"  # ties resolve to catalogue order
+    assert index.closest("#123456") is None
+    assert index.closest("notacolor") is None
+    assert find_closest_swatch("#00ff01", index)["name"] == "Green"
+
+def test_threshold_is_inclusive():
+    index = SwatchIndex([{"hex": "#000000", "name": "Black", "combinations": []}])
+    assert index.closest("#000c10") is not None  # distance exactly 20
+    assert index.closest("#000c11") is None
+
+def test_random_catalogue_agrees_with_linear_scan():
+    rng = random.Random(7)
+    swatches = [{"hex": f"#{rng.randrange(1 << 24):06x}", "name": str(i), "combinations": []} for i in range(2000)]
+    index = SwatchIndex(swatches)
+    for _ in range(200):
+        color = f"#{rng.randrange(1 << 24):06x}"
+        assert index.closest(color) == find_closest_swatch(color, swatches)
+
+def test_k_nearest_and_radius():
+    index = SwatchIndex(SWATCHES)
+    names = [swatch["name"] for _, swatch in index.nearest("#ff0000", k=3)]
+    assert names[:2] == ["Red", "Second Red"]
+    assert len(index.nearest("#ff0000", k=10)) == 4
+    within = index.within("#ff0000", 1)
+    assert [d for d, _ in within] == [0.0, 0.0]
+    assert index.within("#808080", 10) == []
+
+def test_kdtree_empty():
+    tree = KDTree([])
+    assert tree.nearest((0, 0, 0)) is None
+    assert tree.within((0, 0, 0), 5) == []
+
+def test_perceptual_metrics_use_stored_lab():
+    swatches = [
+        {"hex": "#f9c1ce", "name": "Hermosa Pink", "combinations": [176], "lab": [83.43, 22.14, 1.64]},
+        {"hex": "#000000", "name": "Stored Lab Wins", "combinations": [], "lab": [50.0, 0.0, 0.0]},
+    ]
+    for metric in ("cie76", "cie94", "ciede2000"):
+        index = SwatchIndex(swatches, metric=metric)
+        assert index.closest("#f9c1ce")["name"] == "Hermosa Pink"
+        assert index.closest("#777777")["name"] == "Stored Lab Wins"
+        assert index.closest("#0000ff") is None
+    index = SwatchIndex(swatches)
+    assert index.closest("#777777") is None
+    assert index.closest("#777777", metric="ciede2000")["name"] == "Stored Lab Wins"
+    assert [s["name"] for _, s in index.nearest("#f9c1ce", k=2, metric="cie94")] == ["Hermosa Pink", "Stored Lab Wins"]
+    assert [s["name"] for _, s in index.within("#777777", 5, metric="cie76")] == ["Stored Lab Wins"]
+
+@pytest.mark.parametrize("metric", ["rgb", "cie76", "cie94", "ciede2000"])
+def test_nearest_agrees_with_brute_force(metric):
+    from core.color_utils import DELTA_E, to_lab
+    rng = random.Random(11)
+    swatches = [{"hex": f"#{rng.randrange(1 << 24):06x}", "name": str(i), "combinations": []} for i in range(500)]
+    index = SwatchIndex(swatches)
+    labs = [to_lab(swatch["hex"]) for swatch in swatches]
+    for _ in range(100):
+        color = f"#{rng.randrange(1 << 24):06x}"
+        if metric == "rgb":
+            rgb = tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+            distances = [math.dist(rgb, tuple(int(s["hex"][i:i + 2], 16) for i in (1, 3, 5))) for s in swatches]
+        else:
+            query = to_lab(color)
+            distances = [DELTA_E[metric](query, lab) for lab in labs]
+        expected = sorted(range(len(swatches)), key=lambda i: (distances[i], i))[:8]
+        result = index.nearest(color, k=8, metric=metric)
+        assert [swatch["name"] for _, swatch in result] == [str(i) for i in expected]
+        assert [d for d, _ in result] == pytest.approx([distances[i] for i in expected])
+
+def test_unknown_metric():
+    with pytest.raises(ValueError):
+        SwatchIndex(SWATCHES, metric="manhattan")
+
+def test_combination_index():
+    from core.swatch_index import CombinationIndex
+    catalogue = [
+        {"hex": "#ff0000", "name": "Red", "combinations": [1, 2]},
+        {"hex": "#00ff00", "name": "Green", "combinations": [2]},
+        {"hex": "#0000ff", "name": "Blue", "combinations": [1, 2, 3]},
+    ]
+    index = CombinationIndex(catalogue)
+    assert len(index) == 3
+    assert [s["name"] for s in index.members(2)] == ["Red", "Green", "Blue"]
+    assert index.palette("1") == index.palette(1) == ["#ff0000", "#0000ff"]
+    assert index.palette(99) == [] and 99 not in index
+    index.palette(1).append("#ffffff")
+    assert index.palette(1) == ["#ff0000", "#0000ff"]
+    assert index.combinations_of(catalogue[2]) == (1, 2, 3)
+    assert SwatchIndex(catalogue).combinations.palette(3) == ["#0000ff"]
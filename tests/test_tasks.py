@@ -0,0 +1,48 @@
+import asyncio
+import threading
+from core.cache import color_cache
+from core.swatch_index import SwatchIndex
+from core.tasks import LatestOnly, prefetch_color, run_blocking
+
+def test_run_blocking_uses_compute_pool():
+    async def go():
+        return await run_blocking(lambda x: (x, threading.current_thread().name), 5)
+    value, thread_name = asyncio.run(go())
+    assert value == 5
+    assert thread_name.startswith('colormixer-compute')
+
+def test_latest_only():
+    latest = LatestOnly()
+    first = latest.begin()
+    second = latest.begin()
+    assert not latest.is_current(first)
+    assert latest.is_current(second)
+
+def test_prefetch_color_warms_cache():
+    color_cache.clear()
+    swatches = SwatchIndex([{'hex': '#ff0000', 'name': 'Red', 'combinations': [1]}])
+    assert prefetch_color('F00', swatches) == '#ff0000'
+    assert prefetch_color('nope', swatches) is None
+    color_cache.reset_stats()
+    color_cache.complement('#ff0000')
+    assert color_cache.closest_swatch('#ff0000', swatches)['name'] == 'Red'
+    stats = color_cache.stats()
+    assert stats['complement']['misses'] == 0 and stats['closest_swatch']['misses'] == 0
+
+def test_combination_click_builds_sheet_off_thread():
+    from components.swatches import CombinationRow
+    opened, threads = [], []
+    class Page:
+        bgcolor = '#ffffff'
+        session = {}
+        def open(self, sheet):
+            opened.append(sheet)
+    def make_sheet(combo, match):
+        threads.append(threading.current_thread().name)
+        return (combo, match['name'])
+    row = CombinationRow(async_handlers=True)
+    row._page, row._make_bottom_sheet, row._match = Page(), make_sheet, {'name': 'Red'}
+    event = type('E', (), {'control': type('C', (), {'text': '7'})()})()
+    asyncio.run(row._handle_combo_click_async(event))  # type: ignore
+    assert opened == [('7', 'Red')]
+    assert threads[0].startswith('colormixer-compute')
@@ -0,0 +1,66 @@
+import pytest
+from core.updates import defer, in_transaction, request_update, update_counters, update_transaction
+
+class DummyPage:
+    def __init__(self):
+        self.calls = []
+    def update(self, *controls):
+        self.calls.append(controls)
+
+class DummyControl:
+    def __init__(self, page):
+        self.page = page
+    def update(self):
+        self.page.update(self)
+
+def test_request_update_outside_transaction_is_immediate():
+    page = DummyPage()
+    request_update(page)
+    assert page.calls == [()]
+    assert not in_transaction()
+
+def test_transaction_coalesces_to_one_update():
+    update_counters.reset()
+    page = DummyPage()
+    control = DummyControl(page)
+    with update_transaction(page):
+        request_update(control)
+        with update_transaction(page):
+            request_update(page)
+            request_update(page)
+        assert page.calls == []
+    assert page.calls == [()]
+    assert update_counters.stats() == {'requested': 3, 'flushed': 1, 'saved': 2, 'transactions': 1}
+
+def test_transaction_updates_only_requested_controls():
+    page = DummyPage()
+    a, b, detached = DummyControl(page), DummyControl(page), DummyControl(None)
+    with update_transaction(page):
+        request_update(a)
+        request_update(b)
+        request_update(a)
+        request_update(detached)
+    assert page.calls == [(a, b)]
+
+def test_transaction_flushes_on_error():
+    page = DummyPage()
+    with pytest.raises(RuntimeError):
+        with update_transaction(page):
+            request_update(page)
+            raise RuntimeError
+    assert page.calls == [()]
+    assert not in_transaction()
+
+def test_deferred_work_runs_once_before_the_flush():
+    page = DummyPage()
+    control = DummyControl(page)
+    calls = []
+    def work():
+        calls.append(len(page.calls))
+        request_update(control)
+    assert not defer('work', work)
+    with update_transaction(page):
+        assert defer('work', work)
+        assert defer('work', work)
+    assert calls == [0]
+    assert page.calls == [(control,)]
@@ -12,6 +12,7 @@
 #   ./wbuild.sh --nobump       # Use max version found, do not auto-bump
 #   ./wbuild.sh -h | --help     # Show this help message
 #   ./wbuild.sh --notify "message" [priority] # Send a notification directly
+#   COLORMIXER_BUILD_LUT=1 ./wbuild.sh # Also precompute complements.lut (48 MB, needs NumPy)
 #
 # This script will:
 #   - Determine the version to use (from argument, --version, or by bumping the latest installer)
@@ -96,6 +97,8 @@ for ((i=1; i<=$#; i++)); do
         echo -e "  \033[1;33m--nobuild\033[0m       Skip Flet build, only compile installer."
         echo -e "  \033[1;33m--nobump\033[0m        Use max version found, do not auto-bump."
         echo -e "  \033[1;33m--notify \"message\" [priority]\033[0m Send a notification directly."
+        echo -e "\n\033[1;36mEnvironment:\033[0m"
+        echo -e "  \033[1;33mCOLORMIXER_BUILD_LUT=1\033[0m  Also precompute complements.lut (48 MB, needs NumPy)."
         echo -e "\n\033[1;36mThis script will:\033[0m"
         echo -e "  - Determine the version to use (from argument, --version, or by bumping the latest installer)"
         echo -e "  - Build the Flet Windows app (unless --nobuild is given)"
@@ -170,6 +173,14 @@ else
 fi
 
 if [[ $nobuild -eq 0 ]]; then
+    echo -e "\033[1;34mCompiling swatch database...\033[0m"
+    python -m core.swatch_db core/swatches.json || exit 1
+    if [[ "$COLORMIXER_BUILD_LUT" == "1" ]]; then
+        echo -e "\033[1;34mBuilding complement table...\033[0m"
+        if ! python -m core.complement_lut; then
+            echo -e "\033[1;33mWarning: complement table not built; the app will compute complements live.\033[0m"
+        fi
+    fi
     echo -e "\033[1;34mBuilding Flet Windows app...\033[0m"
     flet build windows .;
     if [ $? -ne 0 ]; then